@@ -0,0 +1,65 @@
+"""
+Construction of a large fat-tree network.
+
+A k-ary fat tree has 5 * k**2 / 4 switches with k ports each and k**3 / 4
+hosts. Every switch port gets a wire, every host a packet generator, which
+starts after a random delay, and a sink. The model is built with and without
+:meth:`Environment.bulk() <onl.sim.Environment.bulk>`. The build time covers
+creating the devices and starting their processes (running the simulation up
+to the first packet).
+
+Usage:
+    python benchmarks/bulk_construction.py [k]
+"""
+import gc
+import random
+import sys
+import time
+from contextlib import nullcontext
+
+from onl import sim
+from onl.netdev import SimplePacketSwitch, Wire
+from onl.packet import DistPacketGenerator, PacketSink
+
+
+def build(k, bulk):
+    # Don't let the garbage of the previous run slow down this one.
+    gc.collect()
+    rng = random.Random(1)
+    env = sim.Environment()
+    start = time.perf_counter()
+    with env.bulk() if bulk else nullcontext():
+        switches = [
+            SimplePacketSwitch(env, k, 1e9, 100, f"s{i}")
+            for i in range(5 * k * k // 4)
+        ]
+        for switch in switches:
+            for port in switch.ports:
+                port.out = Wire(env, lambda: 1e-6)
+        for host in range(k ** 3 // 4):
+            generator = DistPacketGenerator(
+                env,
+                f"h{host}",
+                lambda: rng.expovariate(1000.0),
+                lambda: 1000,
+                initial_delay=rng.uniform(1e-3, 2e-3),
+                flow_id=host,
+            )
+            generator.out = PacketSink(env)
+    built = time.perf_counter()
+    env.run(until=1e-3)
+    return built - start, time.perf_counter() - start, env.queue_size
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    for bulk in (False, True):
+        best = min(build(k, bulk) for _ in range(5))
+        print(
+            f"k={k} bulk={bulk!s:5}: construction {best[0]:.3f}s, "
+            f"with start-up {best[1]:.3f}s ({best[2]} events scheduled)"
+        )
+
+
+if __name__ == "__main__":
+    main()
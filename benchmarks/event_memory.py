@@ -0,0 +1,62 @@
+"""
+Memory footprint and allocation rate of the event classes.
+
+Usage:
+    python benchmarks/event_memory.py
+"""
+import gc
+import time
+import tracemalloc
+
+from onl import sim
+
+N = 100_000
+
+
+def pem(env):
+    yield env.timeout(1)
+
+
+def bytes_per_object(factory):
+    """Average number of bytes allocated per object created by factory."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(N)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Don't count the list holding the objects.
+    return (after - before - len(objects) * 8) / N
+
+
+def allocation_rate():
+    """Timeouts created and processed per second."""
+    env = sim.Environment()
+
+    def loop(env):
+        for _ in range(N):
+            yield env.timeout(1)
+
+    env.process(loop(env))
+    start = time.perf_counter()
+    env.run()
+    return N / (time.perf_counter() - start)
+
+
+def main():
+    env = sim.Environment()
+    store = sim.Store(env)
+    factories = {
+        "Event": env.event,
+        "Timeout": lambda: env.timeout(1),
+        "Process": lambda: env.process(pem(env)),
+        "StorePut": lambda: store.put(None),
+        "StoreGet": store.get,
+    }
+    for name, factory in factories.items():
+        print(f"{name:>10}: {bytes_per_object(factory):7.1f} bytes/object")
+    print(f"{'Timeouts':>10}: {allocation_rate():9.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Run time of the event queue backends.
+
+N processes wait for exponentially distributed timeouts, so about N events
+are pending at any time. Each backend processes the same events.
+
+Usage:
+    python benchmarks/event_queue.py [pending ...]
+"""
+import random
+import sys
+import time
+
+from onl import sim
+
+EVENTS = 200_000
+
+
+def sleeper(env, rng):
+    while True:
+        yield env.timeout(rng.expovariate(1.0))
+
+
+def run(queue, pending):
+    rng = random.Random(1)
+    env = sim.Environment(queue=queue)
+    for _ in range(pending):
+        env.process(sleeper(env, rng))
+    # About *pending* events per time unit.
+    until = EVENTS / pending
+    start = time.perf_counter()
+    env.run(until=until)
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for pending in sizes:
+        for name, queue in [
+            ("HeapQueue", sim.HeapQueue),
+            ("CalendarQueue", sim.CalendarQueue),
+        ]:
+            duration = min(run(queue(), pending) for _ in range(3))
+            print(f"{pending:>7} pending, {name:13}: {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
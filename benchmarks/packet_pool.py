@@ -0,0 +1,59 @@
+"""
+Steady-state run time with and without a PacketPool.
+
+Several generators send packets through ports and lossy wires into sinks
+which don't record anything, so the packets themselves are the main
+allocations of the run.
+
+Usage:
+    python benchmarks/packet_pool.py
+"""
+import gc
+import random
+import time
+
+from onl.netdev import Port, Wire
+from onl.packet import DistPacketGenerator, PacketPool, PacketSink
+from onl.sim import Environment
+
+FLOWS = 10
+UNTIL = 20
+
+
+def run(pool):
+    gc.collect()
+    rng = random.Random(1)
+    env = Environment()
+    for flow_id in range(FLOWS):
+        generator = DistPacketGenerator(
+            env,
+            f"g{flow_id}",
+            lambda: rng.expovariate(500),
+            lambda: rng.randint(64, 1500),
+            flow_id=flow_id,
+            pool=pool,
+        )
+        port = Port(env, 1e7, 100, False, f"p{flow_id}")
+        wire = Wire(env, lambda: 0.001, 0.01, rng=rng)
+        sink = PacketSink(env, rec_arrivals=False, rec_waits=False)
+        generator.out, port.out, wire.out = port, wire, sink
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    start = time.perf_counter()
+    env.run(until=UNTIL)
+    duration = time.perf_counter() - start
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    return duration, collections
+
+
+def main():
+    for name, make_pool in [
+        ("no pool", lambda: None),
+        ("pool", PacketPool),
+        ("pool (debug)", lambda: PacketPool(debug=True)),
+    ]:
+        duration, collections = min(run(make_pool()) for _ in range(3))
+        print(f"{name:13} {duration:.2f}s, {collections} garbage collections")
+
+
+if __name__ == "__main__":
+    main()
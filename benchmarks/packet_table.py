@@ -0,0 +1,53 @@
+"""
+Memory and run time of packet objects versus a PacketTable.
+
+A generator sends small packets much faster than its port can transmit
+them, so almost all packets pile up in the buffer of the port. Each mode
+runs in a fresh interpreter, which reports its peak memory.
+
+Usage:
+    python benchmarks/packet_table.py [packets]
+"""
+import resource
+import subprocess
+import sys
+import time
+
+from onl.netdev import Port, Wire
+from onl.packet import DistPacketGenerator, PacketSink, PacketTable
+from onl.sim import Environment
+
+
+def run(packets, use_table):
+    table = PacketTable() if use_table else None
+    env = Environment()
+    generator = DistPacketGenerator(
+        env, "gen", lambda: 1.0, lambda: 64, table=table
+    )
+    # The (truthy) queue limit keeps every packet.
+    port = Port(env, 64 * 8 * 0.1, 1, False, "port", table=table)
+    wire = Wire(env, lambda: 0.5, table=table)
+    sink = PacketSink(env, rec_arrivals=False, rec_waits=False, table=table)
+    generator.out, port.out, wire.out = port, wire, sink
+    start = time.perf_counter()
+    env.run(until=packets + 0.5)
+    duration = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{'table' if use_table else 'objects':8} {packets} packets: "
+        f"{duration:.2f}s, peak RSS {peak:.0f} MiB "
+        f"({sum(sink.packets_received.values())} received)"
+    )
+
+
+def main():
+    if len(sys.argv) > 2:
+        run(int(sys.argv[1]), sys.argv[2] == "table")
+        return
+    packets = sys.argv[1] if len(sys.argv) > 1 else "1000000"
+    for mode in ("objects", "table"):
+        subprocess.run([sys.executable, __file__, packets, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
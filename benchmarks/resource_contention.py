@@ -0,0 +1,56 @@
+"""
+Thousands of processes contending for a priority resource.
+
+Every process requests the resource with a random priority, holds it for a
+short time and repeats. With preemption, requests of higher priority
+interrupt the current users.
+
+Usage:
+    python benchmarks/resource_contention.py
+"""
+import random
+import time
+
+from onl import sim
+
+PROCESSES = 5000
+CAPACITY = 4
+UNTIL = 100
+
+
+def user(env, resource, rng, preempt):
+    while True:
+        with resource.request(priority=rng.randrange(100), preempt=preempt) as req:
+            try:
+                yield req
+                yield env.timeout(rng.expovariate(CAPACITY * 10.0))
+            except sim.Interrupt:
+                pass
+        yield env.timeout(rng.expovariate(0.1))
+
+
+def run(resource_type, preempt):
+    rng = random.Random(1)
+    env = sim.Environment()
+    resource = resource_type(env, capacity=CAPACITY)
+    for _ in range(PROCESSES):
+        env.process(user(env, resource, rng, preempt))
+    start = time.perf_counter()
+    env.run(until=UNTIL)
+    return time.perf_counter() - start, len(resource.queue)
+
+
+def main():
+    for resource_type, preempt in [
+        (sim.PriorityResource, False),
+        (sim.PreemptiveResource, True),
+    ]:
+        duration, queued = run(resource_type, preempt)
+        print(
+            f"{resource_type.__name__:20} {PROCESSES} processes: "
+            f"{duration:.2f}s (queue length at the end: {queued})"
+        )
+
+
+if __name__ == "__main__":
+    main()
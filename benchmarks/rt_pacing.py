@@ -0,0 +1,40 @@
+"""
+Timing error of the real-time environment with and without busy-waiting.
+
+A process waits for timeouts of 0.5 ms; the lag of every event is the time by
+which the environment overshoots its deadline.
+
+Usage:
+    python benchmarks/rt_pacing.py
+"""
+from onl import sim
+
+N = 2000
+INTERVAL = 500e-6
+
+
+def ticker(env):
+    while True:
+        yield env.timeout(INTERVAL)
+
+
+def timing_error(spin):
+    env = sim.RealtimeEnvironment(strict=False, spin=spin)
+    env.process(ticker(env))
+    env.run(until=N * INTERVAL)
+    return env.lag
+
+
+def main():
+    for spin in (0.0, 100e-6, 200e-6):
+        lag = timing_error(spin)
+        print(
+            f"spin={spin * 1e6:5.0f}us  "
+            f"p50={lag.p50 * 1e6:7.1f}us  "
+            f"p99={lag.p99 * 1e6:7.1f}us  "
+            f"max={lag.max * 1e6:7.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
+import random
 from typing import List, Optional, Dict
-from random import choices
 
 from ..device import Device
-from ..packet import Packet
+from ..packet import Packet, PacketTable
 from ..types import FlowId
 
 class FlowDemux(Device):
@@ -19,17 +19,27 @@ class FlowDemux(Device):
         else:
             if self.default_out:
                 self.default_out.put(packet)
+            else:
+                # the packet is dropped
+                packet.release()
 
 
 class RandomDemux:
-    def __init__(self, outs: List[Device], probs: List[float]):
+    def __init__(
+        self,
+        outs: List[Device],
+        probs: List[float],
+        rng: Optional[random.Random] = None,
+    ):
         self.outs = outs
         self.probs = probs
+        # the global random module by default
+        self.rng = rng if rng is not None else random
         self.packets_recevied = 0
 
     def put(self, packet: Packet):
         self.packets_recevied += 1
-        choices(self.outs, weights=self.probs)[0].put(packet)
+        self.rng.choices(self.outs, weights=self.probs)[0].put(packet)
 
 
 class FIBDemux(Device):
@@ -39,6 +49,7 @@ class FIBDemux(Device):
         ends: Optional[Dict[FlowId, Device]] = None,
         fib: Optional[Dict[int, int]] = None,
         default_out: Optional[Device] = None,
+        table: Optional[PacketTable] = None,
     ):
         # forwarding information base. Key: flow id, Value: output port
         self._fib = fib
@@ -50,6 +61,8 @@ class FIBDemux(Device):
             self.ends = ends
         else:
             self.ends = dict()
+        # if set, packets are handles of rows of this table
+        self.table = table
 
     @property
     def fib(self):
@@ -63,15 +76,23 @@ class FIBDemux(Device):
         if not self._fib:
             raise ValueError('fib of FIBDemux is None')
         self.packets_recevied += 1
-        flow_id = packet.flow_id
+        if self.table is None:
+            flow_id = packet.flow_id
+        else:
+            flow_id = self.table.flow_id[packet]
 
         if flow_id in self.ends:
             self.ends[flow_id].put(packet)
         else:
             try:
                 assert self.outs
-                self.outs[self._fib[packet.flow_id]].put(packet)
+                self.outs[self._fib[flow_id]].put(packet)
             except (KeyError, IndexError, ValueError) as exc:
                 print("FIB Demux Error: " + str(exc))
                 if self.default_out:
                     self.default_out.put(packet)
+                elif self.table is None:
+                    # the packet is dropped
+                    packet.release()
+                else:
+                    self.table.free(packet)
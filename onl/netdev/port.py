@@ -1,6 +1,8 @@
-from ..packet import Packet
+from typing import Optional
+
+from ..packet import Packet, PacketTable
 from ..device import Device, OutMixIn
-from ..sim import Environment, Store
+from ..sim import Environment, Mailbox
 
 
 class Port(Device, OutMixIn):
@@ -17,9 +19,11 @@ class Port(Device, OutMixIn):
         limit_bytes: bool,
         element_id: str,
         debug: bool = False,
+        compact_timestamps: bool = False,
+        table: Optional[PacketTable] = None,
     ):
         self.env = env
-        self.store = Store(env)
+        self.store = Mailbox(env)
         self.rate = rate
         """The bit rate of the port"""
         self.qlimit = qlimit
@@ -31,6 +35,13 @@ class Port(Device, OutMixIn):
         self.element_id = element_id
         """Element Id of this port"""
         self.debug = debug
+        self.compact_timestamps = compact_timestamps
+        """If True, per-hop arrival times are recorded in a compact
+        :class:`~packet.HopTimes` mapping instead of a dict (see
+        :meth:`Packet.stamp() <packet.Packet.stamp>`)."""
+        self.table = table
+        """If set, packets are handles of rows of this table. Per-hop times
+        are not recorded then."""
         self.byte_size = 0
         """Byte sum of all packets in buffer."""
         self.packets_received = 0
@@ -42,15 +53,17 @@ class Port(Device, OutMixIn):
         self.action = env.process(self.run(env))
 
     def run(self, env: Environment):
+        table = self.table
         while True:
             packet = yield self.store.get()
+            size = packet.size if table is None else table.size[packet]
 
             self.busy = 1
-            self.busy_packet_size = packet.size
+            self.busy_packet_size = size
 
             if self.rate > 0:
-                yield env.timeout(packet.size * 8 / self.rate)
-                self.byte_size -= packet.size
+                yield env.timeout(env.to_ticks(size * 8 / self.rate))
+                self.byte_size -= size
             if self.out:
                 self.out.put(packet)
 
@@ -59,11 +72,18 @@ class Port(Device, OutMixIn):
 
     def put(self, packet: Packet):
         self.packets_received += 1
+        table = self.table
 
-        byte_count = self.byte_size + packet.size
+        if table is None:
+            byte_count = self.byte_size + packet.size
+        else:
+            byte_count = self.byte_size + table.size[packet]
 
-        if not self.element_id:
-            packet.perhop_time[self.element_id] = self.env.now
+        if not self.element_id and table is None:
+            if self.compact_timestamps:
+                packet.stamp(self.element_id, self.env.now)
+            else:
+                packet.perhop_time[self.element_id] = self.env.now
 
         if self.qlimit:
             self.byte_size = byte_count
@@ -76,9 +96,14 @@ class Port(Device, OutMixIn):
             # if buffer in this port is not enough to hold the incoming packet, drop it.
             self.packets_dropped += 1
             if self.debug:
+                dropped = packet if table is None else table.packet(packet)
                 print(
-                    f"Packet dropped: flow id = {packet.flow_id} and packet id = {packet.packet_id}"
+                    f"Packet dropped: flow id = {dropped.flow_id} and packet id = {dropped.packet_id}"
                 )
+            if table is None:
+                packet.release()
+            else:
+                table.free(packet)
         else:
             if self.debug:
                 print(f"Queue length at port: {len(self.store.items)} packets.")
@@ -32,7 +32,7 @@ class PortMonitor:
 
     def run(self):
         while True:
-            yield self.env.timeout(self.dist())
+            yield self.env.timeout(self.env.to_ticks(self.dist()))
 
             if self.pkt_in_service_included:
                 total_byte = self.port.byte_size + self.port.busy_packet_size
@@ -1,4 +1,5 @@
 import random
+from typing import Optional
 
 from .port import Port
 
@@ -26,8 +27,11 @@ class REDPort(Port):
         weight_factor: int = 9,
         limit_bytes: bool = False,
         debug: bool = False,
+        rng: Optional[random.Random] = None,
     ):
         super().__init__(env, rate, qlimit, limit_bytes, element_id, debug)
+        self.rng = rng if rng is not None else random
+        """Source of the random drops, the global random module by default."""
         self.max_probability = max_probability
         """ The maximum probability is the fraction of packets dropped when the
         average queue length is at the maximum threshold, which is
@@ -68,15 +72,17 @@ class REDPort(Port):
 
         if self.average_queue_size >= self.qlimit:
             self.packets_dropped += 1
+            packet.release()
             if self.debug:
                 print(
                     f"The average queue length {self.average_queue_size} "
                     f"exceeds the upper limit {self.qlimit}."
                 )
         elif self.average_queue_size >= self.max_threshold:
-            rand = random.uniform(0, 1)
+            rand = self.rng.uniform(0, 1)
             if rand <= self.max_probability:
                 self.packets_dropped += 1
+                packet.release()
                 if self.debug:
                     print(
                         f"The average queue length ({self.average_queue_size}) "
@@ -92,9 +98,10 @@ class REDPort(Port):
                 / (self.max_threshold - self.min_threshold)
                 * self.max_probability
             )
-            rand = random.uniform(0, 1)
+            rand = self.rng.uniform(0, 1)
             if rand <= prob:
                 self.packets_dropped += 1
+                packet.release()
                 if self.debug:
                     print(
                         f"The average queue length {self.average_queue_size} "
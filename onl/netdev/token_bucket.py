@@ -1,6 +1,6 @@
 from ..device import SingleDevice
 from ..packet import Packet
-from ..sim import Store, Environment
+from ..sim import Mailbox, Environment
 
 
 class TokenBucket(SingleDevice):
@@ -16,7 +16,7 @@ class TokenBucket(SingleDevice):
         self, env, rate: float, bucket_size: int, peak=None, debug: bool = False
     ):
         self.env = env
-        self.store = Store(env)
+        self.store = Mailbox(env)
         self.rate = rate
         self.out = None
         self.packets_received = 0
@@ -39,7 +39,8 @@ class TokenBucket(SingleDevice):
 
             self.current_bucket = min(
                 self.bucket_size,
-                self.current_bucket + self.rate * (now - self.update_time) / 8.0,
+                self.current_bucket
+                + self.rate * env.to_seconds(now - self.update_time) / 8.0,
             )
             self.update_time = now
 
@@ -47,7 +48,9 @@ class TokenBucket(SingleDevice):
             # to be sent; if not, we will then wait to accumulate enough tokens to
             # allow this packet to be sent regardless of the bucket size.
             if packet.size > self.current_bucket:
-                yield env.timeout((packet.size - self.current_bucket) * 8.0 / self.rate)
+                yield env.timeout(
+                    env.to_ticks((packet.size - self.current_bucket) * 8.0 / self.rate)
+                )
                 self.current_bucket = 0.0
                 self.update_time = env.now
             else:
@@ -57,7 +60,7 @@ class TokenBucket(SingleDevice):
             if not self.out:
                 raise ValueError("token bucket's out is None")
             if self.peak:
-                yield env.timeout(packet.size * 8.0 / self.peak)
+                yield env.timeout(env.to_ticks(packet.size * 8.0 / self.peak))
             self.out.put(packet)
 
             self.packets_sent += 1
@@ -2,7 +2,7 @@ from typing import Optional
 
 from ..device import Device
 from ..packet import Packet
-from ..sim import Store, PriorityItem, Environment
+from ..sim import Mailbox, PriorityItem, Environment
 
 
 class TwoRateTokenBucket(Device):
@@ -20,7 +20,7 @@ class TwoRateTokenBucket(Device):
         pbs: Optional[int] = None,
         debug=False,
     ):
-        self.store = Store(env)
+        self.store = Mailbox(env)
         self.env = env
         self.out = None
         self.cir = cir
@@ -68,7 +68,8 @@ class TwoRateTokenBucket(Device):
 
             self.current_bucket_commit = min(
                 self.cbs,
-                self.current_bucket_commit + self.cir * (now - self.update_time) / 8.0,
+                self.current_bucket_commit
+                + self.cir * env.to_seconds(now - self.update_time) / 8.0,
             )
 
             if self.pir:
@@ -76,7 +77,7 @@ class TwoRateTokenBucket(Device):
                 self.current_bucket_peak = min(
                     self.pbs,
                     self.current_bucket_peak
-                    + self.pir * (now - self.update_time) / 8.0,
+                    + self.pir * env.to_seconds(now - self.update_time) / 8.0,
                 )
             self.update_time = now
 
@@ -84,7 +85,9 @@ class TwoRateTokenBucket(Device):
                 assert self.current_bucket_peak
                 if packet.size > self.current_bucket_peak:
                     yield env.timeout(
-                        (packet.size - self.current_bucket_peak) * 8.0 / self.pir
+                        env.to_ticks(
+                            (packet.size - self.current_bucket_peak) * 8.0 / self.pir
+                        )
                     )
                     self.current_bucket_peak = 0.0
                     packet.color = "red"
@@ -102,7 +105,9 @@ class TwoRateTokenBucket(Device):
             else:
                 if packet.size > self.current_bucket_commit:
                     yield env.timeout(
-                        (packet.size - self.current_bucket_commit) * 8.0 / self.cir
+                        env.to_ticks(
+                            (packet.size - self.current_bucket_commit) * 8.0 / self.cir
+                        )
                     )
                     self.current_bucket_commit = 0.0
                     packet.color = "yellow"
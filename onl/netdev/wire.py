@@ -1,9 +1,9 @@
 import random
 from typing import Callable, Optional
 
-from ..packet import Packet
+from ..packet import Packet, PacketTable
 from ..device import SingleDevice
-from ..sim import Environment, Store
+from ..sim import Environment, Mailbox
 
 
 class Wire(SingleDevice):
@@ -19,23 +19,33 @@ class Wire(SingleDevice):
         loss_rate: Optional[float] = None,
         wire_id: int = 0,
         debug: bool = False,
+        rng: Optional[random.Random] = None,
+        table: Optional[PacketTable] = None,
     ):
         self.env = env
-        self.store = Store(env)
+        self.store = Mailbox(env)
         self.delay_dist = delay_dist
         self.loss_rate = loss_rate
+        self.rng = rng if rng is not None else random
+        """Source of the random losses, the global random module by default."""
         self.wire_id = wire_id
         self.debug = debug
         self.packets_rec = 0
+        self.table = table
+        """If set, packets are handles of rows of this table."""
         self.action = env.process(self.run(env))
 
     def run(self, env: Environment):
+        table = self.table
         while True:
             packet = yield self.store.get()
-            if not self.loss_rate or random.uniform(0, 1) >= self.loss_rate:
+            if not self.loss_rate or self.rng.uniform(0, 1) >= self.loss_rate:
                 # The amount of time for this packet to stay in my store
-                queued_time = self.env.now - packet.current_time
-                delay = self.delay_dist()
+                if table is None:
+                    queued_time = self.env.now - packet.current_time
+                else:
+                    queued_time = self.env.now - table.current_time[packet]
+                delay = env.to_ticks(self.delay_dist())
 
                 # If queued time for this packet is greater than its propagation delay,
                 # it implies that the previous packet had experienced a longer delay.
@@ -45,22 +55,40 @@ class Wire(SingleDevice):
                     yield env.timeout(delay - queued_time)
 
                 if self.debug:
-                    print(f"Left wire #{self.wire_id} at {self.env.now:.2f}: {packet}")
+                    print(
+                        f"Left wire #{self.wire_id} at {self.env.now:.2f}: "
+                        f"{self._describe(packet)}"
+                    )
 
                 assert self.out
                 self.out.put(packet)
             else:
                 if self.debug:
                     print(
-                        f"Dropped on wire #{self.wire_id} at {self.env.now:.2f}: {packet}"
+                        f"Dropped on wire #{self.wire_id} at {self.env.now:.2f}: "
+                        f"{self._describe(packet)}"
                     )
+                if table is None:
+                    packet.release()
+                else:
+                    table.free(packet)
+
+    def _describe(self, packet: Packet) -> Packet:
+        """Return *packet*, or a copy of its row in table mode."""
+        return packet if self.table is None else self.table.packet(packet)
 
     def put(self, packet: Packet):
         """send packet to next device"""
         self.packets_rec += 1
         if self.debug:
-            print(f"Entered wire #{self.wire_id} at {self.env.now}: {packet}")
-        packet.current_time = self.env.now
+            print(
+                f"Entered wire #{self.wire_id} at {self.env.now}: "
+                f"{self._describe(packet)}"
+            )
+        if self.table is None:
+            packet.current_time = self.env.now
+        else:
+            self.table.current_time[packet] = self.env.now
         self.store.put(packet)
 
 
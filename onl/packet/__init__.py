@@ -1,4 +1,6 @@
-from .packet import Packet
+from .packet import HopTimes, Packet
+from .pool import PacketPool
+from .table import PacketTable
 from .dist_generator import DistPacketGenerator
 from .sink import PacketSink
 from .tcp_generator import TCPPacketGenerator, Flow, TCPReno, TCPCubic
@@ -7,6 +9,9 @@ from .tcp_sink import TCPSink
 
 __all__ = [
     "Packet",
+    "HopTimes",
+    "PacketTable",
+    "PacketPool",
     "DistPacketGenerator",
     "PacketSink",
     "Flow",
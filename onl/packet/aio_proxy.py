@@ -0,0 +1,312 @@
+"""
+Proxies between real-world network programs and a simulation running on an
+:class:`~sim.aio.AsyncRealtimeEnvironment`.
+
+All sockets are asyncio transports on the loop of the environment, so one
+process serves many live connections without polling or helper threads.
+Data from the sockets enters the simulation with
+:meth:`~sim.aio.AsyncRealtimeEnvironment.inject`. Since the environment
+processes events at their wall-clock time, packets leaving the simulation are
+written to their socket right away.
+
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..device import Device, SingleDevice
+from ..sim.aio import AsyncRealtimeEnvironment
+from ..types import FlowId
+from .packet import Packet
+from .sink import PacketSink
+
+Address = Tuple[str, int]
+
+
+class _GeneratorProtocol(asyncio.Protocol):
+    """Connection of a client of an :class:`AsyncProxyPacketGenerator`."""
+
+    def __init__(self, generator: "AsyncProxyPacketGenerator"):
+        self.generator = generator
+        self.flow_id: FlowId = 0
+
+    def connection_made(self, transport: Any) -> None:
+        # using the port number as the flow ID
+        self.flow_id = transport.get_extra_info("peername")[1]
+        self.generator.transports[self.flow_id] = transport
+        if self.generator.debug:
+            print(f"{self.generator.element_id}: {self.flow_id} has connected.")
+
+    def data_received(self, data: bytes) -> None:
+        self.generator.env.inject(self.generator.on_data, self.flow_id, data)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.generator.transports.pop(self.flow_id, None)
+        self.generator.env.inject(self.generator.on_close, self.flow_id)
+
+
+class _GeneratorDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, generator: "AsyncProxyPacketGenerator"):
+        self.generator = generator
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        self.generator.client_addr = addr
+        self.generator.env.inject(
+            self.generator.on_data, self.generator.flow_id, data
+        )
+
+
+class AsyncProxyPacketGenerator(SingleDevice):
+    """Serves as a proxy between real-world clients and the simulation.
+
+    Every chunk of data received from a client becomes a packet of
+    *packet_size* bytes which is sent to :attr:`out`. Packets put into the
+    generator are written to the client of their flow. Call :meth:`start`
+    on the loop of the environment before running it.
+
+    """
+
+    def __init__(
+        self,
+        env: AsyncRealtimeEnvironment,
+        element_id: str,
+        listen_port: int = 3000,
+        packet_size: int = 40960,
+        protocol: str = "tcp",
+        host: str = "localhost",
+        debug: bool = False,
+    ):
+        if protocol not in ("tcp", "udp"):
+            raise ValueError("Protocol should be either 'tcp' or 'udp'")
+        self.env = env
+        self.element_id = element_id
+        self.listen_port = listen_port
+        self.packet_size = packet_size
+        self.protocol = protocol
+        self.host = host
+        self.debug = debug
+        self.flow_id = 0
+        self.out: Optional[Device] = None
+        self.packets_sent = 0
+        self.transports: Dict[FlowId, Any] = {}
+        self.client_addr: Optional[Address] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._datagram: Optional[asyncio.DatagramTransport] = None
+
+    async def start(self) -> None:
+        """Start listening for clients."""
+        loop = asyncio.get_running_loop()
+        if self.protocol == "tcp":
+            self._server = await loop.create_server(
+                lambda: _GeneratorProtocol(self), self.host, self.listen_port
+            )
+            sock = self._server.sockets[0]
+        else:
+            self._datagram, _ = await loop.create_datagram_endpoint(
+                lambda: _GeneratorDatagramProtocol(self),
+                local_addr=(self.host, self.listen_port),
+            )
+            sock = self._datagram.get_extra_info("socket")
+        # The actual port if listen_port is 0.
+        self.listen_port = sock.getsockname()[1]
+
+    def close(self) -> None:
+        """Stop listening and close all client connections."""
+        if self._server is not None:
+            self._server.close()
+        if self._datagram is not None:
+            self._datagram.close()
+        for transport in list(self.transports.values()):
+            transport.close()
+
+    def on_data(self, flow_id: FlowId, data: bytes) -> None:
+        """Send *data* received from a client into the simulation."""
+        self.packets_sent += 1
+        packet = Packet(
+            self.env.now,
+            self.packet_size,
+            self.packets_sent,
+            realtime=self.env.to_seconds(self.env.now),
+            src=self.element_id,
+            flow_id=flow_id,
+            payload=data,
+        )
+        if self.debug:
+            print(
+                f"{self.element_id} sent packet {packet.packet_id} with "
+                f"flow_id {packet.flow_id} at time {self.env.now}"
+            )
+        if self.out:
+            self.out.put(packet)
+
+    def on_close(self, flow_id: FlowId) -> None:
+        """Send a closing packet (size 0, no payload) for *flow_id*."""
+        packet = Packet(
+            self.env.now,
+            0,
+            self.packets_sent,
+            src=self.element_id,
+            flow_id=flow_id,
+            payload=None,
+        )
+        if self.out:
+            self.out.put(packet)
+
+    def put(self, packet: Packet):
+        """Sends a packet to the application-layer real-world client."""
+        if not packet.payload:
+            return
+        if self.protocol == "tcp":
+            transport = self.transports.get(packet.flow_id)
+            if transport is not None:
+                transport.write(packet.payload)
+        elif self._datagram is not None and self.client_addr is not None:
+            self._datagram.sendto(packet.payload, self.client_addr)
+
+
+class _SinkProtocol(asyncio.Protocol):
+    """Connection of an :class:`AsyncProxySink` to the server."""
+
+    def __init__(self, sink: "AsyncProxySink", flow_id: FlowId):
+        self.sink = sink
+        self.flow_id = flow_id
+
+    def data_received(self, data: bytes) -> None:
+        self.sink.env.inject(self.sink.on_response, self.flow_id, data)
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        self.data_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        pass
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.sink._connections.pop(self.flow_id, None)
+
+
+class _Connection:
+    """A connection to the server which may still be being established."""
+
+    def __init__(self) -> None:
+        self.transport: Any = None
+        self.pending: List[bytes] = []
+        self.closing = False
+
+    def write(self, data: bytes) -> None:
+        if self.transport is None:
+            self.pending.append(data)
+        elif hasattr(self.transport, "sendto") and not hasattr(
+            self.transport, "write"
+        ):
+            self.transport.sendto(data)
+        else:
+            self.transport.write(data)
+
+    def close(self) -> None:
+        if self.transport is None:
+            self.closing = True
+        else:
+            self.transport.close()
+
+
+class AsyncProxySink(PacketSink):
+    """Forwards the packets leaving the simulation to a real-world server at
+    *destination* and sends the responses of the server back into the
+    simulation through :attr:`out`.
+
+    Each flow gets its own TCP connection (UDP: datagram endpoint), which is
+    opened with the first packet of the flow and closed by a closing packet.
+    Received packets are recorded like by a :class:`PacketSink`.
+
+    """
+
+    def __init__(
+        self,
+        env: AsyncRealtimeEnvironment,
+        element_id: str,
+        destination: Address,
+        packet_size: int = 40960,
+        protocol: str = "tcp",
+        rec_arrivals: bool = False,
+        absolute_arrivals: bool = False,
+        rec_waits: bool = False,
+        rec_flow_ids: bool = False,
+        debug: bool = False,
+    ):
+        if protocol not in ("tcp", "udp"):
+            raise ValueError("Protocol should be either 'tcp' or 'udp'.")
+        super().__init__(
+            env, rec_arrivals, absolute_arrivals, rec_waits, rec_flow_ids, debug
+        )
+        self.element_id = element_id
+        self.destination = destination
+        self.packet_size = packet_size
+        self.protocol = protocol
+        self.out: Optional[Device] = None
+        self.responses_sent = 0
+        self._connections: Dict[FlowId, _Connection] = {}
+
+    def put(self, packet: Packet):
+        if packet.size == 0 and not packet.payload:
+            # The packet is closing a flow.
+            connection = self._connections.pop(packet.flow_id, None)
+            if connection is not None:
+                connection.close()
+            return
+
+        connection = self._connections.get(packet.flow_id)
+        if connection is None:
+            connection = self._connections[packet.flow_id] = _Connection()
+            asyncio.ensure_future(
+                self._connect(packet.flow_id, connection), loop=self.env.loop
+            )
+        connection.write(packet.payload)
+        super().put(packet)
+
+    async def _connect(self, flow_id: FlowId, connection: _Connection) -> None:
+        loop = asyncio.get_running_loop()
+        protocol = _SinkProtocol(self, flow_id)
+        try:
+            if self.protocol == "tcp":
+                transport, _ = await loop.create_connection(
+                    lambda: protocol, *self.destination
+                )
+            else:
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: protocol, remote_addr=self.destination
+                )
+        except OSError as exc:
+            print(f"{self.element_id}: connecting to {self.destination} failed: {exc}")
+            self._connections.pop(flow_id, None)
+            return
+        connection.transport = transport
+        for data in connection.pending:
+            connection.write(data)
+        connection.pending.clear()
+        if connection.closing:
+            transport.close()
+
+    def on_response(self, flow_id: FlowId, data: bytes) -> None:
+        """Send a response of the server into the simulation."""
+        self.responses_sent += 1
+        packet = Packet(
+            self.env.now,
+            self.packet_size,
+            self.responses_sent,
+            realtime=self.env.to_seconds(self.env.now),
+            src=self.element_id,
+            flow_id=flow_id,
+            payload=data,
+        )
+        if self.debug:
+            print(
+                f"{self.element_id} sent packet {packet.packet_id} "
+                f"with flow_id {packet.flow_id} at time {self.env.now}."
+            )
+        assert self.out
+        self.out.put(packet)
+
+    def close(self) -> None:
+        """Close all connections to the server."""
+        for connection in list(self._connections.values()):
+            connection.close()
+        self._connections.clear()
@@ -3,6 +3,8 @@ from typing import Callable, Optional
 from ..sim import Environment, SimTime
 from ..device import Device
 from .packet import Packet
+from .pool import PacketPool
+from .table import PacketTable
 
 
 class DistPacketGenerator:
@@ -17,7 +19,11 @@ class DistPacketGenerator:
         flow_id=0,
         rec_flow=False,
         debug=False,
+        table: Optional[PacketTable] = None,
+        pool: Optional[PacketPool] = None,
     ) -> None:
+        if table is not None and pool is not None:
+            raise ValueError('"table" and "pool" can\'t be used together.')
         self.element_id = element_id
         self.env = env
         self.arrival_dist = arrival_dist
@@ -33,25 +39,49 @@ class DistPacketGenerator:
         self.time_rec = []
         self.size_rec = []
         self.debug = debug
+        self.table = table
+        """If set, packets are rows of this table and handles are sent
+        instead of :class:`Packet` objects."""
+        self._src = table.intern(element_id) if table is not None else 0
+        self.pool = pool
+        """If set, packets are taken from this pool."""
 
     def run(self, env: "Environment"):
         yield env.timeout(self.initial_delay)
         while env.now < self.finish:
-            yield env.timeout(self.arrival_dist())
+            yield env.timeout(env.to_ticks(self.arrival_dist()))
             self.packets_send += 1
-            packet = Packet(
-                env.now,
-                self.size_dist(),
-                self.packets_send,
-                src=self.element_id,
-                flow_id=self.flow_id,
-            )
+            size = self.size_dist()
+            if self.pool is not None:
+                packet = self.pool.acquire(
+                    env.now,
+                    size,
+                    self.packets_send,
+                    src=self.element_id,
+                    flow_id=self.flow_id,
+                )
+            elif self.table is None:
+                packet = Packet(
+                    env.now,
+                    size,
+                    self.packets_send,
+                    src=self.element_id,
+                    flow_id=self.flow_id,
+                )
+            else:
+                packet = self.table.new(
+                    env.now,
+                    size,
+                    self.packets_send,
+                    src=self._src,
+                    flow_id=self.flow_id,
+                )
             if self.rec_flow:
-                self.time_rec.append(packet.time)
-                self.size_rec.append(packet.size)
+                self.time_rec.append(env.now)
+                self.size_rec.append(size)
             if self.debug:
                 print(
-                    f"Send packet {packet.packet_id} with flow_id {packet.flow_id} at "
+                    f"Send packet {self.packets_send} with flow_id {self.flow_id} at "
                     f"time {env.now}"
                 )
             if not self.out:
@@ -2,12 +2,91 @@
 Simple class that represents a packet.
 """
 
-from typing import Any
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional
 from ..types import PacketId, FlowId
 from ..sim import SimTime
 
 
+class HopTimes(MutableMapping):
+    """Mapping view of per-hop times kept in the flat list *items*
+    (``[hop, time, hop, time, ...]``), the compact form of
+    :attr:`Packet.perhop_time`.
+
+    The list takes about half the memory of a dict for the few hops of a
+    packet. Lookups scan it, which is fast for short paths. The view
+    compares equal to a dict with the same items.
+
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Optional[List[Any]] = None) -> None:
+        self._items: List[Any] = [] if items is None else items
+
+    def __getitem__(self, hop: Any) -> SimTime:
+        items = self._items
+        for i in range(0, len(items), 2):
+            if items[i] == hop:
+                return items[i + 1]
+        raise KeyError(hop)
+
+    def __setitem__(self, hop: Any, time: SimTime) -> None:
+        self._set(self._items, hop, time)
+
+    @staticmethod
+    def _set(items: List[Any], hop: Any, time: SimTime) -> None:
+        for i in range(0, len(items), 2):
+            if items[i] == hop:
+                items[i + 1] = time
+                return
+        items.append(hop)
+        items.append(time)
+
+    def __delitem__(self, hop: Any) -> None:
+        items = self._items
+        for i in range(0, len(items), 2):
+            if items[i] == hop:
+                del items[i:i + 2]
+                return
+        raise KeyError(hop)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items[::2])
+
+    def __len__(self) -> int:
+        return len(self._items) // 2
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)})"
+
+
 class Packet:
+    """A packet of *size* bytes created at *time*.
+
+    Packets use ``__slots__``, so they don't carry a per-instance
+    ``__dict__``. The :attr:`priorities` and :attr:`perhop_time` dicts are
+    only allocated when they are accessed for the first time.
+
+    """
+
+    __slots__ = (
+        "time",
+        "size",
+        "packet_id",
+        "realtime",
+        "src",
+        "dst",
+        "flow_id",
+        "payload",
+        "color",
+        "ack",
+        "current_time",
+        "_priorities",
+        # None, a dict or the flat list of a HopTimes view.
+        "_perhop_time",
+        "_pool",
+    )
+
     def __init__(
         self,
         time: float,
@@ -29,10 +108,70 @@ class Packet:
         self.payload = payload
 
         self.color: str = ''
-        self.priorities = {}
         self.ack = 0
         self.current_time: SimTime = 0
-        self.perhop_time = {}  # used by port to record per-hop arrival times
+        self._priorities: Optional[Dict[Any, Any]] = None
+        self._perhop_time: Any = None
+        self._pool: Any = None
+
+    @property
+    def priorities(self) -> Dict[Any, Any]:
+        """Priorities assigned to the packet by the schedulers, keyed by
+        class."""
+        if self._priorities is None:
+            self._priorities = {}
+        return self._priorities
+
+    @priorities.setter
+    def priorities(self, priorities: Dict[Any, Any]) -> None:
+        self._priorities = priorities
+
+    @property
+    def perhop_time(self) -> MutableMapping[Any, SimTime]:
+        """Arrival times of the packet at the ports it has passed, keyed by
+        element id. A dict, unless the first time has been recorded with
+        :meth:`stamp`, then a :class:`HopTimes` view."""
+        perhop_time = self._perhop_time
+        if perhop_time is None:
+            perhop_time = self._perhop_time = {}
+        elif type(perhop_time) is list:
+            return HopTimes(perhop_time)
+        return perhop_time
+
+    @perhop_time.setter
+    def perhop_time(self, perhop_time: MutableMapping[Any, SimTime]) -> None:
+        self._perhop_time = perhop_time
+
+    def stamp(self, hop: Any, time: SimTime) -> None:
+        """Record the arrival *time* at *hop* in :attr:`perhop_time`. If no
+        time has been recorded yet, the times are kept in the compact form
+        of :class:`HopTimes`."""
+        perhop_time = self._perhop_time
+        if perhop_time is None:
+            self._perhop_time = [hop, time]
+        elif type(perhop_time) is list:
+            HopTimes._set(perhop_time, hop, time)
+        else:
+            perhop_time[hop] = time
+
+    def release(self) -> None:
+        """Return the packet to the :class:`~packet.PacketPool` it has been
+        taken from, if any. Devices call this where a packet leaves the
+        simulation; the packet must not be used afterwards.
+
+        A released packet no longer belongs to a pool, so releasing it again
+        does nothing, unless the pool is in debug mode. Then it raises a
+        :exc:`RuntimeError` like any other use of the packet."""
+        if self._pool is not None:
+            self._pool.release(self)
+
+    def __copy__(self) -> "Packet":
+        """Return a shallow copy, which doesn't belong to a pool."""
+        packet = Packet.__new__(type(self))
+        for name in Packet.__slots__:
+            setattr(packet, name, getattr(self, name))
+        packet._pool = None
+        return packet
 
     def __repr__(self) -> str:
         return f"packet id: {self.packet_id}, flow id: {self.flow_id}, src: {self.src}, time: {self.time}, size: {self.size}"
@@ -0,0 +1,116 @@
+"""
+Recycling of packet objects.
+"""
+from typing import Any, List
+
+from ..types import FlowId, PacketId
+from .packet import Packet
+
+
+class ReleasedPacket(Packet):
+    """Class of the packets released to a :class:`PacketPool` in debug mode.
+    Any access to their attributes raises a :exc:`RuntimeError`."""
+
+    __slots__ = ()
+
+    def __getattribute__(self, name: str) -> Any:
+        if name == "__class__":
+            return object.__getattribute__(self, name)
+        raise RuntimeError(
+            f'Packet used after it has been released (attribute "{name}")'
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise RuntimeError(
+            f'Packet used after it has been released (attribute "{name}")'
+        )
+
+    def __repr__(self) -> str:
+        return "<released packet>"
+
+
+class PacketPool:
+    """Pool of :class:`Packet` objects which are reused instead of being
+    allocated for every packet.
+
+    Generators take packets from the pool with :meth:`acquire`, e.g.
+    :class:`DistPacketGenerator` and the acknowledgements of
+    :class:`TCPSink` if they are created with a *pool*. The devices where
+    packets leave the simulation (:class:`PacketSink`, the drops of
+    :class:`~netdev.Port` and :class:`~netdev.red_port.REDPort` and of the
+    demultiplexers without a default output, the losses of
+    :class:`~netdev.Wire` and :class:`TCPPacketGenerator` for
+    acknowledgements) call :meth:`Packet.release() <Packet.release>`, which
+    returns pooled packets to their pool. A released packet is reset and
+    handed out again by the next :meth:`acquire`, so nothing may keep a
+    reference to it, e.g. a custom device which stores the packets it has
+    received. TCP segments are kept for retransmissions and are not pooled.
+
+    Copies of pooled packets, e.g. made by a :class:`~netdev.Splitter`, are
+    ordinary packets which don't return to the pool.
+
+    :meth:`release` raises a :exc:`ValueError` for a packet which is not
+    currently taken from this pool, e.g. one released before. A second
+    :meth:`Packet.release() <Packet.release>` does nothing, as the packet no
+    longer belongs to the pool. If *debug* is True, released packets are
+    never reused. Instead, every access to them, including another
+    :meth:`Packet.release() <Packet.release>`, raises a
+    :exc:`RuntimeError`, which reveals code still using them.
+
+    """
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self._free: List[Packet] = []
+        self.created = 0
+        """Number of packets allocated by the pool."""
+        self.reused = 0
+        """Number of times a released packet has been handed out again."""
+
+    def __len__(self) -> int:
+        """Number of released packets waiting for reuse."""
+        return len(self._free)
+
+    def acquire(
+        self,
+        time: float,
+        size: int,
+        packet_id: PacketId,
+        realtime: float = 0,
+        src="source",
+        dst="destination",
+        flow_id: FlowId = 0,
+        payload: Any = None,
+    ) -> Packet:
+        """Return a packet with the given fields, like ``Packet(...)``."""
+        if self._free:
+            packet = self._free.pop()
+            # Resets all fields.
+            packet.__init__(  # type: ignore
+                time, size, packet_id, realtime, src, dst, flow_id, payload
+            )
+            self.reused += 1
+        else:
+            packet = Packet(
+                time, size, packet_id, realtime, src, dst, flow_id, payload
+            )
+            self.created += 1
+        packet._pool = self
+        return packet
+
+    def release(self, packet: Packet) -> None:
+        """Take back *packet*, which has been acquired from this pool."""
+        if packet._pool is not self:
+            raise ValueError(
+                f"{packet} has not been acquired from this pool or has "
+                f"already been released"
+            )
+        packet._pool = None
+        if self.debug:
+            packet.__class__ = ReleasedPacket
+        else:
+            # Don't keep the payload and the recorded data alive.
+            packet.payload = None
+            packet._perhop_time = None
+            packet._priorities = None
+            self._free.append(packet)
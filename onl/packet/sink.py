@@ -1,7 +1,9 @@
 from collections import defaultdict as dd
+from typing import Optional
 
 from ..sim import Store, Environment
 from ..device import Device
+from .table import PacketTable
 
 
 class PacketSink(Device):
@@ -19,6 +21,7 @@ class PacketSink(Device):
         rec_waits: bool = True,
         rec_flow_ids: bool = True,
         debug: bool = False,
+        table: Optional[PacketTable] = None,
     ):
         self.store = Store(env)
         self.env = env
@@ -44,21 +47,35 @@ class PacketSink(Device):
         self.last_arrival = dd(lambda: 0.0)
 
         self.debug = debug
+        # if set, packets are handles of rows of this table, which are freed
+        # once the packet has been recorded
+        self.table = table
 
     def put(self, packet):
         """Sends a packet to this element."""
         now = self.env.now
+        table = self.table
 
-        if self.rec_flow_ids:
-            rec_index = packet.flow_id
+        if table is None:
+            size = packet.size
+            if self.rec_flow_ids:
+                rec_index = packet.flow_id
+            else:
+                rec_index = packet.src
         else:
-            rec_index = packet.src
+            size = table.size[packet]
+            if self.rec_flow_ids:
+                rec_index = table.flow_id[packet]
+            else:
+                rec_index = table.names[table.src[packet]]
 
         if self.rec_waits:
-            self.waits[rec_index].append(self.env.now - packet.time)
-            self.packet_sizes[rec_index].append(packet.size)
-            self.packet_times[rec_index].append(packet.time)
-            self.perhop_times[rec_index].append(packet.perhop_time)
+            time = packet.time if table is None else table.time[packet]
+            self.waits[rec_index].append(self.env.now - time)
+            self.packet_sizes[rec_index].append(size)
+            self.packet_times[rec_index].append(time)
+            if table is None:
+                self.perhop_times[rec_index].append(packet.perhop_time)
 
         if self.rec_arrivals:
             self.arrivals[rec_index].append(now)
@@ -71,7 +88,8 @@ class PacketSink(Device):
             self.last_arrival[rec_index] = now
 
         if self.debug:
-            print("At time {:.1f}, packet {:d} arrived.".format(now, packet.packet_id))
+            packet_id = packet.packet_id if table is None else table.packet_id[packet]
+            print("At time {:.1f}, packet {:d} arrived.".format(now, packet_id))
             if self.rec_waits and len(self.packet_sizes[rec_index]) >= 10:
                 bytes_received = sum(self.packet_sizes[rec_index][-9:])
                 time_elapsed = self.env.now - (
@@ -84,4 +102,8 @@ class PacketSink(Device):
                 )
 
         self.packets_received[rec_index] += 1
-        self.bytes_received[rec_index] += packet.size
+        self.bytes_received[rec_index] += size
+        if table is None:
+            packet.release()
+        else:
+            table.free(packet)
@@ -0,0 +1,148 @@
+"""
+Struct-of-arrays storage of packets for very large simulations.
+"""
+from array import array
+from typing import Any, Dict, List
+
+from ..types import FlowId, PacketId
+from ..sim import SimTime
+from .packet import Packet
+
+
+class PacketTable:
+    """Stores the fields of packets in :mod:`array` columns instead of one
+    :class:`Packet` object per packet.
+
+    A packet is an integer handle, the number of its row. The columns are
+    attributes of the table named like the attributes of a packet, so the
+    size of the packet *handle* is ``table.size[handle]``. Devices created
+    with a *table* (:class:`DistPacketGenerator`, :class:`~netdev.Port`,
+    :class:`~netdev.Wire`, :class:`~netdev.FIBDemux` and
+    :class:`PacketSink`) pass handles instead of packets. All devices a
+    packet passes have to use the same table.
+
+    Sources and destinations are stored as ids, see :meth:`intern`. Per-hop
+    times and priorities are not stored. Rows of packets which have left the
+    simulation (at a sink or when dropped) are released with :meth:`free`
+    and reused for new packets, so the table only grows with the number of
+    packets in flight.
+
+    Times are stored as doubles, or as 64 bit integers if *integer_time* is
+    True (for environments in tick mode).
+
+    """
+
+    COLUMNS = (
+        "time",
+        "size",
+        "packet_id",
+        "flow_id",
+        "src",
+        "dst",
+        "ack",
+        "current_time",
+    )
+    """Names of the columns."""
+
+    def __init__(self, capacity: int = 1024, integer_time: bool = False):
+        if capacity < 1:
+            raise ValueError('"capacity" must be > 0.')
+        zeros = bytes(8 * capacity)
+        time_type = "q" if integer_time else "d"
+        self.time = array(time_type, zeros)
+        self.size = array("q", zeros)
+        self.packet_id = array("q", zeros)
+        self.flow_id = array("q", zeros)
+        self.src = array("q", zeros)
+        self.dst = array("q", zeros)
+        self.ack = array("q", zeros)
+        self.current_time = array(time_type, zeros)
+        self._next = 0  # First row which has never been used
+        # 1 for the rows of live packets.
+        self._live = bytearray(capacity)
+        self._free: List[int] = []
+        self.names: List[Any] = []
+        """Sources and destinations by id."""
+        self._ids: Dict[Any, int] = {}
+        # The defaults of Packet.
+        self.intern("source")
+        self.intern("destination")
+
+    def __len__(self) -> int:
+        """Number of packets in the table."""
+        return self._next - len(self._free)
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows."""
+        return len(self.time)
+
+    def intern(self, name: Any) -> int:
+        """Return the id of the source or destination *name*."""
+        try:
+            return self._ids[name]
+        except KeyError:
+            self._ids[name] = len(self.names)
+            self.names.append(name)
+            return len(self.names) - 1
+
+    def new(
+        self,
+        time: SimTime,
+        size: int,
+        packet_id: PacketId,
+        src: int = 0,
+        dst: int = 1,
+        flow_id: FlowId = 0,
+    ) -> int:
+        """Add a packet and return its handle. *src* and *dst* are ids
+        returned by :meth:`intern`, by default those of ``"source"`` and
+        ``"destination"``."""
+        if self._free:
+            handle = self._free.pop()
+        else:
+            handle = self._next
+            if handle == len(self.time):
+                self._grow()
+            self._next = handle + 1
+        self._live[handle] = 1
+        self.time[handle] = time
+        self.size[handle] = size
+        self.packet_id[handle] = packet_id
+        self.flow_id[handle] = flow_id
+        self.src[handle] = src
+        self.dst[handle] = dst
+        self.ack[handle] = 0
+        self.current_time[handle] = 0
+        return handle
+
+    def free(self, handle: int) -> None:
+        """Release the row of the packet *handle* for a new packet. Raise a
+        :exc:`ValueError` if the row is not in use, e.g. because it has
+        already been freed."""
+        if not 0 <= handle < self._next or not self._live[handle]:
+            raise ValueError(f"packet {handle} is not in the table")
+        self._live[handle] = 0
+        self._free.append(handle)
+
+    def _grow(self) -> None:
+        """Double the number of rows."""
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column.extend(column)
+        self._live.extend(bytes(len(self._live)))
+
+    def packet(self, handle: int) -> Packet:
+        """Return a :class:`Packet` with the fields of the packet *handle*,
+        e.g. for printing it."""
+        packet = Packet(
+            self.time[handle],
+            self.size[handle],
+            self.packet_id[handle],
+            src=self.names[self.src[handle]],
+            dst=self.names[self.dst[handle]],
+            flow_id=self.flow_id[handle],
+        )
+        packet.ack = self.ack[handle]
+        packet.current_time = self.current_time[handle]
+        return packet
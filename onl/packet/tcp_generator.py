@@ -174,6 +174,15 @@ class TCPCubic(CongestionControl):
 
 
 class TCPPacketGenerator(Device, OutMixIn):
+    """Sends the packets of *flow* with TCP congestion control *cc*.
+
+    The start and finish times of the flow are simulation times. The
+    arrival distribution of the flow, *rtt_estimate* and the RTT samples
+    passed to *cc* are in seconds, also in integer tick mode (see
+    :meth:`~sim.Environment.to_ticks`).
+
+    """
+
     def __init__(
         self,
         env: Environment,
@@ -235,7 +244,7 @@ class TCPPacketGenerator(Device, OutMixIn):
                 # retrieving more packets from the application-layer flow
                 if self.flow.arrival_dist:
                     # if the flow has an arrival distribution, wait for the next arrival
-                    wait_time = self.flow.arrival_dist() - (
+                    wait_time = env.to_ticks(self.flow.arrival_dist()) - (
                         self.env.now - self.last_arrival
                     )
                     if wait_time > 0:
@@ -284,7 +293,7 @@ class TCPPacketGenerator(Device, OutMixIn):
                 self.next_seq += packet.size
                 self.timers[packet.packet_id] = Timer(
                     env,
-                    timeout=self.rto,
+                    timeout=self._rto_ticks(),
                     timeout_callback=self.timeout_callback,
                     args=packet.packet_id
                 )
@@ -308,7 +317,12 @@ class TCPPacketGenerator(Device, OutMixIn):
 
         # start a new timer for this segment and doubling the RTO
         self.rto *= 2
-        self.timers[packet_id].restart(self.rto)
+        self.timers[packet_id].restart(self._rto_ticks())
+
+    def _rto_ticks(self) -> float:
+        """Return the retransmission timeout in simulation time."""
+        # At least one tick, the timers need a positive timeout.
+        return self.env.to_ticks(self.rto) or 1
 
     def put(self, ack: Packet):
         """Upon receiving an acknowledgement packet"""
@@ -316,6 +330,10 @@ class TCPPacketGenerator(Device, OutMixIn):
         assert ack.flow_id >= 10000
 
         ackno = ack.ack
+        ack_time = ack.time
+        ack_id = ack.packet_id
+        # the ack ends here
+        ack.release()
         if ackno == self.last_ack:
             self.dupack += 1
         else:
@@ -336,7 +354,7 @@ class TCPPacketGenerator(Device, OutMixIn):
 
         if self.dupack == 0:
             # new ack received, update the RTT estimate and the retransmission timout
-            sample_rtt = self.env.now - ack.time
+            sample_rtt = self.env.to_seconds(self.env.now - ack_time)
 
             # Congestion Avoidance and Control
             sample_err = sample_rtt - self.rtt_estimate
@@ -345,7 +363,9 @@ class TCPPacketGenerator(Device, OutMixIn):
             self.rto = self.rtt_estimate + 4 * self.est_deviation
 
             self.last_ack = ackno
-            self.congestion_control.ack_received(sample_rtt, self.env.now)
+            self.congestion_control.ack_received(
+                sample_rtt, self.env.to_seconds(self.env.now)
+            )
 
             self.dprint(
                 f"Ack received till sequence number {ackno} at time {self.env.now:.4f}."
@@ -354,10 +374,10 @@ class TCPPacketGenerator(Device, OutMixIn):
                 f"Congestion window size = {self.congestion_control.cwnd:.1f}, last ack = {ackno}."
             )
 
-            if ack.packet_id in self.timers:
-                self.timers[ack.packet_id].stop()
-                del self.timers[ack.packet_id]
-                del self.sent_packets[ack.packet_id]
+            if ack_id in self.timers:
+                self.timers[ack_id].stop()
+                del self.timers[ack_id]
+                del self.sent_packets[ack_id]
 
             self.cwnd_avaialbe.put(True)
 
@@ -1,5 +1,8 @@
+from typing import Optional
+
 from .sink import PacketSink
 from .packet import Packet
+from .pool import PacketPool
 from ..sim import Environment
 from ..device import OutMixIn
 
@@ -13,10 +16,14 @@ class TCPSink(PacketSink, OutMixIn):
         rec_waits: bool = True,
         rec_flow_ids: bool = True,
         debug: bool = False,
+        pool: Optional[PacketPool] = None,
     ):
         super().__init__(
             env, rec_arrivals, absolute_arrivals, rec_waits, rec_flow_ids, debug
         )
+        self.pool = pool
+        """If set, acknowledgements are taken from this pool. They are
+        released by the :class:`TCPPacketGenerator` receiving them."""
         self.recv_buffer = list()
         self.next_seq_expected = 0
 
@@ -36,8 +43,6 @@ class TCPSink(PacketSink, OutMixIn):
         self.recv_buffer = merge_stats
 
     def put(self, packet: Packet):
-        super().put(packet)
-
         self.packet_arrived(packet)
 
         if len(self.recv_buffer) == 1:
@@ -51,13 +56,24 @@ class TCPSink(PacketSink, OutMixIn):
             self.next_seq_expected = self.recv_buffer[0][1]
 
 
-        acknowledgement = Packet(
-            packet.time,
-            size=40,
-            packet_id=packet.packet_id,
-            flow_id=packet.flow_id + 10000,
-        )
+        if self.pool is None:
+            acknowledgement = Packet(
+                packet.time,
+                size=40,
+                packet_id=packet.packet_id,
+                flow_id=packet.flow_id + 10000,
+            )
+        else:
+            acknowledgement = self.pool.acquire(
+                packet.time,
+                size=40,
+                packet_id=packet.packet_id,
+                flow_id=packet.flow_id + 10000,
+            )
         acknowledgement.ack = self.next_seq_expected
 
+        # Records the packet, which may release it.
+        super().put(packet)
+
         assert self.out is not None
         self.out.put(acknowledgement)
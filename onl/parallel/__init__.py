@@ -0,0 +1,30 @@
+from .decompose import find_components, run_decomposed
+from .pdes import (
+    BoundaryWire,
+    LogicalProcess,
+    ParallelSimulation,
+    run_sequential,
+)
+from .replication import (
+    Replication,
+    ReplicationResult,
+    ReplicationRunner,
+    RunningStats,
+    run_replication,
+    sink_statistics,
+)
+
+__all__ = [
+    "find_components",
+    "run_decomposed",
+    "BoundaryWire",
+    "LogicalProcess",
+    "ParallelSimulation",
+    "run_sequential",
+    "Replication",
+    "ReplicationResult",
+    "ReplicationRunner",
+    "RunningStats",
+    "run_replication",
+    "sink_statistics",
+]
@@ -0,0 +1,298 @@
+"""
+Decomposition of a model into independent sub-simulations.
+
+Devices which are not connected by any path in the device graph never
+exchange packets, so their groups can be simulated separately. The model is
+built once as usual; :func:`run_decomposed` then forks one worker process per
+group (connected component), which discards the events of all other groups
+and runs the simulation. Afterwards, the recorded data of the sinks of each
+group is copied back into the sinks of the parent process.
+
+"""
+import os
+import warnings
+from collections import defaultdict
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..packet import PacketSink
+from ..sim import Environment, Mailbox, Process, SimTime, Store
+from ..sim.events import BulkInitialize, ScheduledCall
+
+LINK_ATTRIBUTES = (
+    "out",
+    "outs",
+    "out1",
+    "out2",
+    "default_out",
+    "ends",
+    "ports",
+    "egress_ports",
+    "endpoints",
+    "demux",
+)
+"""Attributes which refer to downstream (or contained) devices."""
+
+
+def _neighbors(device: Any) -> Iterable[Any]:
+    for name in LINK_ATTRIBUTES:
+        value = getattr(device, name, None)
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            values: Iterable[Any] = value.values()
+        elif isinstance(value, (list, tuple)):
+            values = value
+        else:
+            values = (value,)
+        for other in values:
+            if other is not None and hasattr(other, "put"):
+                yield other
+
+
+def find_components(roots: Iterable[Any]) -> List[List[Any]]:
+    """Return the connected components of the device graph reachable from
+    *roots* (e.g. all packet generators), ignoring the direction of links.
+
+    The devices of a component are listed in the order they are found, the
+    components in the order of their first root.
+
+    """
+    index: Dict[int, int] = {}
+    devices: List[Any] = []
+    parent: List[int] = []
+
+    def add(device: Any) -> int:
+        key = id(device)
+        if key not in index:
+            index[key] = len(devices)
+            devices.append(device)
+            parent.append(len(parent))
+        return index[key]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    stack = list(roots)
+    for device in stack:
+        add(device)
+    while stack:
+        device = stack.pop()
+        i = add(device)
+        for other in _neighbors(device):
+            seen = id(other) in index
+            j = add(other)
+            a, b = find(i), find(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+            if not seen:
+                stack.append(other)
+
+    components: Dict[int, List[Any]] = {}
+    for i, device in enumerate(devices):
+        components.setdefault(find(i), []).append(device)
+    return list(components.values())
+
+
+def _process_owner(process: Process) -> Any:
+    """Return the device running *process*, or None if unknown."""
+    frame = getattr(process._generator, "gi_frame", None)
+    if frame is None:
+        return process
+    return frame.f_locals.get("self")
+
+
+def _owner(event: Any) -> Any:
+    """Return the device which will handle *event*, or None if unknown."""
+    if isinstance(event, ScheduledCall):
+        owner = getattr(event._fn, "__self__", None)
+    else:
+        owner = None
+        for callback in event.callbacks or ():
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, Process):
+                owner = _process_owner(owner)
+            if owner is not None:
+                break
+    # Deliveries of queued packets belong to the device waiting for them.
+    if isinstance(owner, Mailbox):
+        return _owner(owner._receive)
+    if isinstance(owner, Store):
+        return next((_owner(get) for get in owner.get_queue), None)
+    return owner
+
+
+def _sink_state(sink: PacketSink) -> Dict[str, Any]:
+    """Return the recorded data of *sink*. Other attributes (the environment,
+    stores, ...) are left out."""
+    state = {}
+    for name, value in vars(sink).items():
+        if isinstance(value, defaultdict):
+            # Default dicts with lambdas as factory can't be pickled.
+            state[name] = dict(value)
+        elif isinstance(value, (dict, list, int, float, str)):
+            state[name] = value
+    return state
+
+
+def _restore_sink(sink: PacketSink, state: Dict[str, Any]) -> None:
+    for name, value in state.items():
+        current = getattr(sink, name, None)
+        if isinstance(current, defaultdict):
+            current.clear()
+            current.update(value)
+        else:
+            setattr(sink, name, value)
+
+
+def _assignments(
+    env: Environment, owners: Dict[int, int]
+) -> Iterator[Tuple[Any, Optional[int]]]:
+    """Yield the scheduled events, and the processes started by
+    :class:`BulkInitialize` events, with the index of their component, or
+    None if their owner is unknown. Events without callbacks are left out,
+    they don't have any effect."""
+    for item in list(env._queue) + list(env._urgent) + list(env._normal):
+        event = item[3]
+        if event._cancelled:
+            continue
+        if isinstance(event, BulkInitialize):
+            for process in event.processes:
+                yield process, owners.get(id(_process_owner(process)))
+        elif isinstance(event, ScheduledCall) or event.callbacks:
+            yield event, owners.get(id(_owner(event)))
+
+
+def _run_component(
+    env: Environment,
+    component: List[Any],
+    owners: Dict[int, int],
+    index: int,
+    until: Optional[SimTime],
+) -> List[Dict[str, Any]]:
+    """Discard the events of the other components, run the simulation and
+    return the state of the sinks of *component*. Events of unknown owners
+    are kept in the first component only."""
+    processes = set()
+    for event, owner in _assignments(env, owners):
+        if owner is None:
+            owner = 0
+        if isinstance(event, Process):
+            if owner == index:
+                processes.add(event)
+        elif owner != index:
+            event.cancel()
+    for item in list(env._queue) + list(env._urgent) + list(env._normal):
+        event = item[3]
+        if isinstance(event, BulkInitialize):
+            # Only start the processes of this component.
+            event.processes = [
+                process for process in event.processes
+                if process in processes
+            ]
+    env.run(until=until)
+    return [
+        _sink_state(device)
+        for device in component
+        if isinstance(device, PacketSink)
+    ]
+
+
+def run_decomposed(
+    env: Environment,
+    roots: Iterable[Any],
+    until: Optional[SimTime] = None,
+    max_workers: Optional[int] = None,
+) -> List[List[Any]]:
+    """Run the model in *env* with one worker process per connected component
+    of the device graph reachable from *roots* and return the components.
+
+    The parent's *env* is not advanced; only the sinks (instances of
+    :class:`~packet.PacketSink`) receive the data recorded by the workers.
+    Events which can't be attributed to a device of a component (e.g. of
+    monitors or stand-alone processes) are only run by the worker of the
+    first component, and a :exc:`RuntimeWarning` is issued. Their owner is
+    found by inspecting the callbacks of the events, which is a heuristic.
+
+    Components draw from the global :mod:`random` module in a different
+    order than a single run does. Pass separate random streams (the *rng*
+    arguments of the devices) to get the same results.
+
+    Only available on platforms which support ``os.fork()``.
+
+    """
+    if not hasattr(os, "fork"):
+        raise NotImplementedError("run_decomposed requires os.fork()")
+    components = find_components(roots)
+    owners = {
+        id(device): index
+        for index, component in enumerate(components)
+        for device in component
+    }
+    unknown = sum(
+        1 for _, owner in _assignments(env, owners) if owner is None
+    )
+    if unknown:
+        warnings.warn(
+            f"scheduled events without a known component ({unknown}) only "
+            f"run in the worker of the first component",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    max_workers = max_workers or os.cpu_count() or 1
+
+    running: Dict[Connection, int] = {}
+    pids: List[int] = []
+    states: List[Optional[List[Dict[str, Any]]]] = [None] * len(components)
+    pending = list(range(len(components)))
+
+    def start(index: int) -> None:
+        conn, child_conn = Pipe(duplex=False)
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            try:
+                child_conn.send(
+                    (True, _run_component(
+                        env, components[index], owners, index, until
+                    ))
+                )
+            except BaseException as exc:
+                child_conn.send((False, exc))
+            finally:
+                os._exit(0)
+        child_conn.close()
+        running[conn] = index
+        pids.append(pid)
+
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                start(pending.pop(0))
+            for conn in wait(list(running)):
+                index = running.pop(conn)  # type: ignore
+                try:
+                    ok, value = conn.recv()  # type: ignore
+                except EOFError:
+                    ok, value = False, RuntimeError(
+                        f"worker of component {index} exited unexpectedly"
+                    )
+                conn.close()  # type: ignore
+                if not ok:
+                    raise value
+                states[index] = value
+    finally:
+        for conn in running:
+            conn.close()
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+    for component, state in zip(components, states):
+        sinks = [d for d in component if isinstance(d, PacketSink)]
+        for sink, sink_state in zip(sinks, state or []):
+            _restore_sink(sink, sink_state)
+    return components
@@ -0,0 +1,379 @@
+"""
+Conservative parallel simulation of a partitioned network.
+
+The nodes of the network are assigned to logical processes (LPs). Every LP
+builds and simulates its part of the network in its own
+:class:`~sim.core.Environment` in a separate OS process. Packets crossing the
+partition boundary travel over wires with a constant propagation delay; the
+smallest of these delays is the lookahead. The LPs are synchronized in
+YAWNS-style windows: if ``T`` is the time of the earliest pending event in
+any LP, no LP can receive a packet before ``T + lookahead``, so all LPs can
+process their events before that time independently. The packets sent in a
+window are exchanged afterwards.
+
+"""
+import multiprocessing
+import random
+import traceback
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ..device import Device
+from ..netdev import Wire
+from ..packet import Packet, PacketSink
+from ..sim import Environment, SimTime
+from ..sim.core import Infinity
+from .replication import sink_statistics
+
+Node = Hashable
+Link = Tuple[Node, Node]
+# (delivery time, sending LP, sequence number of the sender, link, packet)
+Message = Tuple[SimTime, int, int, Link, Packet]
+
+
+class BoundaryWire(Device):
+    """Sending end of a wire whose receiving node belongs to another LP.
+
+    Like a :class:`~netdev.Wire` with a constant *delay*, every packet which
+    is not lost arrives *delay* after it has been put into the wire.
+
+    """
+
+    def __init__(
+        self,
+        lp: "LogicalProcess",
+        link: Link,
+        delay: SimTime,
+        loss_rate: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.lp = lp
+        self.link = link
+        self.delay = delay
+        self.loss_rate = loss_rate
+        self.rng = rng if rng is not None else random
+        self.packets_rec = 0
+
+    def put(self, packet: Packet):
+        self.packets_rec += 1
+        if not self.loss_rate or self.rng.uniform(0, 1) >= self.loss_rate:
+            self.lp._send(self.link, self.lp.env.now + self.delay, packet)
+
+
+class LogicalProcess:
+    """Part of a partitioned network model, handed to the model builder.
+
+    *partition* maps every node to the index of the LP owning it; without a
+    partition the LP owns all nodes, which is how the model is run
+    sequentially. The builder creates the devices of the nodes for which
+    :meth:`owns` is True and connects nodes with :meth:`wire` and
+    :meth:`connect`, which hide whether a link crosses the partition
+    boundary.
+
+    """
+
+    def __init__(
+        self,
+        index: int = 0,
+        partition: Optional[Mapping[Node, int]] = None,
+        seed: Union[int, str] = 0,
+    ):
+        self.index = index
+        self.partition = partition
+        self.seed = seed
+        self.env = Environment()
+        self.lookahead: SimTime = Infinity
+        """Smallest delay of the boundary wires of this LP."""
+        self._wires: Dict[Link, Wire] = {}
+        self._receivers: Dict[Link, Device] = {}
+        self._outbox: List[Message] = []
+        self._sent = 0
+        self._rngs: Dict[str, random.Random] = {}
+
+    def owns(self, node: Node) -> bool:
+        """Return True if the devices of *node* are simulated by this LP."""
+        return self.partition is None or self.partition[node] == self.index
+
+    def rng(self, name: str) -> random.Random:
+        """Return the random stream *name*. The stream does not depend on the
+        partitioning, so the sequential and the parallel run draw the same
+        numbers."""
+        try:
+            return self._rngs[name]
+        except KeyError:
+            rng = self._rngs[name] = random.Random(f"{self.seed}:{name}")
+            return rng
+
+    def wire(
+        self,
+        src: Node,
+        dst: Node,
+        delay: SimTime,
+        loss_rate: Optional[float] = None,
+    ) -> Device:
+        """Create the wire from *src*, which has to be owned by this LP, to
+        *dst* with a constant propagation *delay* and return it. The receiving
+        device is set with :meth:`connect`."""
+        if not self.owns(src):
+            raise ValueError(f"node {src} is not owned by LP {self.index}")
+        link = (src, dst)
+        rng = self.rng(f"wire:{src}->{dst}")
+        if not self.owns(dst):
+            if delay <= 0:
+                raise ValueError("boundary wires need a positive delay")
+            self.lookahead = min(self.lookahead, delay)
+            return BoundaryWire(self, link, delay, loss_rate, rng)
+        wire = Wire(self.env, lambda: delay, loss_rate, rng=rng)
+        self._wires[link] = wire
+        if link in self._receivers:
+            wire.out = self._receivers[link]
+        return wire
+
+    def connect(self, src: Node, dst: Node, device: Device) -> None:
+        """Set *device* of *dst*, which has to be owned by this LP, as the
+        receiver of the wire from *src* to *dst*."""
+        if not self.owns(dst):
+            raise ValueError(f"node {dst} is not owned by LP {self.index}")
+        link = (src, dst)
+        self._receivers[link] = device
+        if link in self._wires:
+            self._wires[link].out = device
+
+    def _send(self, link: Link, at: SimTime, packet: Packet) -> None:
+        self._outbox.append((at, self.index, self._sent, link, packet))
+        self._sent += 1
+
+    def _deliver(self, messages: List[Message]) -> None:
+        # The messages are sorted, so events at the same time are always
+        # scheduled in the same order.
+        for at, _, _, link, packet in messages:
+            self.env.call_at(at, self._receivers[link].put, packet)
+
+
+ModelBuilder = Callable[[LogicalProcess], Mapping[str, PacketSink]]
+
+
+def _collect(sinks: Mapping[str, PacketSink]) -> Dict[str, float]:
+    stats = {}
+    for name, sink in sinks.items():
+        for key, value in sink_statistics(sink).items():
+            stats[f"{name}.{key}"] = value
+    return stats
+
+
+def run_sequential(
+    builder: ModelBuilder,
+    until: Optional[SimTime] = None,
+    seed: Union[int, str] = 0,
+) -> Dict[str, float]:
+    """Build the whole model in one LP, run it and return the sink
+    statistics. This is the reference for :class:`ParallelSimulation`."""
+    lp = LogicalProcess(seed=seed)
+    sinks = builder(lp)
+    lp.env.run(until=until)
+    return _collect(sinks)
+
+
+class RemoteTraceback(Exception):
+    """Traceback of an exception raised in the OS process of an LP, attached
+    as the cause of the exception re-raised by the coordinator."""
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+class _Failure:
+    """Reply of an LP whose builder or simulation raised an exception."""
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+        self.traceback = traceback.format_exc()
+
+
+def _lp_main(
+    conn: Any,
+    builder: ModelBuilder,
+    partition: Mapping[Node, int],
+    index: int,
+    seed: Union[int, str],
+) -> None:
+    """Run an LP and send its exception to the coordinator if it fails."""
+    try:
+        _run_lp(conn, builder, partition, index, seed)
+    except BaseException as exc:
+        failure = _Failure(exc)
+        try:
+            try:
+                conn.send(failure)
+            except OSError:
+                raise
+            except Exception:
+                # The exception can't be pickled.
+                failure.exc = RuntimeError(repr(exc))
+                conn.send(failure)
+        except OSError:
+            # The coordinator has stopped.
+            pass
+        conn.close()
+
+
+def _run_lp(
+    conn: Any,
+    builder: ModelBuilder,
+    partition: Mapping[Node, int],
+    index: int,
+    seed: Union[int, str],
+) -> None:
+    """Main loop of the OS process of an LP."""
+    lp = LogicalProcess(index, partition, seed)
+    env = lp.env
+    sinks = builder(lp)
+    conn.send((lp.lookahead, env.peek()))
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        messages, end = request
+        lp._deliver(messages)
+        if end == Infinity:
+            env.run()
+        elif end > env.now:
+            env.run(until=end)
+        outbox, lp._outbox = lp._outbox, []
+        conn.send((outbox, env.peek()))
+    conn.send(_collect(sinks))
+    conn.close()
+
+
+class ParallelSimulation:
+    """Simulate the model built by *builder* with one OS process per LP.
+
+    *partition* maps every node to an LP index (see e.g.
+    :func:`~topo.partition_fattree`). *builder* is called with the
+    :class:`LogicalProcess` of each LP and returns a mapping of names to the
+    sinks it created; the names have to be unique over all LPs. The builder
+    is sent to the processes, so it has to be a module level function.
+
+    For deterministic models, :meth:`run` returns the same statistics as
+    :func:`run_sequential`, as long as no two events at the same time depend
+    on their relative order across the boundary.
+
+    """
+
+    def __init__(
+        self,
+        builder: ModelBuilder,
+        partition: Mapping[Node, int],
+        seed: Union[int, str] = 0,
+    ):
+        self.builder = builder
+        self.partition = dict(partition)
+        self.seed = seed
+        self.nlps = max(self.partition.values()) + 1
+        self.lookahead: SimTime = Infinity
+        self.rounds = 0
+        """Number of synchronization windows of the last run."""
+        self.messages = 0
+        """Number of packets which crossed the boundary in the last run."""
+
+    def run(self, until: Optional[SimTime] = None) -> Dict[str, float]:
+        """Run the simulation until *until* (or until no events are left)
+        and return the merged sink statistics."""
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        conns, procs = [], []
+        for index in range(self.nlps):
+            conn, child_conn = ctx.Pipe()
+            proc = ctx.Process(
+                target=_lp_main,
+                args=(child_conn, self.builder, self.partition, index, self.seed),
+                daemon=True,
+            )
+            proc.start()
+            child_conn.close()
+            conns.append(conn)
+            procs.append(proc)
+
+        try:
+            return self._coordinate(conns, until)
+        except BaseException:
+            # The other LPs wait for the coordinator, which won't come.
+            for proc in procs:
+                proc.terminate()
+            raise
+        finally:
+            for conn in conns:
+                conn.close()
+            for proc in procs:
+                proc.join()
+
+    @staticmethod
+    def _recv(conn: Any, index: int) -> Any:
+        """Return the next reply of LP *index*. Re-raise the exception of a
+        failed LP."""
+        try:
+            reply = conn.recv()
+        except EOFError:
+            raise RuntimeError(f"LP {index} exited unexpectedly") from None
+        if isinstance(reply, _Failure):
+            reply.exc.__cause__ = RemoteTraceback(
+                f"\n\nTraceback of LP {index}:\n{reply.traceback}"
+            )
+            raise reply.exc
+        return reply
+
+    def _coordinate(
+        self, conns: List[Any], until: Optional[SimTime]
+    ) -> Dict[str, float]:
+        recv = self._recv
+        horizon = Infinity if until is None else until
+        replies = [recv(conn, index) for index, conn in enumerate(conns)]
+        self.lookahead = min(lookahead for lookahead, _ in replies)
+        peeks = [peek for _, peek in replies]
+        inboxes: List[List[Message]] = [[] for _ in conns]
+        self.rounds = self.messages = 0
+
+        while True:
+            start = min(
+                [min(peeks)] + [inbox[0][0] for inbox in inboxes if inbox]
+            )
+            if start >= horizon or start == Infinity:
+                break
+            end = min(start + self.lookahead, horizon)
+            for conn, inbox in zip(conns, inboxes):
+                conn.send((inbox, end))
+            outboxes = []
+            for index, conn in enumerate(conns):
+                outbox, peeks[index] = recv(conn, index)
+                outboxes.append(outbox)
+            inboxes = [[] for _ in conns]
+            for outbox in outboxes:
+                for message in outbox:
+                    inboxes[self.partition[message[3][1]]].append(message)
+                self.messages += len(outbox)
+            for inbox in inboxes:
+                inbox.sort(key=lambda message: message[:3])
+            self.rounds += 1
+
+        # Let every LP reach the horizon, like Environment.run(until).
+        if until is not None:
+            for conn in conns:
+                conn.send(([], until))
+            for index, conn in enumerate(conns):
+                recv(conn, index)
+
+        stats: Dict[str, float] = {}
+        for conn in conns:
+            conn.send(None)
+        for index, conn in enumerate(conns):
+            stats.update(recv(conn, index))
+        return stats
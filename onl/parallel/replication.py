@@ -0,0 +1,191 @@
+"""
+Independent replications of a simulation model in a process pool.
+
+Every replication builds its own model with a factory function. Random
+numbers are drawn from streams which only depend on the base seed, the index
+of the replication and the name of the stream, so the results do not depend
+on the number of worker processes or on the order in which the replications
+finish.
+
+"""
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Union
+
+from ..packet import PacketSink
+from ..sim import Environment, SimTime
+
+
+class Replication:
+    """Context of a single replication which is handed to the model factory.
+
+    The factory creates its components in :attr:`env` and passes
+    ``replication.rng(name)`` to components which draw random numbers, e.g.
+    ``Wire(env, delay_dist, loss_rate, rng=replication.rng("wire0"))``.
+    Before the factory is called, the global :mod:`random` module is seeded
+    for the replication as well, so distributions like
+    ``lambda: random.expovariate(1.0)`` are reproducible, too.
+
+    """
+
+    def __init__(self, index: int, seed: Union[int, str] = 0):
+        self.index = index
+        self.seed = seed
+        self.env = Environment()
+        self._rngs: Dict[str, random.Random] = {}
+        random.seed(self._stream_seed("global"))
+
+    def _stream_seed(self, name: str) -> str:
+        # String seeds are hashed with SHA-512, the result does not depend on
+        # PYTHONHASHSEED.
+        return f"{self.seed}:{self.index}:{name}"
+
+    def rng(self, name: str) -> random.Random:
+        """Return the random stream *name* of this replication. Asking for the
+        same name twice returns the same stream."""
+        try:
+            return self._rngs[name]
+        except KeyError:
+            rng = self._rngs[name] = random.Random(self._stream_seed(name))
+            return rng
+
+
+Sinks = Union[PacketSink, Mapping[str, PacketSink]]
+ModelFactory = Callable[[Replication], Sinks]
+
+
+def sink_statistics(sink: PacketSink) -> Dict[str, float]:
+    """Summarize a sink: received packets and bytes and, if waits are
+    recorded, the mean wait of all packets."""
+    stats = {
+        "packets": float(sum(sink.packets_received.values())),
+        "bytes": float(sum(sink.bytes_received.values())),
+    }
+    waits = [wait for flow_waits in sink.waits.values() for wait in flow_waits]
+    if waits:
+        stats["mean_wait"] = sum(waits) / len(waits)
+    return stats
+
+
+class ReplicationResult(NamedTuple):
+    index: int
+    stats: Dict[str, float]
+    """Sink statistics as ``"<sink name>.<statistic>"``."""
+
+
+def run_replication(
+    factory: ModelFactory,
+    until: SimTime,
+    index: int,
+    seed: Union[int, str] = 0,
+) -> ReplicationResult:
+    """Build the model of replication *index* with *factory*, run it until
+    *until* and collect the statistics of the sinks returned by *factory*."""
+    replication = Replication(index, seed)
+    sinks = factory(replication)
+    replication.env.run(until=until)
+    if isinstance(sinks, PacketSink):
+        sinks = {"sink": sinks}
+    stats = {}
+    for name, sink in sinks.items():
+        for key, value in sink_statistics(sink).items():
+            stats[f"{name}.{key}"] = value
+    return ReplicationResult(index, stats)
+
+
+class RunningStats:
+    """Mean and variance of a sequence of values, updated one value at a
+    time (Welford's algorithm)."""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, 0 for less than two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def ci95(self) -> float:
+        """Half width of the 95% confidence interval of the mean (normal
+        approximation)."""
+        if not self.count:
+            return math.inf
+        return 1.96 * self.stdev / math.sqrt(self.count)
+
+    def __repr__(self) -> str:
+        return (
+            f"RunningStats(count={self.count}, mean={self.mean:.6g}, "
+            f"ci95={self.ci95:.3g})"
+        )
+
+
+class ReplicationRunner:
+    """Run independent replications of the model built by *factory* in a
+    :class:`~concurrent.futures.ProcessPoolExecutor`.
+
+    *factory* is called with a :class:`Replication` and returns the sink or a
+    mapping of names to the sinks whose statistics are collected. It is sent
+    to the worker processes, so it has to be a module level function.
+
+    Usage::
+
+        runner = ReplicationRunner(build_model, until=1000, seed=42)
+        for result in runner.run(30):
+            print(result.index, runner.summary["sink.mean_wait"])
+
+    """
+
+    def __init__(
+        self,
+        factory: ModelFactory,
+        until: SimTime,
+        seed: Union[int, str] = 0,
+        max_workers: Optional[int] = None,
+    ):
+        self.factory = factory
+        self.until = until
+        self.seed = seed
+        self.max_workers = max_workers
+        self.summary: Dict[str, RunningStats] = {}
+        """Statistics aggregated over the finished replications."""
+
+    def run(
+        self, replications: int, start: int = 0
+    ) -> Iterator[ReplicationResult]:
+        """Run the replications *start* to ``start + replications - 1`` and
+        yield their results as they finish. :attr:`summary` is updated before
+        a result is yielded."""
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    run_replication, self.factory, self.until, index, self.seed
+                )
+                for index in range(start, start + replications)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                for key, value in result.stats.items():
+                    if key not in self.summary:
+                        self.summary[key] = RunningStats()
+                    self.summary[key].add(value)
+                yield result
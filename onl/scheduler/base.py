@@ -63,10 +63,10 @@ class Scheduler(Device, OutMixIn):
     def send_packet(self, packet: Packet):
         """Remove a packet from subqueue and send it to next hop.
         Usage:
-            yield env.process(self.send_packet(packet))
+            yield from self.send_packet(packet)
         """
         self.current_packet = packet
-        yield self.env.timeout(packet.size * 8.0 / self.rate)
+        yield self.env.timeout(self.env.to_ticks(packet.size * 8.0 / self.rate))
         flow_id = packet.flow_id
         self.queue_count[flow_id] -= 1
         self.queue_byte_size[flow_id] -= packet.size
@@ -126,7 +126,7 @@ class MultiQueueScheduler(Scheduler):
     def put(self, packet: Packet):
         flow_id = packet.flow_id
         if self.total_packets == 0:
-            self.packets_available.put(True)
+            self.packets_available.put_nowait(True)
         self.add_packet_to_queue(packet)
         self.dprint(f"received packet {packet.packet_id} from flow {flow_id}".format())
-        self.stores[flow_id].put(packet)
+        self.stores[flow_id].put_nowait(packet)
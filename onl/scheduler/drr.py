@@ -56,7 +56,7 @@ class DRR(MultiQueueScheduler):
                         assert class_id == self.flow2class(packet.flow_id)
 
                         if packet.size <= self.deficit[class_id]:
-                            yield env.process(self.send_packet(packet))
+                            yield from self.send_packet(packet)
                             self.deficit[class_id] -= packet.size
                             if self.queue_count[class_id] == 0:
                                 self.deficit[class_id] = 0.0
@@ -23,7 +23,7 @@ class Monitor:
 
     def run(self, env: Environment) -> ProcessGenerator:
         while True:
-            yield env.timeout(self.dist())
+            yield env.timeout(env.to_ticks(self.dist()))
             for flow_id in self.scheduler.all_flows():
                 total = self.scheduler.size(flow_id)
                 total_bytes = self.scheduler.byte_size(flow_id)
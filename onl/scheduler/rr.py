@@ -26,6 +26,6 @@ class RR(MultiQueueScheduler):
                     store = self.stores.get(flow_id)
                     assert store
                     packet: Packet = yield store.get()
-                    yield env.process(self.send_packet(packet))
+                    yield from self.send_packet(packet)
             if self.total_packets == 0:
                 yield self.packets_available.get()
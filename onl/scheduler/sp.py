@@ -31,6 +31,6 @@ class SP(MultiQueueScheduler):
                     packet: Packet = yield store.get()
                     print(packet)
                     packet.priorities[self.flow2class(packet.flow_id)] = prio
-                    yield env.process(self.send_packet(packet))
+                    yield from self.send_packet(packet)
             if self.total_packets == 0:
                 yield self.packets_available.get()
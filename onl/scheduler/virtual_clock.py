@@ -1,7 +1,7 @@
 from typing import Dict, Callable
 
 from ..types import *
-from ..sim import Environment, ProcessGenerator, PriorityStore, SimTime
+from ..sim import Environment, ProcessGenerator, PriorityMailbox, SimTime
 from ..packet import Packet
 from .base import Scheduler
 
@@ -24,7 +24,7 @@ class VC(Scheduler):
         """
         self.vc: Dict[ClassId, SimTime] = dict()
         self.aux_vc: Dict[ClassId, SimTime] = dict()
-        self.store = PriorityStore(env)
+        self.store = PriorityMailbox(env)
         for class_id in vticks.keys():
             self.aux_vc[class_id] = 0
             self.vc[class_id] = 0
@@ -33,15 +33,15 @@ class VC(Scheduler):
     def run(self, env: Environment) -> ProcessGenerator:
         while True:
             packet: Packet = yield self.store.get()
-            yield env.process(self.send_packet(packet))
+            yield from self.send_packet(packet)
 
     def put(self, packet: Packet):
         class_id = self.flow2class(packet.flow_id)
-        now = self.env.now
+        now = self.env.to_seconds(self.env.now)
         # upon receiving the first packet from flow_i,
         # VirtualClock_i <- real time
         if self.vc[class_id] == 0:
-            self.vc[class_id] = self.env.now
+            self.vc[class_id] = now
         # for each packet, update VC and auxVC
         self.aux_vc[class_id] = max(now, self.aux_vc[class_id])
         self.vc[class_id] = (
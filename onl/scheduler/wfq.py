@@ -1,7 +1,7 @@
 from typing import Dict, Set, Callable
 
 from ..types import *
-from ..sim import Environment, ProcessGenerator, SimTime, PriorityStore, PriorityItem
+from ..sim import Environment, ProcessGenerator, SimTime, PriorityMailbox, PriorityItem
 from ..packet import Packet
 from .base import Scheduler
 
@@ -31,7 +31,7 @@ class WFQ(Scheduler):
         """
         self.last_time: SimTime = 0.0
         """Clock time of most recent put and send operation"""
-        self.store = PriorityStore(env)
+        self.store = PriorityMailbox(env)
 
         self.action = env.process(self.run(env))
 
@@ -41,7 +41,7 @@ class WFQ(Scheduler):
         2. weights of current active set
         """
         weight_sum = 0.0
-        now = self.env.now
+        now = self.env.to_seconds(self.env.now)
         for i in self.active_set:
             weight_sum += self.weights[i]
         self.vtime += (now - self.last_time) / weight_sum
@@ -55,18 +55,18 @@ class WFQ(Scheduler):
         while True:
             item: PriorityItem = yield self.store.get()
             packet: Packet = item.item
-            yield env.process(self.send_packet(packet))
+            yield from self.send_packet(packet)
             self.update_vtime()
             class_id = self.flow2class(packet.flow_id)
             if self.queue_count[class_id] == 0:
                 self.active_set.remove(class_id)
             if len(self.active_set) == 0:
                 self.reset_vtime()
-            self.last_time = env.now
+            self.last_time = env.to_seconds(env.now)
 
     def put(self, packet: Packet):
         class_id = self.flow2class(packet.flow_id)
-        now = self.env.now
+        now = self.env.to_seconds(self.env.now)
         if len(self.active_set) == 0:
             self.reset_vtime()
         else:
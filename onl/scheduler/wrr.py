@@ -27,7 +27,7 @@ class WRR(MultiQueueScheduler):
                         store = self.stores.get(flow_id)
                         assert store
                         packet: Packet = yield store.get()
-                        yield env.process(self.send_packet(packet))
+                        yield from self.send_packet(packet)
                     else:
                         break
             if self.total_packets == 0:
@@ -6,22 +6,32 @@ from .exceptions import (
     Interrupt, StopProcess
 )
 from .events import (
-    Event, Timeout, Process, AllOf, AnyOf, ProcessGenerator
+    Event, Timeout, Process, AllOf, AnyOf, ProcessGenerator, ScheduledCall
 )
-from .rt import RealtimeEnvironment
+from .queues import EventQueue, HeapQueue, CalendarQueue
+from .rt import LagStats, RealtimeEnvironment
+from .aio import AsyncRealtimeEnvironment
+from .checkpoint import Snapshot
 from .resources.container import Container
 from .resources.resource import (
     Resource, PriorityResource, PreemptiveResource
 )
 from .resources.store import (
-    Store, PriorityStore, FilterStore, PriorityItem
+    Store, PriorityStore, FilterStore, PriorityItem, IndexedPriorityStore,
+    PriorityHandle, KeyedStore
 )
+from .resources.mailbox import Mailbox, PriorityMailbox
 
 __all__ = [
-    "Environment", "RealtimeEnvironment", "SimTime",
+    "Environment", "RealtimeEnvironment", "AsyncRealtimeEnvironment",
+    "LagStats", "SimTime", "Snapshot",
+    "EventQueue", "HeapQueue", "CalendarQueue",
     "Event", "Timeout", "Process", "AllOf", "AnyOf", "ProcessGenerator",
+    "ScheduledCall",
     "Interrupt", "StopProcess",
     "Container",
     "Resource", "PriorityResource", "PreemptiveResource",
-    "Store", "PriorityStore", "FilterStore", "PriorityItem"
+    "Store", "PriorityStore", "FilterStore", "PriorityItem",
+    "IndexedPriorityStore", "PriorityHandle", "KeyedStore",
+    "Mailbox", "PriorityMailbox"
 ]
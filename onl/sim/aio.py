@@ -0,0 +1,175 @@
+import asyncio
+from typing import Any, Callable, Optional, Union
+
+from .core import (
+    EmptySchedule,
+    Environment,
+    Infinity,
+    SimTime,
+    StopSimulation,
+)
+from .events import Event
+from .queues import EventQueue
+from .rt import LagStats
+
+
+class AsyncRealtimeEnvironment(Environment):
+    """Real-time environment which runs on an :mod:`asyncio` event loop.
+
+    Like :class:`~sim.rt.RealtimeEnvironment`, a time step takes *factor*
+    seconds of real time. Instead of blocking in :func:`time.sleep`, the
+    environment waits for the next event with :meth:`loop.call_at()
+    <asyncio.loop.call_at>`, so sockets and other coroutines on the same loop
+    are served in the meantime. Use :meth:`run_async` to run the simulation.
+
+    Other threads and I/O callbacks hand work to the simulation with
+    :meth:`inject`. The injected callable is invoked at the simulation time
+    corresponding to the current wall-clock time.
+
+    The environment starts to follow the wall clock when :meth:`run_async`
+    is called for the first time on a loop, or when :meth:`sync` is
+    called.
+
+    """
+
+    YIELD_EVERY = 64
+    """Number of overdue events processed before the loop gets the chance
+    to serve other callbacks."""
+
+    def __init__(
+        self,
+        initial_time: SimTime = 0,
+        factor: float = 1.0,
+        strict: bool = False,
+        queue: Optional[EventQueue] = None,
+        resolution: Optional[float] = None,
+    ):
+        Environment.__init__(
+            self, initial_time, queue, resolution=resolution
+        )
+        self.env_start = initial_time
+        self.real_start: Optional[float] = None
+        self._factor = factor
+        self._strict = strict
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Future] = None
+        self.lag = LagStats()
+        """Lags of the processed events."""
+
+    @property
+    def factor(self) -> float:
+        """Scaling factor of the real-time."""
+        return self._factor
+
+    @property
+    def strict(self) -> bool:
+        """If True, :meth:`run_async` raises a :exc:`RuntimeError` when
+        events are processed more than *factor* seconds late."""
+        return self._strict
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The event loop the environment is running on."""
+        return self._loop
+
+    def sync(self) -> None:
+        """Synchronize the simulation time with the current wall-clock time
+        of the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self.env_start = self._now
+        self.real_start = self._loop.time()
+
+    def real_time(self, time: SimTime) -> float:
+        """Return the loop time at which the simulation reaches *time*."""
+        assert self.real_start is not None
+        return (
+            self.real_start
+            + self.to_seconds(time - self.env_start) * self._factor
+        )
+
+    def wall_now(self) -> SimTime:
+        """Return the simulation time corresponding to the current
+        wall-clock time, but not earlier than :attr:`now`."""
+        assert self._loop is not None and self.real_start is not None
+        elapsed = (self._loop.time() - self.real_start) / self._factor
+        return max(self._now, self.env_start + self.to_ticks(elapsed))
+
+    def inject(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Call ``fn(*args)`` in the simulation at the current wall-clock
+        time. This method is thread-safe."""
+        if self._loop is None:
+            raise RuntimeError('The environment is not running')
+        self._loop.call_soon_threadsafe(self._inject, fn, args)
+
+    def _inject(self, fn: Callable[..., Any], args: Any) -> None:
+        self.call_at(self.wall_now(), fn, *args)
+        self._wake()
+
+    def _wake(self, *_: Any) -> None:
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _sleep_until(self, deadline: float) -> None:
+        """Sleep until the loop time *deadline* or until an event has been
+        injected."""
+        assert self._loop is not None
+        self._wakeup = self._loop.create_future()
+        handle = self._loop.call_at(deadline, self._wake)
+        try:
+            await self._wakeup
+        finally:
+            handle.cancel()
+            self._wakeup = None
+
+    async def run_async(
+        self, until: Optional[Union[SimTime, Event]] = None
+    ) -> Optional[Any]:
+        """Coroutine version of :meth:`~sim.core.Environment.run()` which
+        processes every event at its wall-clock time.
+
+        Without *until*, the coroutine returns once there are no scheduled
+        events left. Models with external input should pass *until* (or keep
+        an event scheduled) to stay alive while waiting for it.
+
+        """
+        if self._loop is not asyncio.get_running_loop():
+            self.sync()
+        if until is not None:
+            if isinstance(until, Event) and until.callbacks is None:
+                return until.value
+            until = self._stop_at(until)
+
+        steps = 0
+        try:
+            while True:
+                evt_time = self.peek()
+                if evt_time is Infinity:
+                    raise EmptySchedule()
+                deadline = self.real_time(evt_time)
+                lag = self._loop.time() - deadline  # type: ignore
+                if lag < 0:
+                    await self._sleep_until(deadline)
+                    # An event may have been injected in the meantime.
+                    continue
+                if self._strict and lag > self._factor:
+                    raise RuntimeError(
+                        f'Simulation too slow for real time ({lag:.3f}s).'
+                    )
+                self.lag.add(lag)
+                self.step()
+                steps += 1
+                if steps == self.YIELD_EVERY:
+                    # Don't starve the I/O of the loop if the simulation
+                    # lags behind.
+                    steps = 0
+                    await asyncio.sleep(0)
+        except StopSimulation as exc:
+            return exc.args[0]
+        except EmptySchedule:
+            if until is not None:
+                assert not until.triggered
+                raise RuntimeError(
+                    f'No scheduled events left but "until" event was not '
+                    f'triggered: {until}'
+                )
+        return None
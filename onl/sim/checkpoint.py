@@ -0,0 +1,180 @@
+"""
+Snapshots of a running simulation based on ``os.fork()``.
+
+Processes are suspended generators, which cannot be pickled. Instead of
+serializing the simulation, a :class:`Snapshot` forks a dormant copy of the
+whole interpreter. The copy shares all memory with its parent copy-on-write
+and serves as a template: every branch started from the snapshot is forked
+from it again and continues the simulation from exactly the state it had when
+the snapshot was taken, no matter what the parent did in the meantime.
+
+"""
+import os
+import pickle
+import traceback
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .core import Environment, SimTime
+
+
+class BranchError(Exception):
+    """Raised if a branch failed with an exception which could not be sent
+    back to the parent."""
+
+
+class Snapshot:
+    """Snapshot of *env* and everything else in the current process.
+
+    :meth:`run()` and :meth:`map()` call ``fn(env, *args)`` in branches which
+    start from the state of the snapshot, so a snapshot can be restored as
+    often as needed. The branches run in child processes, so *fn*, its
+    arguments and its result have to be picklable. Since the snapshot is a
+    copy of the process at the time it was taken, *fn* has to be defined
+    before.
+
+    Usage::
+
+        env.run(until=warmup)
+        with Snapshot(env) as snapshot:
+            results = snapshot.map(experiment, [(1,), (2,), (3,)])
+
+    Only available on platforms which support ``os.fork()``.
+
+    """
+
+    def __init__(self, env: Environment):
+        if not hasattr(os, 'fork'):
+            raise NotImplementedError('Snapshots require os.fork()')
+        self.env = env
+        self.time: SimTime = env.now
+        """Simulation time at which the snapshot was taken."""
+        conn, child_conn = Pipe()
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            code = 0
+            try:
+                self._serve(child_conn)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        child_conn.close()
+        self._conn: Optional[Connection] = conn
+        self._pid = pid
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # Don't leave the template process behind.
+        if getattr(self, '_conn', None) is not None:
+            self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._conn is None
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call ``fn(env, *args)`` in a branch started from the snapshot and
+        return its result."""
+        return self.map(fn, [args])[0]
+
+    def map(
+        self, fn: Callable[..., Any], args_list: Iterable[Tuple[Any, ...]]
+    ) -> List[Any]:
+        """Call ``fn(env, *args)`` for each tuple in *args_list*, each in its
+        own branch started from the snapshot. The branches run in parallel.
+
+        Return the results in the order of *args_list*. If a branch raises an
+        exception, it is re-raised here.
+
+        """
+        if self._conn is None:
+            raise RuntimeError('Snapshot has been closed')
+        self._conn.send((fn, list(args_list)))
+        results = self._conn.recv()
+        if isinstance(results, BaseException):
+            raise results
+        for ok, value in results:
+            if not ok:
+                raise value
+        return [value for _, value in results]
+
+    def close(self) -> None:
+        """Terminate the process holding the snapshot."""
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._conn.close()
+        self._conn = None
+        os.waitpid(self._pid, 0)
+
+    def _serve(self, conn: Connection) -> None:
+        """Main loop of the template process."""
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except EOFError:
+                return
+            try:
+                request = pickle.loads(data)
+            except Exception:
+                # E.g. fn has been defined after the snapshot was taken.
+                conn.send(BranchError(traceback.format_exc()))
+                continue
+            if request is None:
+                return
+            fn, args_list = request
+            conns = [self._branch(fn, args) for args in args_list]
+            results: List[Any] = [None] * len(conns)
+            # Receive in any order, so that no branch is kept waiting on a
+            # full pipe.
+            pending = dict(zip(conns, range(len(conns))))
+            while pending:
+                for ready in wait(list(pending)):
+                    index = pending.pop(ready)  # type: ignore
+                    try:
+                        results[index] = ready.recv()  # type: ignore
+                    except EOFError:
+                        results[index] = (
+                            False, BranchError('Branch exited unexpectedly')
+                        )
+                    ready.close()  # type: ignore
+            for _ in conns:
+                os.wait()
+            conn.send(results)
+
+    def _branch(
+        self, fn: Callable[..., Any], args: Tuple[Any, ...]
+    ) -> Connection:
+        """Fork a branch which calls ``fn(env, *args)`` and sends the result
+        to the returned connection."""
+        conn, child_conn = Pipe(duplex=False)
+        pid = os.fork()
+        if pid:
+            child_conn.close()
+            return conn
+        # Branch process.
+        conn.close()
+        try:
+            result: Tuple[bool, Any] = (True, fn(self.env, *args))
+        except BaseException as exc:
+            result = (False, exc)
+        try:
+            child_conn.send(result)
+        except Exception:
+            # The result or the exception can not be pickled.
+            child_conn.send(
+                (False, BranchError(''.join(traceback.format_exc())))
+            )
+        finally:
+            os._exit(0)
@@ -1,14 +1,19 @@
-from heapq import heappush, heappop
+import gc
+from collections import deque
+from contextlib import contextmanager
 from itertools import count
 from types import MethodType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
+    Deque,
+    Dict,
     Generic,
     Iterable,
+    Iterator,
     List,
     Optional,
-    Tuple,
     Type,
     TypeVar,
     Union,
@@ -17,14 +22,17 @@ from typing import (
 from .events import (
     AllOf,
     AnyOf,
+    BulkInitialize,
     Event,
     EventPriority,
     Process,
     ProcessGenerator,
+    ScheduledCall,
     Timeout,
     URGENT,
     NORMAL,
 )
+from .queues import EventQueue, HeapQueue, QueueItem
 
 
 Infinity: float = float('inf')  #: Convenience alias for infinity
@@ -69,11 +77,37 @@ class BoundClass(Generic[T]):
                 setattr(instance, name, bound_class)
 
 
+# Number of bulk() blocks which are active (in any environment) and whether
+# the garbage collector was enabled when the first of them started.
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _paused_gc() -> Iterator[None]:
+    """Pause the cyclic garbage collector until the last of possibly
+    overlapping blocks ends, then restore its previous state."""
+    global _gc_pauses, _gc_was_enabled
+    if not _gc_pauses:
+        _gc_was_enabled = gc.isenabled()
+        gc.disable()
+    _gc_pauses += 1
+    try:
+        yield
+    finally:
+        _gc_pauses -= 1
+        if not _gc_pauses and _gc_was_enabled:
+            gc.enable()
+
+
 class EmptySchedule(Exception):
     """Thrown by an Environment if there are no further events to be
     processed."""
 
 
+StepHook = Callable[[Event], None]
+
+
 class StopSimulation(Exception):
     """Indicates that the simulation should stop now."""
 
@@ -97,17 +131,74 @@ class Environment:
     You can provide an *initial_time* for the environment. By default, it
     starts at ``0``.
 
+    Scheduled events are kept in *queue*, an :class:`~sim.queues.EventQueue`
+    backend. By default a binary heap (:class:`~sim.queues.HeapQueue`) is
+    used, which is the fastest backend in most cases. A
+    :class:`~sim.queues.CalendarQueue` is an alternative with O(1) average
+    operations, but constant factors which rarely let it win in practice.
+
+    Events scheduled for the current time bypass the queue. They are
+    appended to a FIFO lane of their priority (:data:`~sim.events.URGENT` or
+    :data:`~sim.events.NORMAL`) and drained before time advances, which
+    yields the same order as the queue would.
+
+    Cancelled events (see :meth:`~sim.events.Event.cancel()`) stay in the
+    queue as tombstones and are skipped. Once the tombstones make up more than
+    *compact_ratio* of the queue, they are removed in one go.
+
+    If a *resolution* (in seconds) is given, the environment runs in integer
+    tick mode: the simulation time is an integer number of ticks of
+    *resolution* seconds, e.g. nanoseconds for ``resolution=1e-9``. Delays
+    have to be given in ticks then, which makes events that should be
+    simultaneous actually coincide and keeps the queue keys integral.
+    Models convert durations in seconds with :meth:`to_ticks()` and times
+    back to seconds with :meth:`to_seconds()`. Without a resolution both are
+    the identity.
+
     This class also provides aliases for common event types, for example
     :attr:`process`, :attr:`timeout` and :attr:`event`.
 
     """
 
-    def __init__(self, initial_time: SimTime = 0):
+    COMPACT_MIN_TOMBSTONES = 64
+    """Minimal number of tombstones before the queue is compacted."""
+
+    def __init__(
+        self,
+        initial_time: SimTime = 0,
+        queue: Optional[EventQueue] = None,
+        compact_ratio: float = 0.5,
+        resolution: Optional[float] = None,
+    ):
+        if not 0 < compact_ratio <= 1:
+            raise ValueError('"compact_ratio" must be in (0, 1].')
+        if resolution is not None:
+            if resolution <= 0:
+                raise ValueError('"resolution" must be > 0.')
+            if not isinstance(initial_time, int):
+                raise ValueError(
+                    '"initial_time" must be an integer number of ticks.'
+                )
+        self._resolution = resolution
         self._now = initial_time
-        self._queue: List[
-            Tuple[SimTime, EventPriority, int, Event]
-        ] = []  # The list of all currently scheduled events.
+        # The set of all currently scheduled events.
+        self._queue: EventQueue = HeapQueue() if queue is None else queue
+        self._push = self._queue.push
+        # Items scheduled inside of bulk(), None outside of it.
+        self._bulk: Optional[List[QueueItem]] = None
+        # Same-time lanes for events scheduled at the current time.
+        self._urgent: Deque[QueueItem] = deque()
+        self._normal: Deque[QueueItem] = deque()
+        self._lanes: Dict[EventPriority, Deque[QueueItem]] = {
+            URGENT: self._urgent,
+            NORMAL: self._normal,
+        }
         self._eid = count()  # Counter for event IDs
+        self._compact_ratio = compact_ratio
+        self._tombstones = 0  # Cancelled events still in the queue or lanes
+        self._compactions = 0
+        self._pre_step_hooks: List[StepHook] = []
+        self._post_step_hooks: List[StepHook] = []
         self._active_proc: Optional[Process] = None
 
         # Bind all BoundClass instances to "self" to improve performance.
@@ -118,11 +209,51 @@ class Environment:
         """The current simulation time."""
         return self._now
 
+    @property
+    def resolution(self) -> Optional[float]:
+        """Length of a tick in seconds, or None if the simulation time is
+        not measured in ticks."""
+        return self._resolution
+
+    def to_ticks(self, seconds: SimTime) -> SimTime:
+        """Convert a duration or a point in time in *seconds* to simulation
+        time. In tick mode, the result is rounded to the nearest tick."""
+        if self._resolution is None:
+            return seconds
+        return round(seconds / self._resolution)
+
+    def to_seconds(self, time: SimTime) -> SimTime:
+        """Convert a simulation *time* to seconds."""
+        if self._resolution is None:
+            return time
+        return time * self._resolution
+
     @property
     def active_process(self) -> Optional[Process]:
         """The currently active process of the environment."""
         return self._active_proc
 
+    @property
+    def queue_size(self) -> int:
+        """Number of scheduled events, including cancelled ones."""
+        return (
+            len(self._queue)
+            + len(self._urgent)
+            + len(self._normal)
+            + len(self._bulk or ())
+        )
+
+    @property
+    def tombstones(self) -> int:
+        """Number of cancelled events which are still scheduled."""
+        return self._tombstones
+
+    @property
+    def compactions(self) -> int:
+        """Number of times the tombstones have been removed from the
+        queue."""
+        return self._compactions
+
     if TYPE_CHECKING:
         # This block is only evaluated when type checking with, e.g. Mypy.
         # These are the effective types of the methods created with BoundClass
@@ -179,8 +310,131 @@ class Environment:
         Timeout: when Timeout is created
         Process: when send raise StopIteration (the coroutine finish execution)
         """
-        heappush(self._queue,
-                 (self._now + delay, priority, next(self._eid), event))
+        at = self._now + delay
+        if at == self._now:
+            if priority == NORMAL:
+                self._normal.append((at, priority, next(self._eid), event))
+                return
+            if priority == URGENT:
+                self._urgent.append((at, priority, next(self._eid), event))
+                return
+        self._push((at, priority, next(self._eid), event))
+
+    def call_at(
+        self, at: SimTime, fn: Callable[..., Any], *args: Any
+    ) -> ScheduledCall:
+        """Call ``fn(*args)`` at the simulation time *at*.
+
+        The callable is put into the event queue directly, there is no
+        process or event involved. Calls scheduled for the same time are
+        invoked in the order they have been scheduled, like events with
+        normal priority. Return a :class:`~sim.events.ScheduledCall` which
+        can be used to cancel the call.
+
+        """
+        if at < self._now:
+            raise ValueError(f'Time {at} is in the past (now: {self._now})')
+        call = ScheduledCall(self, fn, args)
+        if at == self._now:
+            self._normal.append((at, NORMAL, next(self._eid), call))
+        else:
+            self._push((at, NORMAL, next(self._eid), call))
+        return call
+
+    def call_later(
+        self, delay: SimTime, fn: Callable[..., Any], *args: Any
+    ) -> ScheduledCall:
+        """Call ``fn(*args)`` after *delay* time units. See
+        :meth:`call_at()`."""
+        if delay < 0:
+            raise ValueError(f'Negative delay {delay}')
+        call = ScheduledCall(self, fn, args)
+        # Inlined schedule().
+        at = self._now + delay
+        if at == self._now:
+            self._normal.append((at, NORMAL, next(self._eid), call))
+        else:
+            self._push((at, NORMAL, next(self._eid), call))
+        return call
+
+    @contextmanager
+    def bulk(self) -> Iterator['Environment']:
+        """Context manager for building large models::
+
+            with env.bulk():
+                for i in range(10000):
+                    Port(env, ...)
+
+        Inside of the block, events scheduled for later times are collected
+        and added to the queue in one go when the block is left, which turns
+        the queue into a heap once instead of pushing every event. Processes
+        created in a row share one start-up event instead of getting an
+        :class:`~sim.events.Initialize` event each. The cyclic garbage
+        collector is paused, as it would otherwise repeatedly traverse the
+        growing model.
+
+        Events are processed in the same order as without the block. The
+        environment must not be run or stepped inside of it. Nested blocks
+        have no further effect.
+
+        """
+        if self._bulk is not None:
+            yield self
+            return
+        items: List[QueueItem] = []
+        self._bulk = items
+        self._push = items.append
+        try:
+            with _paused_gc():
+                yield self
+        finally:
+            self._bulk = None
+            self._push = self._queue.push
+            self._queue.push_many(items)
+
+    def _check_not_bulk(self) -> None:
+        """Raise a RuntimeError inside of :meth:`bulk()`."""
+        if self._bulk is not None:
+            raise RuntimeError('The environment is building a model in bulk')
+
+    def _initialize(self, process: Process) -> Event:
+        """Schedule the start of *process* inside of :meth:`bulk()` and
+        return the start-up event."""
+        urgent = self._urgent
+        if urgent and type(urgent[-1][3]) is BulkInitialize:
+            # Nothing else has been scheduled with urgent priority since the
+            # last process has been created, so the new process can be
+            # started right after it.
+            init = urgent[-1][3]
+            init.processes.append(process)  # type: ignore
+            return init
+        return BulkInitialize(self, process)
+
+    def _pop(self) -> QueueItem:
+        """Remove and return the next scheduled item.
+
+        Raise an IndexError if there are no scheduled events.
+
+        """
+        if self._urgent:
+            return self._urgent.popleft()
+        if self._normal:
+            return self._normal.popleft()
+
+        item = self._queue.pop()
+        # Time advances. Move the remaining items of the new current time to
+        # the lanes, so that items scheduled later at this time (which have
+        # larger event ids) are ordered behind them.
+        queue, lanes, now = self._queue, self._lanes, item[0]
+        try:
+            while queue.first()[0] == now:
+                lane = lanes.get(queue.first()[1])
+                if lane is None:
+                    break
+                lane.append(queue.pop())
+        except IndexError:
+            pass
+        return item
 
     def peek(self) -> SimTime:
         """Get the time of the next scheduled event.
@@ -188,10 +442,58 @@ class Environment:
         Return Infinity if there is no further event.
 
         """
-        try:
-            return self._queue[0][0]
-        except IndexError:
-            return Infinity
+        self._check_not_bulk()
+        # Discard cancelled events at the head so that they don't delay the
+        # next event (e.g. in a RealtimeEnvironment).
+        while True:
+            if self._urgent:
+                lane = self._urgent
+            elif self._normal:
+                lane = self._normal
+            else:
+                break
+            if not lane[0][3]._cancelled:
+                return lane[0][0]
+            lane.popleft()
+            self._tombstones -= 1
+
+        while True:
+            try:
+                item = self._queue.first()
+            except IndexError:
+                return Infinity
+            if not item[3]._cancelled:
+                return item[0]
+            self._queue.pop()
+            self._tombstones -= 1
+
+    def _add_tombstone(self) -> None:
+        """Account for a cancelled event. Compact the queue once there are
+        too many tombstones."""
+        self._tombstones += 1
+        if (
+            self._tombstones >= self.COMPACT_MIN_TOMBSTONES
+            and self._tombstones > self._compact_ratio * len(self._queue)
+        ):
+            self.compact()
+
+    def compact(self) -> None:
+        """Remove all cancelled events from the queue and the lanes."""
+        def cancelled(item: QueueItem) -> bool:
+            return item[3]._cancelled
+
+        self._queue.remove_if(cancelled)
+        for lane in self._lanes.values():
+            items = [item for item in lane if not item[3]._cancelled]
+            lane.clear()
+            lane.extend(items)
+        if self._bulk:
+            # In place, the buffer is still being appended to.
+            self._bulk[:] = [
+                item for item in self._bulk if not item[3]._cancelled
+            ]
+        self._tombstones = 0
+        self._compactions += 1
 
     def step(self) -> None:
         """Process the next event.
@@ -199,10 +501,27 @@ class Environment:
         Raise an EmptySchedule if no further events are available.
 
         """
-        try:
-            self._now, _, _, event = heappop(self._queue)
-        except IndexError:
-            raise EmptySchedule()
+        self._check_not_bulk()
+        # NOTE: The following code is inlined from _pop() for performance
+        # reasons.
+        while True:
+            if self._urgent:
+                item = self._urgent.popleft()
+            elif self._normal:
+                item = self._normal.popleft()
+            else:
+                try:
+                    item = self._pop()
+                except IndexError:
+                    raise EmptySchedule()
+            if not item[3]._cancelled:
+                break
+            # Skip tombstones without advancing the time.
+            self._tombstones -= 1
+        self._now, _, _, event = item
+
+        for hook in self._pre_step_hooks:
+            hook(event)
 
         # Process callbacks of the event. Set the events callbacks to None
         # immediately to prevent concurrent modifications.
@@ -214,14 +533,115 @@ class Environment:
         for callback in callbacks:
             callback(event)
 
-        if not event._ok and not hasattr(event, '_defused'):
-            # The event has failed and has not been defused. Crash the
-            # environment.
-            # Create a copy of the failure exception with a new traceback.
-            # Multiple process can wait for the same failed event.
-            exc = type(event._value)(*event._value.args)
-            exc.__cause__ = event._value
-            raise exc
+        for hook in self._post_step_hooks:
+            hook(event)
+
+        if not event._ok and not event._defused:
+            _crash(event)
+
+    def add_step_hook(
+        self,
+        pre: Optional[StepHook] = None,
+        post: Optional[StepHook] = None,
+    ) -> None:
+        """Register hooks which are called with every processed event.
+
+        *pre* is called before the callbacks of the event are invoked (its
+        callbacks are still available), *post* is called afterwards. If a
+        callback raises (e.g. the one of the *until* event of :meth:`run()`),
+        *post* is not called.
+
+        Without hooks, :meth:`run()` uses a loop which does not check for
+        them at all. Hooks registered while the environment is running take
+        effect with the next call to :meth:`run()`.
+
+        """
+        if pre is not None:
+            self._pre_step_hooks.append(pre)
+        if post is not None:
+            self._post_step_hooks.append(post)
+
+    def remove_step_hook(
+        self,
+        pre: Optional[StepHook] = None,
+        post: Optional[StepHook] = None,
+    ) -> None:
+        """Unregister hooks added with :meth:`add_step_hook()`."""
+        if pre is not None:
+            self._pre_step_hooks.remove(pre)
+        if post is not None:
+            self._post_step_hooks.remove(post)
+
+    def _run(self) -> None:
+        """Process events until an exception (e.g. EmptySchedule or
+        StopSimulation) is raised.
+
+        This is the loop of step() without the step hooks. Frequently used
+        attributes are bound to locals once.
+
+        """
+        urgent, normal = self._urgent, self._normal
+        pop_urgent, pop_normal, pop = urgent.popleft, normal.popleft, self._pop
+        while True:
+            if urgent:
+                item = pop_urgent()
+            elif normal:
+                item = pop_normal()
+            else:
+                try:
+                    item = pop()
+                except IndexError:
+                    raise EmptySchedule()
+            event = item[3]
+            if event._cancelled:
+                self._tombstones -= 1
+                continue
+            self._now = item[0]
+
+            callbacks, event.callbacks = event.callbacks, None  # type: ignore
+            for callback in callbacks:
+                callback(event)
+
+            if not event._ok and not event._defused:
+                _crash(event)
+
+    def _stop_at(self, until: Union[SimTime, Event]) -> Event:
+        """Return an event which stops the simulation once it is processed.
+
+        *until* is either an event which has not been processed yet or a
+        simulation time.
+
+        """
+        if not isinstance(until, Event):
+            # Assume that until is a number if it is not None and not an
+            # event. Create a Timeout(until) in this case.
+            at: SimTime
+            if isinstance(until, int):
+                at = until
+            else:
+                at = float(until)
+                if self._resolution is not None:
+                    if not at.is_integer():
+                        raise ValueError(
+                            f'until(={until}) must be an integer number of '
+                            f'ticks.'
+                        )
+                    at = int(at)
+
+            if at <= self.now:
+                raise ValueError(
+                    f'until(={at}) must be > the current simulation time.'
+                )
+
+            # Schedule the event before all regular timeouts.
+            until = Event(self)
+            until._ok = True
+            until._value = None
+            self.schedule(until, URGENT, at - self.now)
+
+        # if until is an event and it has not been processed.
+        until.callbacks.append(StopSimulation.callback)
+        return until
 
     def run(
         self, until: Optional[Union[SimTime, Event]] = None
@@ -240,37 +660,26 @@ class Environment:
         environment's time reaches until.
 
         """
+        self._check_not_bulk()
         if until is not None:
-            if not isinstance(until, Event):
-                # Assume that until is a number if it is not None and not an
-                # event. Create a Timeout(until) in this case.
-                at: SimTime
-                if isinstance(until, int):
-                    at = until
-                else:
-                    at = float(until)
-
-                if at <= self.now:
-                    raise ValueError(
-                        f'until(={at}) must be > the current simulation time.'
-                    )
-
-                # Schedule the event before all regular timeouts.
-                until = Event(self)
-                until._ok = True
-                until._value = None
-                self.schedule(until, URGENT, at - self.now)
-
-            elif until.callbacks is None:
+            if isinstance(until, Event) and until.callbacks is None:
                 # Until event has already been processed.
                 return until.value
-
-            # if until is an event and it has not been processed.
-            until.callbacks.append(StopSimulation.callback)
+            until = self._stop_at(until)
 
         try:
-            while True:
-                self.step()
+            if (
+                self._pre_step_hooks
+                or self._post_step_hooks
+                or type(self).step is not Environment.step
+            ):
+                # Instrumented loop. Subclasses overriding step() also end
+                # up here.
+                step = self.step
+                while True:
+                    step()
+            else:
+                self._run()
         except StopSimulation as exc:
             return exc.args[0]  # == until.value
         except EmptySchedule:
@@ -281,3 +690,12 @@ class Environment:
                     f'triggered: {until}'
                 )
         return None
+
+
+def _crash(event: Event) -> None:
+    """Raise the exception of a failed event which has not been defused."""
+    # Create a copy of the failure exception with a new traceback.
+    # Multiple process can wait for the same failed event.
+    exc = type(event._value)(*event._value.args)
+    exc.__cause__ = event._value
+    raise exc
@@ -56,19 +56,31 @@ class Event:
     two events using one of these operators, a Condition event is generated
     that lets you wait for both or one of them.
 
+    Events are allocated in large numbers, so the event classes use
+    ``__slots__`` instead of a per-instance ``__dict__``. Subclasses should
+    declare ``__slots__`` as well.
+
     """
 
+    __slots__ = ('env', 'callbacks', '_ok', '_value', '_defused', '_cancelled')
+
     _ok: bool
-    _defused: bool
     # Initial value is PENDING, meaning the event has not been triggered
     # The value can be many types:
     # - If event failed, the value is the exception
     # - If event succeed, the value is something passed to val by `val = yield event`
-    _value: Any = PENDING
+    _value: Any
+    # Set if the exception of a failed event has been handled.
+    _defused: bool
+    # Set by cancel(). The environment skips cancelled events.
+    _cancelled: bool
 
     def __init__(self, env: 'Environment'):
         self.env = env
         self.callbacks: EventCallbacks = []
+        self._value = PENDING
+        self._defused = False
+        self._cancelled = False
 
     def __repr__(self) -> str:
         return f'<{self._desc()} object at {id(self):#x}>'
@@ -102,12 +114,17 @@ class Event:
         it. Else, the exception will not be raised by environment.
 
         """
-        return hasattr(self, '_defused')
+        return self._defused
 
     @defused.setter
     def defused(self, value: bool) -> None:
         self._defused = True
 
+    @property
+    def cancelled(self) -> bool:
+        """Becomes True when the event has been cancelled with cancel()."""
+        return self._cancelled
+
     @property
     def value(self) -> Optional[Any]:
         if self._value is PENDING:
@@ -139,6 +156,25 @@ class Event:
         self.env.schedule(self)
         return self
 
+    def cancel(self) -> None:
+        """Cancel this event after it has been scheduled.
+
+        The event stays in the event queue as a tombstone and is skipped by
+        the environment, so its callbacks are never invoked. Processes
+        waiting for the event are not resumed.
+
+        Raise a :exc:`RuntimeError` if the event has not been triggered yet
+        or has already been processed.
+
+        """
+        if self._value is PENDING:
+            raise RuntimeError(f'{self} has not been triggered')
+        if self.callbacks is None:
+            raise RuntimeError(f'{self} has already been processed')
+        if not self._cancelled:
+            self._cancelled = True
+            self.env._add_tombstone()
+
     def __and__(self, other: 'Event') -> 'Condition':
         return Condition(self.env, Condition.all_events, [self, other])
 
@@ -158,6 +194,8 @@ class Timeout(Event):
 
     """
 
+    __slots__ = ('_delay',)
+
     def __init__(
         self,
         env: 'Environment',
@@ -179,6 +217,64 @@ class Timeout(Event):
         return f'{self.__class__.__name__}({self._delay}{value_str})'
 
 
+class ScheduledCall:
+    """Handle of a callable scheduled with
+    :meth:`~sim.core.Environment.call_at()` or
+    :meth:`~sim.core.Environment.call_later()`.
+
+    The handle is put into the event queue directly and looks like a
+    succeeded event to the environment, but it is not an :class:`Event`:
+    processes cannot wait for it. It only calls *fn* with *args* once its
+    time has come, which is a lot cheaper than a process waiting for a
+    :class:`Timeout`.
+
+    """
+
+    __slots__ = ('env', 'callbacks', '_cancelled', '_fn', '_args')
+
+    # A scheduled call never fails.
+    _ok = True
+    _defused = False
+
+    def __init__(
+        self,
+        env: 'Environment',
+        fn: Callable[..., Any],
+        args: Tuple[Any, ...],
+    ):
+        self.env = env
+        self.callbacks: Optional[Tuple[Callable[['ScheduledCall'], None]]] = (
+            _invoke,
+        )
+        self._cancelled = False
+        self._fn = fn
+        self._args = args
+
+    def __repr__(self) -> str:
+        return f'<ScheduledCall({self._fn!r}) object at {id(self):#x}>'
+
+    @property
+    def cancelled(self) -> bool:
+        """Becomes True when the call has been cancelled with cancel()."""
+        return self._cancelled
+
+    @property
+    def processed(self) -> bool:
+        """Becomes True once the callable has been invoked."""
+        return self.callbacks is None
+
+    def cancel(self) -> None:
+        """Cancel the call. Does nothing if the callable has already been
+        invoked or the call has already been cancelled."""
+        if self.callbacks is not None and not self._cancelled:
+            self._cancelled = True
+            self.env._add_tombstone()
+
+
+def _invoke(call: ScheduledCall) -> None:
+    call._fn(*call._args)
+
+
 class Initialize(Event):
     """Initializes a process. Only used internally by Process.
 
@@ -186,12 +282,16 @@ class Initialize(Event):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, env: 'Environment', process: 'Process'):
         # NOTE: The following initialization code is inlined from
         # Event.__init__() for performance reasons.
         self.env = env
         self.callbacks: EventCallbacks = [process._resume]
         self._value: Any = None
+        self._defused = False
+        self._cancelled = False
 
         # The initialization events needs to be scheduled as urgent so that it
         # will be handled before interrupts. Otherwise a process whose
@@ -200,6 +300,37 @@ class Initialize(Event):
         env.schedule(self, URGENT)
 
 
+class BulkInitialize(Event):
+    """Initializes the processes created in a row inside of
+    :meth:`Environment.bulk() <sim.core.Environment.bulk>`. Only used
+    internally by Process.
+
+    The processes are started in the order of their creation, like with
+    one :class:`Initialize` event each.
+
+    """
+
+    __slots__ = ('processes',)
+
+    def __init__(self, env: 'Environment', process: 'Process'):
+        # NOTE: The following initialization code is inlined from
+        # Event.__init__() for performance reasons.
+        self.env = env
+        self.callbacks: EventCallbacks = [self._start]
+        self._value: Any = None
+        self._defused = False
+        self._cancelled = False
+        self.processes: List['Process'] = [process]
+
+        self._ok = True
+        env.schedule(self, URGENT)
+
+    def _start(self, event: Event) -> None:
+        for process in self.processes:
+            if process._target is self:
+                process._resume(self)
+
+
 class Interruption(Event):
     """Immediately schedules an :class:`~sim.exceptions.Interrupt` exception
     with the given *cause* to be thrown into *process*.
@@ -208,6 +339,8 @@ class Interruption(Event):
 
     """
 
+    __slots__ = ('process',)
+
     def __init__(self, process: 'Process', cause: Optional[Any]):
         # NOTE: The following initialization code is inlined from
         # Event.__init__() for performance reasons.
@@ -216,6 +349,7 @@ class Interruption(Event):
         self._value = Interrupt(cause)
         self._ok = False
         self._defused = True
+        self._cancelled = False
 
         if process.triggered:
             raise RuntimeError(
@@ -260,8 +394,24 @@ class Process(Event):
 
     Processes can be interrupted during their execution by interrupt()
 
+    A process runs helper generators inline with ``yield from``::
+
+        def run(self, env):
+            while True:
+                packet = yield self.store.get()
+                yield from self.send_packet(packet)
+
+    This costs no events at all, unlike starting a sub-process with
+    ``yield env.process(self.send_packet(packet))``, which creates a
+    process, its :class:`Initialize` event and waits for its termination.
+    Values sent to and exceptions (including interrupts) thrown into the
+    process are passed on to the helper, the return value of the helper is
+    the value of the ``yield from`` expression.
+
     """
 
+    __slots__ = ('_generator', '_target')
+
     def __init__(self, env: 'Environment', generator: ProcessGenerator):
         if not hasattr(generator, 'throw'):
             # Implementation note: Python implementations differ in the
@@ -277,11 +427,17 @@ class Process(Event):
         # Event.__init__() for performance reasons.
         self.env = env
         self.callbacks: EventCallbacks = []
+        self._value = PENDING
+        self._defused = False
+        self._cancelled = False
 
         self._generator = generator
 
         # Schedule the start of the execution of the process.
-        self._target: Event = Initialize(env, self)
+        if env._bulk is None:
+            self._target: Event = Initialize(env, self)
+        else:
+            self._target = env._initialize(self)
 
     def _desc(self) -> str:
         """Return a string *Process(process_func_name)*."""
@@ -374,7 +530,7 @@ class Process(Event):
                     raise
 
                 msg = f'Invalid yield value "{event}"'
-                descr = _describe_frame(self._generator.gi_frame)
+                descr = _describe_frame(_innermost(self._generator).gi_frame)
                 error = RuntimeError(f'\n{descr}{msg}')
                 # Drop the AttributeError as the cause for this exception.
                 error.__cause__ = None
@@ -389,6 +545,8 @@ class ConditionValue:
     triggered events and their values. The events are ordered by their
     occurences in the condition."""
 
+    __slots__ = ('events',)
+
     def __init__(self):
         self.events: List[Event] = []
 
@@ -449,6 +607,8 @@ class Condition(Event):
 
     """
 
+    __slots__ = ('_evaluate', '_events', '_count')
+
     def __init__(
         self,
         env: 'Environment',
@@ -560,6 +720,8 @@ class AllOf(Condition):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, env: 'Environment', events: Iterable[Event]):
         super().__init__(env, Condition.all_events, events)
 
@@ -570,10 +732,22 @@ class AnyOf(Condition):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, env: 'Environment', events: Iterable[Event]):
         super().__init__(env, Condition.any_events, events)
 
 
+def _innermost(generator: ProcessGenerator) -> ProcessGenerator:
+    """Return the generator *generator* delegates to with ``yield from``,
+    following nested delegations."""
+    while True:
+        inner = getattr(generator, 'gi_yieldfrom', None)
+        if not hasattr(inner, 'gi_frame'):
+            return generator
+        generator = inner
+
+
 def _describe_frame(frame: FrameType) -> str:
     """Print filename, line number and function name of a stack frame."""
     filename, name = frame.f_code.co_filename, frame.f_code.co_name
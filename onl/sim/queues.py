@@ -0,0 +1,256 @@
+"""
+Event set backends used by :class:`~sim.core.Environment`.
+
+Every scheduled event is stored as a ``(time, priority, eid, event)`` tuple.
+A backend has to hand these tuples back in ascending order. Because the event
+id is unique, ties in time and priority are always broken in FIFO order.
+
+"""
+from functools import partial
+from heapq import heapify, heappush, heappop
+from math import isfinite
+from operator import getitem
+from typing import (
+    TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
+)
+
+if TYPE_CHECKING:
+    from .events import Event, EventPriority
+
+QueueItem = Tuple[Any, 'EventPriority', int, 'Event']
+
+
+class EventQueue:
+    """Interface of an event set.
+
+    Subclasses have to implement :meth:`push`, :meth:`pop`, :meth:`first`,
+    :meth:`remove_if`, ``__len__`` and ``__iter__``. :meth:`pop` and :meth:`first` raise an
+    :exc:`IndexError` if the queue is empty.
+
+    """
+
+    def push(self, item: QueueItem) -> None:
+        """Insert *item* into the queue."""
+        raise NotImplementedError(self)
+
+    def push_many(self, items: List[QueueItem]) -> None:
+        """Insert all *items* into the queue. Backends may override this
+        with something faster than pushing the items one by one."""
+        for item in items:
+            self.push(item)
+
+    def pop(self) -> QueueItem:
+        """Remove and return the smallest item."""
+        raise NotImplementedError(self)
+
+    def first(self) -> QueueItem:
+        """Return the smallest item without removing it."""
+        raise NotImplementedError(self)
+
+    def remove_if(self, predicate: Callable[[QueueItem], bool]) -> int:
+        """Remove all items for which *predicate* returns True and return
+        the number of removed items."""
+        raise NotImplementedError(self)
+
+    def __len__(self) -> int:
+        raise NotImplementedError(self)
+
+    def __iter__(self) -> Iterator[QueueItem]:
+        """Iterate over all items in no particular order."""
+        raise NotImplementedError(self)
+
+
+class HeapQueue(EventQueue):
+    """Binary heap based event set. This is the default backend."""
+
+    def __init__(self):
+        self._heap: List[QueueItem] = []
+        # Bind the heapq functions to the heap directly. This saves a Python
+        # level call on every push and pop.
+        self.push = partial(heappush, self._heap)  # type: ignore
+        self.pop = partial(heappop, self._heap)  # type: ignore
+        self.first = partial(getitem, self._heap, 0)  # type: ignore
+
+    def push_many(self, items: List[QueueItem]) -> None:
+        heap = self._heap
+        if len(items) < len(heap) // 8:
+            # Cheaper than heapifying the whole heap again.
+            for item in items:
+                heappush(heap, item)
+        else:
+            heap.extend(items)
+            heapify(heap)
+
+    def remove_if(self, predicate: Callable[[QueueItem], bool]) -> int:
+        heap = self._heap
+        size = len(heap)
+        # Modify the list in place, the bound functions refer to it.
+        heap[:] = [item for item in heap if not predicate(item)]
+        heapify(heap)
+        return size - len(heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[QueueItem]:
+        return iter(self._heap)
+
+
+class CalendarQueue(EventQueue):
+    """Calendar queue (R. Brown, 1988) with amortized O(1) push and pop.
+
+    The time axis is divided into *nbuckets* buckets of *width* time units
+    which are reused cyclically, like the days of a calendar year. Each bucket
+    is a heap, so the smallest item of the current day is the head of its
+    bucket. The number of buckets and their width are adapted to
+    the queue size and the spacing of the events.
+
+    Items with a non-finite time (e.g. ``run(until=float('inf'))``) are kept
+    in a separate heap.
+
+    The operations are O(1) on average, but they run as Python code while
+    :class:`HeapQueue` uses the C implementation of :mod:`heapq`. In
+    ``benchmarks/event_queue.py`` (processes waiting for exponentially
+    distributed timeouts), the calendar queue is about as fast as the heap
+    with 10,000 pending events and up to two times slower with 1,000 or
+    100,000. Measure your model before switching.
+
+    """
+
+    SAMPLE_SIZE = 25
+    """Number of items used to estimate the bucket width on resize."""
+
+    def __init__(self, nbuckets: int = 2, width: float = 1.0):
+        if nbuckets < 1:
+            raise ValueError('"nbuckets" must be > 0.')
+        if width <= 0:
+            raise ValueError('"width" must be > 0.')
+        self._size = 0
+        self._overflow: List[QueueItem] = []
+        self._setup(nbuckets, width, 0)
+
+    def _setup(self, nbuckets: int, width: float, start: Any) -> None:
+        self._nbuckets = nbuckets
+        self._width = width
+        self._buckets: List[List[QueueItem]] = [[] for _ in range(nbuckets)]
+        # Absolute number of the current day. Items of bucket i belong to the
+        # days i, i + nbuckets, i + 2 * nbuckets, ...
+        self._day = int(start // width)
+        self._grow_at = 2 * nbuckets
+        self._shrink_at = nbuckets // 2 - 2
+        # Bucket found by the last _locate(), None if it has to be searched
+        # again. The environment looks at the first item after every pop,
+        # so the search is done once per item.
+        self._current: Optional[List[QueueItem]] = None
+
+    @property
+    def nbuckets(self) -> int:
+        """Current number of buckets."""
+        return self._nbuckets
+
+    @property
+    def width(self) -> float:
+        """Current width of a bucket."""
+        return self._width
+
+    def push(self, item: QueueItem) -> None:
+        time = item[0]
+        self._size += 1
+        if not isfinite(time):
+            heappush(self._overflow, item)
+            return
+        day = int(time // self._width)
+        if day < self._day:
+            # Only possible for items scheduled before the last popped one,
+            # which the environment never does. Keep the queue consistent
+            # anyway.
+            self._day = day
+            self._current = None
+        heappush(self._buckets[day % self._nbuckets], item)
+        if self._size > self._grow_at:
+            self._resize(2 * self._nbuckets)
+
+    def _locate(self) -> List[QueueItem]:
+        """Return the bucket holding the smallest finite item and move the
+        current day to it."""
+        if self._current is not None:
+            return self._current
+        buckets, nbuckets, width = self._buckets, self._nbuckets, self._width
+        day = self._day
+        for _ in range(nbuckets):
+            bucket = buckets[day % nbuckets]
+            if bucket and int(bucket[0][0] // width) == day:
+                self._day = day
+                self._current = bucket
+                return bucket
+            day += 1
+
+        # Nothing within a whole year, fall back to a direct search.
+        item = min(bucket[0] for bucket in buckets if bucket)
+        self._day = int(item[0] // width)
+        self._current = buckets[self._day % nbuckets]
+        return self._current
+
+    def pop(self) -> QueueItem:
+        if not self._size:
+            raise IndexError('pop from an empty queue')
+        self._size -= 1
+        if self._size < len(self._overflow):
+            return heappop(self._overflow)
+        item = heappop(self._locate())
+        self._current = None
+        if self._size < self._shrink_at:
+            self._resize(self._nbuckets // 2)
+        return item
+
+    def first(self) -> QueueItem:
+        if not self._size:
+            raise IndexError('first item of an empty queue')
+        if self._size == len(self._overflow):
+            return self._overflow[0]
+        return self._locate()[0]
+
+    def remove_if(self, predicate: Callable[[QueueItem], bool]) -> int:
+        size = self._size
+        self._current = None
+        for bucket in self._buckets:
+            bucket[:] = [item for item in bucket if not predicate(item)]
+            heapify(bucket)
+        self._overflow = [
+            item for item in self._overflow if not predicate(item)
+        ]
+        heapify(self._overflow)
+        self._size = len(self._overflow) + sum(map(len, self._buckets))
+        return size - self._size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[QueueItem]:
+        for bucket in self._buckets:
+            yield from bucket
+        yield from self._overflow
+
+    def _resize(self, nbuckets: int) -> None:
+        items = [item for bucket in self._buckets for item in bucket]
+        items.sort()
+        width = self._estimate_width(items)
+        start = items[0][0] if items else self._day * self._width
+        self._setup(nbuckets, width, start)
+        buckets = self._buckets
+        for item in items:
+            # Appending in sorted order keeps the buckets heaps.
+            buckets[int(item[0] // width) % nbuckets].append(item)
+
+    def _estimate_width(self, items: List[QueueItem]) -> float:
+        """Estimate a bucket width of about three times the average spacing
+        of the items at the head of the queue."""
+        sample = items[:self.SAMPLE_SIZE]
+        gaps = [b[0] - a[0] for a, b in zip(sample, sample[1:])]
+        gaps = [gap for gap in gaps if gap > 0]
+        if not gaps:
+            return self._width
+        mean = sum(gaps) / len(gaps)
+        # Ignore outliers as suggested by Brown.
+        gaps = [gap for gap in gaps if gap <= 2 * mean]
+        return 3 * sum(gaps) / len(gaps)
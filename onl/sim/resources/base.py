@@ -1,9 +1,14 @@
+from collections import deque
 from types import TracebackType
 from typing import (
     TYPE_CHECKING,
-    ContextManager,
+    Any,
+    Callable,
+    Deque,
     Generic,
+    Iterator,
     Optional,
+    Set,
     Type,
     TypeVar,
     Union,
@@ -19,13 +24,15 @@ def pem(env, resource):)
 """
 
 
-class Put(Event, ContextManager['Put'], Generic[ResourceType]):
+class Put(Event, Generic[ResourceType]):
     """Generic event for requesting to put something into the resource.
 
     This event can act as context manager and can be used with the with
     statement to automatically cancel the request if an exception  occurs:
     """
 
+    __slots__ = ('resource', 'proc')
+
     def __init__(self, resource: ResourceType):
         super().__init__(resource._env)
         self.resource = resource
@@ -57,9 +64,11 @@ class Put(Event, ContextManager['Put'], Generic[ResourceType]):
             self.resource.put_queue.remove(self)
 
 
-class Get(Event, ContextManager['Get'], Generic[ResourceType]):
+class Get(Event, Generic[ResourceType]):
     """Generic event for requesting to get something from the resource."""
 
+    __slots__ = ('resource', 'proc')
+
     def __init__(self, resource: ResourceType):
         super().__init__(resource._env)
         self.resource = resource
@@ -99,9 +108,86 @@ PutType = TypeVar('PutType', bound=Put)
 GetType = TypeVar('GetType', bound=Get)
 
 
+class RequestQueue:
+    """First-in first-out queue of pending requests.
+
+    Appending and removing the first request take O(1) time. Requests are
+    removed lazily: :meth:`remove` only forgets a request, and it is dropped
+    from the underlying deque once it reaches the head of the queue, or when
+    the deque is rebuilt because most of its entries have been removed.
+    Hence, cancelling a request is O(1) (amortized) as well. Iteration and
+    :func:`len` only see the requests which have not been removed. Removing
+    a request which is no longer in the queue does nothing.
+
+    The queue may be iterated while requests are removed.
+
+    """
+
+    __slots__ = ('_items', '_queued')
+
+    def __init__(self) -> None:
+        self._items: Deque[Any] = deque()
+        # The requests in the queue. Entries of _items which are not in it
+        # have been removed.
+        self._queued: Set[Any] = set()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __bool__(self) -> bool:
+        return bool(self._queued)
+
+    def __iter__(self) -> Iterator[Any]:
+        queued = self._queued
+        for request in list(self._items):
+            if request in queued:
+                yield request
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)})'
+
+    def append(self, request: Any) -> None:
+        self._items.append(request)
+        self._queued.add(request)
+
+    def _trigger(self, do: Callable[[Any], bool]) -> None:
+        """Call *do* for the requests in order until it returns False and
+        remove the requests which have been triggered by it."""
+        queued = self._queued
+        for request in self._items:
+            if request not in queued:
+                continue
+            proceed = do(request)
+            if request.triggered:
+                queued.discard(request)
+            if not proceed:
+                break
+        self._drop()
+
+    def remove(self, request: Any) -> None:
+        """Remove *request* if it is in the queue."""
+        queued = self._queued
+        if request in queued:
+            queued.discard(request)
+            self._drop()
+
+    def _drop(self) -> None:
+        """Drop the removed requests at the head of the queue. Rebuild the
+        queue if most of its entries have been removed, e.g. behind a
+        request which waits for a long time."""
+        items = self._items
+        queued = self._queued
+        while items and items[0] not in queued:
+            items.popleft()
+        if len(items) > 2 * len(queued) + 8:
+            self._items = deque(
+                request for request in items if request in queued
+            )
+
+
 class BaseResource(Generic[PutType, GetType]):
-    PutQueue = list
-    GetQueue = list
+    PutQueue = RequestQueue
+    GetQueue = RequestQueue
 
     def __init__(self, env: Environment, capacity: Union[float, int]):
         self._env = env
@@ -149,21 +235,7 @@ class BaseResource(Generic[PutType, GetType]):
         """
 
         # Maintain queue invariant: All put requests must be untriggered.
-        idx = 0
-        while idx < len(self.put_queue):
-            put_event = self.put_queue[idx]
-            # if _do_put returns True,
-            proceed = self._do_put(put_event)
-            if not put_event.triggered:
-                idx += 1
-            elif self.put_queue.pop(idx) != put_event:
-                raise RuntimeError('Put queue invariant violated')
-            else:
-                # remove triggered event
-                pass
-
-            if not proceed:
-                break
+        self.put_queue._trigger(self._do_put)
 
     def _do_get(self, event: GetType) -> bool:
         """Perform the get operation."""
@@ -181,16 +253,4 @@ class BaseResource(Generic[PutType, GetType]):
         """
 
         # Maintain queue invariant: All get requests must be untriggered.
-        idx = 0
-        while idx < len(self.get_queue):
-            get_event = self.get_queue[idx]
-            proceed = self._do_get(get_event)
-            if not get_event.triggered:
-                idx += 1
-            elif self.get_queue.pop(idx) != get_event:
-                raise RuntimeError('Get queue invariant violated')
-            else:
-                pass
-
-            if not proceed:
-                break
+        self.get_queue._trigger(self._do_get)
@@ -7,6 +7,8 @@ ContainerAmount = Union[int, float]
 
 
 class ContainerPut(Put):
+    __slots__ = ('amount',)
+
     def __init__(self, container: 'Container', amount: ContainerAmount):
         if amount <= 0:
             raise ValueError(f'amount(={amount}) must be > 0.')
@@ -15,6 +17,8 @@ class ContainerPut(Put):
 
 
 class ContainerGet(Get):
+    __slots__ = ('amount',)
+
     def __init__(self, container: 'Container', amount: ContainerAmount):
         if amount <= 0:
             raise ValueError(f'amount(={amount}) must be > 0.')
@@ -0,0 +1,108 @@
+from collections import deque
+from heapq import heappop, heappush
+from typing import Any, Callable, Iterable
+
+from ..core import Environment
+from ..events import PENDING, Event
+
+
+class Mailbox:
+    """Unbounded first-in first-out queue of messages for a single consumer
+    process, e.g. the loop of a device::
+
+        def run(self, env):
+            while True:
+                packet = yield self.mailbox.get()
+                ...
+
+    Unlike a :class:`~sim.resources.store.Store`, the mailbox does not
+    create an event per message. :meth:`get` always returns the same receive
+    event, which is re-armed once it has been processed, and :meth:`put`
+    does not return an event at all. Messages are delivered in the same
+    order of events as with :meth:`Store.put_nowait()
+    <sim.resources.store.Store.put_nowait>` and :meth:`Store.get()
+    <sim.resources.store.Store.get>`.
+
+    Only one process may wait for messages at a time.
+
+    """
+
+    ItemQueue: Callable[[Iterable[Any]], Any] = deque
+    """Type of :attr:`items`."""
+
+    def __init__(self, env: Environment):
+        self._env = env
+        self.items = self.ItemQueue(())
+        """The messages which have not been received yet."""
+        self._receive = Event(env)
+        # The receive event starts in the processed state, get() arms it.
+        self._receive.callbacks = None  # type: ignore
+        self._receive._value = None
+        self._notify = Event(env)
+        self._notify._ok = True
+        self._notify._value = None
+        self._notify_callbacks = (self._deliver,)
+        self._notifying = False
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def put(self, item: Any) -> None:
+        """Put the message *item* into the mailbox."""
+        self._store(item)
+        receive = self._receive
+        if receive._value is PENDING and receive.callbacks and (
+            not self._notifying
+        ):
+            # Deliver the message in the next step at the current time, where
+            # a put event would have done it.
+            self._notifying = True
+            self._notify.callbacks = self._notify_callbacks  # type: ignore
+            self._env.schedule(self._notify)
+
+    def get(self) -> Event:
+        """Return the event which is triggered with the next message.
+
+        The event is the same for every call. Once it has been processed,
+        the next call re-arms it for the next message. Messages are only
+        delivered while a process waits for the event, so a consumer which
+        has been interrupted while waiting does not lose a message.
+
+        """
+        event = self._receive
+        if event.callbacks is None:
+            event.callbacks = []
+            event._value = PENDING
+        if event._value is PENDING and self.items:
+            event._ok = True
+            event._value = self._pop()
+            self._env.schedule(event)
+        return event
+
+    def _store(self, item: Any) -> None:
+        self.items.append(item)
+
+    def _pop(self) -> Any:
+        return self.items.popleft()
+
+    def _deliver(self, event: Event) -> None:
+        self._notifying = False
+        receive = self._receive
+        if receive._value is PENDING and receive.callbacks and self.items:
+            receive._ok = True
+            receive._value = self._pop()
+            self._env.schedule(receive)
+
+
+class PriorityMailbox(Mailbox):
+    """Mailbox which delivers its messages in the order of their priority,
+    e.g. :class:`~sim.resources.store.PriorityItem` messages (like a
+    :class:`~sim.resources.store.PriorityStore`)."""
+
+    ItemQueue = list
+
+    def _store(self, item: Any) -> None:
+        heappush(self.items, item)
+
+    def _pop(self) -> Any:
+        return heappop(self.items)
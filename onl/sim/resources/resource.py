@@ -1,5 +1,17 @@
+from heapq import heapify, heappop, heappush
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, List, Optional, Type
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
 from ..core import BoundClass, Environment, SimTime
 from ..events import Process
@@ -17,10 +29,14 @@ class Request(Put):
 
     """
 
+    __slots__ = ('usage_since',)
+
     resource: 'Resource'
 
-    #: The time at which the request succeeded.
-    usage_since: Optional[SimTime] = None
+    def __init__(self, resource: 'Resource'):
+        self.usage_since: Optional[SimTime] = None
+        """The time at which the request succeeded."""
+        super().__init__(resource)
 
     def __exit__(
         self,
@@ -42,6 +58,8 @@ class Release(Get):
 
     """
 
+    __slots__ = ('request',)
+
     def __init__(self, resource: 'Resource', request: Request):
         self.request = request
         """The request (:class:`Request`) that is to be released."""
@@ -62,7 +80,9 @@ class Resource(BaseResource):
 
         super().__init__(env, capacity)
 
-        self._users: List[Request] = []
+        # The users in the order in which they got the resource. The values
+        # are unused, a dict removes a user in O(1).
+        self._users: Dict[Request, None] = {}
         self._queue = self.put_queue
 
     @property
@@ -74,7 +94,7 @@ class Resource(BaseResource):
     def users(self):
         """List of Request events for the processes that are currently using
         the resource."""
-        return self._users
+        return list(self._users)
 
     @property
     def queue(self):
@@ -97,7 +117,7 @@ class Resource(BaseResource):
 
     def _do_put(self, event: Request) -> bool:
         if len(self._users) < self.capacity:
-            self._users.append(event)
+            self._users[event] = None
             event.usage_since = self._env.now
             event.succeed()
             return True
@@ -105,10 +125,7 @@ class Resource(BaseResource):
             return False
 
     def _do_get(self, event: Release) -> bool:
-        try:
-            self._users.remove(event.request)  # type: ignore
-        except ValueError:
-            pass
+        self._users.pop(event.request, None)  # type: ignore
         event.succeed()
         return True
 
@@ -118,6 +135,8 @@ class PriorityRequest(Request):
     resource supports preemption and preempt is True other usage
     requests of the resource may be preempted."""
 
+    __slots__ = ('priority', 'preempt', 'time', 'key')
+
     def __init__(
         self, resource: 'Resource', priority: int = 0, preempt: bool = True
     ):
@@ -140,19 +159,88 @@ class PriorityRequest(Request):
         super().__init__(resource)
 
 
-class SortedQueue(list):
-    """Queue for sorting events by their key attributes."""
+class SortedQueue:
+    """Queue for sorting events by their key attributes.
+
+    The events are kept in a heap, so appending and removing the first event
+    take O(log n) time. Events with the same key are sorted by the order in
+    which they were appended. Like with a :class:`~.base.RequestQueue`,
+    removing other events is O(1) and they are dropped lazily, and removing
+    an event which is no longer in the queue does nothing. Iteration yields
+    the events in sorted order.
+
+    """
+
+    __slots__ = ('maxlen', '_heap', '_queued', '_count')
 
     def __init__(self, maxlen: Optional[int] = None):
-        super().__init__()
         self.maxlen = maxlen
+        self._heap: List[Tuple[Any, int, Any]] = []
+        # The events in the queue. Entries of the heap whose event is not in
+        # it have been removed.
+        self._queued: Set[Any] = set()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __bool__(self) -> bool:
+        return bool(self._queued)
+
+    def __iter__(self) -> Iterator[Any]:
+        queued = self._queued
+        for _, _, event in sorted(self._heap):
+            if event in queued:
+                yield event
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)})'
 
     def append(self, item: Any) -> None:
         if self.maxlen is not None and len(self) >= self.maxlen:
             raise RuntimeError('Cannot append event. Queue is full.')
 
-        super().append(item)
-        super().sort(key=lambda e: e.key)
+        heappush(self._heap, (item.key, self._count, item))
+        self._queued.add(item)
+        self._count += 1
+
+    def remove(self, item: Any) -> None:
+        """Remove *item* if it is in the queue."""
+        queued = self._queued
+        if item in queued:
+            queued.discard(item)
+            self._drop()
+
+    def _drop(self) -> None:
+        """Drop the removed events at the head of the queue."""
+        heap = self._heap
+        queued = self._queued
+        while heap and heap[0][2] not in queued:
+            heappop(heap)
+
+    def _trigger(self, do: Callable[[Any], bool]) -> None:
+        """Call *do* for the events in sorted order until it returns False
+        and remove the events which have been triggered by it."""
+        heap = self._heap
+        queued = self._queued
+        # Events which have not been triggered, but are passed over to reach
+        # the next ones.
+        skipped = []
+        while heap:
+            entry = heap[0]
+            if entry[2] not in queued:
+                heappop(heap)
+                continue
+            proceed = do(entry[2])
+            if entry[2].triggered:
+                heappop(heap)
+                queued.discard(entry[2])
+            elif proceed:
+                skipped.append(heappop(heap))
+            if not proceed:
+                break
+        for entry in skipped:
+            heappush(heap, entry)
 
 
 class PriorityResource(Resource):
@@ -160,7 +248,6 @@ class PriorityResource(Resource):
     ordered by their (priority, time, not preempted) attribute"""
 
     PutQueue = SortedQueue
-    GetQueue = list
 
     def __init__(self, env: Environment, capacity: int = 1):
         super().__init__(env, capacity)
@@ -206,12 +293,21 @@ class PreemptiveResource(PriorityResource):
 
     users: List[PriorityRequest]  # type: ignore
 
+    def __init__(self, env: Environment, capacity: int = 1):
+        super().__init__(env, capacity)
+        # Heap of the users with the one which is preempted next at the top:
+        # the one with the largest key and, of these, the one which got the
+        # resource last. Keys are negated, priorities have to be numbers.
+        # Entries of released (or preempted) users are dropped lazily.
+        self._victims: List[Tuple[Any, ...]] = []
+        self._granted = 0
+
     def _do_put(self, event: PriorityRequest) -> bool:
-        if len(self.users) >= self.capacity and event.preempt:
+        if len(self._users) >= self.capacity and event.preempt:
             # Check if we can preempt another process
-            preempt = sorted(self.users, key=lambda e: e.key)[-1]
+            preempt = self._victim()
             if preempt.key > event.key:
-                self.users.remove(preempt)
+                del self._users[preempt]
                 preempt.proc.interrupt(  # type: ignore
                     Preempted(
                         by=event.proc,
@@ -220,4 +316,26 @@ class PreemptiveResource(PriorityResource):
                     )
                 )
 
-        return super()._do_put(event)
+        granted = super()._do_put(event)
+        if event.triggered:
+            heappush(self._victims, (
+                -event.priority, -event.time, -(not event.preempt),
+                -self._granted, event,
+            ))
+            self._granted += 1
+            users = self._users
+            if len(self._victims) > 2 * len(users):
+                # Most entries are stale, e.g. below a long-lived user at the
+                # top. Rebuild the heap, so it doesn't grow without bound.
+                self._victims = [
+                    entry for entry in self._victims if entry[-1] in users
+                ]
+                heapify(self._victims)
+        return granted
+
+    def _victim(self) -> PriorityRequest:
+        """Return the user which is preempted next."""
+        victims = self._victims
+        while victims[0][-1] not in self._users:
+            heappop(victims)
+        return victims[0][-1]
@@ -1,10 +1,17 @@
+from collections import deque
 from heapq import heappush, heappop
+from functools import partial
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
-    List,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
     NamedTuple,
+    Optional,
     Union,
 )
 
@@ -18,6 +25,8 @@ class StorePut(base.Put):
 
     """
 
+    __slots__ = ('item',)
+
     def __init__(self, store: 'Store', item: Any):
         self.item = item
         """The item to put into the store."""
@@ -30,6 +39,8 @@ class StoreGet(base.Get):
 
     """
 
+    __slots__ = ()
+
 
 class FilterStoreGet(StoreGet):
     """Request to get an item from the store matching the filter. The request
@@ -37,6 +48,8 @@ class FilterStoreGet(StoreGet):
 
     """
 
+    __slots__ = ('filter',)
+
     def __init__(
         self,
         resource: 'FilterStore',
@@ -47,6 +60,26 @@ class FilterStoreGet(StoreGet):
         super().__init__(resource)
 
 
+# Key of a KeyedStoreGet for the item of any key. None is a valid key of
+# an item.
+_ANY_KEY: Any = object()
+
+
+class KeyedStoreGet(StoreGet):
+    """Request to get an item with the given key from the store. The request
+    is triggered once there is such an item available in the store.
+
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, resource: 'KeyedStore', key: Hashable = _ANY_KEY):
+        self.key = key
+        """The key of the requested item. If no key has been given, any
+        item is requested."""
+        super().__init__(resource)
+
+
 class Store(base.BaseResource):
     """Resource with capacity slots for storing arbitrary objects. By
     default, the capacity is unlimited and objects are put and retrieved from
@@ -54,6 +87,9 @@ class Store(base.BaseResource):
 
     """
 
+    ItemQueue: Callable[[Iterable[Any]], Any] = deque
+    """Type of :attr:`items`."""
+
     def __init__(
         self, env: Environment, capacity: Union[float, int] = float('inf')
     ):
@@ -62,11 +98,19 @@ class Store(base.BaseResource):
 
         super().__init__(env, capacity)
 
-        self.items: List[Any] = []
-        """List of the items available in the store."""
+        self._items = self.ItemQueue(())
+
+    @property
+    def items(self) -> Any:
+        """The items available in the store."""
+        return self._items
+
+    @items.setter
+    def items(self, items: Iterable[Any]) -> None:
+        self._items = self.ItemQueue(items)
 
     def size(self):
-        return len(self.items)
+        return len(self._items)
 
     if TYPE_CHECKING:
 
@@ -84,17 +128,37 @@ class Store(base.BaseResource):
         put = BoundClass(StorePut)
         get = BoundClass(StoreGet)
 
+    def put_nowait(self, item: Any) -> None:
+        """Put *item* into the store without creating an event.
+
+        Use this instead of :meth:`put` if nobody waits for the item to be
+        stored. If the store is full, the item waits for space like with
+        :meth:`put`.
+
+        """
+        if self.put_queue or len(self._items) >= self._capacity:
+            StorePut(self, item)
+            return
+        self._store(item)
+        if self.get_queue:
+            # Hand the item to the waiting getter where a put event would
+            # have done it, so that the order of events stays the same.
+            self._env.call_later(0, self._trigger_get, None)
+
+    def _store(self, item: Any) -> None:
+        self._items.append(item)
+
     def _do_put(self, event: StorePut) -> bool:
-        if len(self.items) < self._capacity:
-            self.items.append(event.item)
+        if len(self._items) < self._capacity:
+            self._store(event.item)
             event.succeed()
             return True
         else:
             return False
 
     def _do_get(self, event: StoreGet) -> bool:
-        if self.items:
-            event.succeed(self.items.pop(0))
+        if self._items:
+            event.succeed(self._items.popleft())
             return True
         else:
             return False
@@ -113,24 +177,29 @@ class PriorityItem(NamedTuple):
 class PriorityStore(Store):
     """Use heap and PriorityItem to maintain order of the item list """
 
-    def _do_put(self, event: StorePut) -> bool:
-        if len(self.items) < self._capacity:
-            heappush(self.items, event.item)
-            event.succeed()
-            return True
-        else:
-            return False
+    ItemQueue = list
+
+    def _store(self, item: Any) -> None:
+        heappush(self._items, item)
 
     def _do_get(self, event: StoreGet) -> bool:
-        if self.items:
-            event.succeed(heappop(self.items))
+        if self._items:
+            event.succeed(heappop(self._items))
             return True
         else:
             return False
 
 
 class FilterStore(Store):
-    """Use filter function to get from store"""
+    """Use filter function to get from store.
+
+    A get scans the items in order until one matches the filter, and
+    removing the matching item from the middle of the deque takes time
+    linear in its position. So a get costs O(n) in the number of items,
+    unless it takes the first one. Use a :class:`KeyedStore` if items are
+    retrieved by key.
+
+    """
 
     if TYPE_CHECKING:
 
@@ -141,9 +210,264 @@ class FilterStore(Store):
         get = BoundClass(FilterStoreGet)
 
     def _do_get(self, event: FilterStoreGet) -> bool:
-        for item in self.items:
+        items = self._items
+        for index, item in enumerate(items):
             if event.filter(item):
-                self.items.remove(item)
+                del items[index]
                 event.succeed(item)
                 break
         return True
+
+
+class PriorityHandle:
+    """Handle of an item in an :class:`IndexedPriorityStore`, which is
+    used to change the priority of the item or to remove it.
+
+    Like a :class:`PriorityItem`, the handle has a :attr:`priority` and an
+    :attr:`item`.
+
+    """
+
+    __slots__ = ('priority', 'item', '_seq', '_index')
+
+    def __init__(self, priority: Any, item: Any, seq: int):
+        self.priority = priority
+        self.item = item
+        self._seq = seq
+        # Position in the heap, -1 once the item has left the store.
+        self._index = -1
+
+    @property
+    def queued(self) -> bool:
+        """True while the item is in the store."""
+        return self._index >= 0
+
+    def __lt__(self, other: 'PriorityHandle') -> bool:
+        return (self.priority, self._seq) < (other.priority, other._seq)
+
+    def __repr__(self) -> str:
+        return f'PriorityHandle(priority={self.priority!r}, item={self.item!r})'
+
+
+class IndexedPriorityStore(Store):
+    """Priority store whose items can be changed while they are queued.
+
+    Items are put as :class:`PriorityItem` and retrieved in the order of
+    their priority like with a :class:`PriorityStore`; items with equal
+    priorities are retrieved in the order they were put. Putting an item
+    yields a :class:`PriorityHandle` (``handle = yield store.put(item)`` or
+    ``handle = store.put_nowait(item)``). With the handle, the priority of
+    the item can be changed with :meth:`update` and the item can be removed
+    with :meth:`remove`, both in O(log n).
+
+    """
+
+    ItemQueue = list
+
+    def __init__(
+        self, env: Environment, capacity: Union[float, int] = float('inf')
+    ):
+        super().__init__(env, capacity)
+        self._seq = 0
+
+    @Store.items.setter  # type: ignore[attr-defined]
+    def items(self, items: Iterable[PriorityItem]) -> None:
+        self._items = []
+        for item in items:
+            self._store(item)
+
+    def put_nowait(self, item: PriorityItem) -> Optional[PriorityHandle]:
+        """Put *item* into the store without creating an event and return
+        its handle. If the store is full, the item waits for space like
+        with :meth:`put` and None is returned."""
+        if self.put_queue or len(self._items) >= self._capacity:
+            StorePut(self, item)
+            return None
+        handle = self._store(item)
+        if self.get_queue:
+            self._env.call_later(0, self._trigger_get, None)
+        return handle
+
+    def peek(self) -> PriorityHandle:
+        """Return the handle of the item which will be retrieved next without
+        removing it. Raise an :exc:`IndexError` if the store is empty."""
+        if not self._items:
+            raise IndexError('peek into an empty store')
+        return self._items[0]
+
+    def update(self, handle: PriorityHandle, priority: Any) -> None:
+        """Change the priority of the item of *handle* to *priority*."""
+        self._check(handle)
+        handle.priority = priority
+        self._sift_up(handle._index)
+        self._sift_down(handle._index)
+
+    def remove(self, handle: PriorityHandle) -> PriorityItem:
+        """Remove the item of *handle* from the store and return it."""
+        self._check(handle)
+        item = self._pop(handle._index)
+        # There may be room for a waiting put request now.
+        self._trigger_put(None)
+        return item
+
+    def _check(self, handle: PriorityHandle) -> None:
+        index = handle._index
+        if not (0 <= index < len(self._items) and self._items[index] is handle):
+            raise ValueError(f'{handle} is not in the store')
+
+    def _store(self, item: PriorityItem) -> PriorityHandle:
+        handle = PriorityHandle(item.priority, item.item, self._seq)
+        self._seq += 1
+        handle._index = len(self._items)
+        self._items.append(handle)
+        self._sift_up(handle._index)
+        return handle
+
+    def _pop(self, index: int) -> PriorityItem:
+        heap = self._items
+        handle = heap[index]
+        last = heap.pop()
+        if last is not handle:
+            heap[index] = last
+            last._index = index
+            self._sift_up(index)
+            self._sift_down(last._index)
+        handle._index = -1
+        return PriorityItem(handle.priority, handle.item)
+
+    def _sift_up(self, index: int) -> None:
+        heap = self._items
+        handle = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not handle < heap[parent]:
+                break
+            heap[index] = heap[parent]
+            heap[index]._index = index
+            index = parent
+        heap[index] = handle
+        handle._index = index
+
+    def _sift_down(self, index: int) -> None:
+        heap = self._items
+        size = len(heap)
+        handle = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < handle:
+                break
+            heap[index] = heap[child]
+            heap[index]._index = index
+            index = child
+        heap[index] = handle
+        handle._index = index
+
+    def _do_put(self, event: StorePut) -> bool:
+        if len(self._items) < self._capacity:
+            event.succeed(self._store(event.item))
+            return True
+        else:
+            return False
+
+    def _do_get(self, event: StoreGet) -> bool:
+        if self._items:
+            event.succeed(self._pop(0))
+            return True
+        else:
+            return False
+
+
+class KeyedItems:
+    """Items of a :class:`KeyedStore`, grouped by their key. Iteration
+    yields the items key by key, in the order in which the keys appeared."""
+
+    __slots__ = ('key', '_groups', '_len')
+
+    def __init__(self, key: Callable[[Any], Hashable], items: Iterable[Any] = ()):
+        self.key = key
+        self._groups: Dict[Hashable, Deque[Any]] = {}
+        self._len = 0
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for group in self._groups.values():
+            yield from group
+
+    def __contains__(self, key: Hashable) -> bool:
+        """True if there is an item with *key*."""
+        return key in self._groups
+
+    def count(self, key: Hashable) -> int:
+        """Return the number of items with *key*."""
+        group = self._groups.get(key)
+        return len(group) if group is not None else 0
+
+    def append(self, item: Any) -> None:
+        key = self.key(item)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = deque()
+        group.append(item)
+        self._len += 1
+
+    def _group(self, key: Hashable) -> Optional[Deque[Any]]:
+        if key is _ANY_KEY:
+            return next(iter(self._groups.values()), None)
+        return self._groups.get(key)
+
+    def _popleft(self, group: Deque[Any]) -> Any:
+        item = group.popleft()
+        if not group:
+            del self._groups[self.key(item)]
+        self._len -= 1
+        return item
+
+
+class KeyedStore(Store):
+    """Store whose items are retrieved by key, e.g. per-flow queues or
+    buffers indexed by sequence number.
+
+    The key of an item is ``key(item)``. ``store.get(k)`` requests the oldest
+    item with key *k*; ``store.get()`` requests the oldest item of the key
+    which has been in the store the longest. Items with different keys may
+    be retrieved in any order, like with a :class:`FilterStore`.
+
+    Getting a stored item by key takes O(1). Waiting getters are not indexed
+    by key, though: like with a :class:`FilterStore`, every put checks the
+    waiting getters in order, which takes O(number of waiting getters).
+
+    """
+
+    if TYPE_CHECKING:
+
+        def get(  # type: ignore[override]
+            self, key: Hashable = _ANY_KEY
+        ) -> KeyedStoreGet:
+            return KeyedStoreGet(self, key)
+
+    else:
+        get = BoundClass(KeyedStoreGet)
+
+    def __init__(
+        self,
+        env: Environment,
+        key: Callable[[Any], Hashable],
+        capacity: Union[float, int] = float('inf'),
+    ):
+        self.ItemQueue = partial(KeyedItems, key)  # type: ignore
+        super().__init__(env, capacity)
+
+    def _do_get(self, event: KeyedStoreGet) -> bool:
+        items = self._items
+        group = items._group(event.key)
+        if group is not None:
+            event.succeed(items._popleft(group))
+        return True
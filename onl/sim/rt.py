@@ -1,6 +1,86 @@
-from time import monotonic, sleep
+import math
+from time import monotonic, monotonic_ns, sleep
+from typing import Dict, Optional
 
 from .core import Environment, EmptySchedule, Infinity, SimTime
+from .queues import EventQueue
+
+
+class LagStats:
+    """Distribution of the lag (in seconds of real time) with which a
+    real-time environment processes its events.
+
+    The lags are counted in a logarithmic histogram with 16 buckets per power
+    of two, so percentiles are accurate to about 3% while the memory does not
+    grow with the number of events. The statistics can be queried at any
+    time, also while the simulation is running.
+
+    """
+
+    SUB_BUCKETS = 16
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded lags."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, lag: float) -> None:
+        """Record the *lag* of an event. Negative lags count as zero."""
+        if lag < 0:
+            lag = 0.0
+        self.count += 1
+        self.total += lag
+        if lag > self.max:
+            self.max = lag
+        ns = int(lag * 1e9)
+        shift = max(ns.bit_length() - 5, 0)
+        index = shift * self.SUB_BUCKETS + (ns >> shift)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def _bucket_value(self, index: int) -> float:
+        """Return the middle of bucket *index* in seconds."""
+        shift = max(index // self.SUB_BUCKETS - 1, 0)
+        low = (index - shift * self.SUB_BUCKETS) << shift
+        return (low + ((1 << shift) - 1) / 2) / 1e9
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Return the *q*-th percentile (``0 <= q <= 100``) of the lags."""
+        if not 0 <= q <= 100:
+            raise ValueError(f'percentile(={q}) must be in [0, 100]')
+        if not self.count:
+            return 0.0
+        if q == 100:
+            return self.max
+        rank = max(math.ceil(q / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def __repr__(self) -> str:
+        return (
+            f'LagStats(count={self.count}, p50={self.p50:.6f}, '
+            f'p99={self.p99:.6f}, max={self.max:.6f})'
+        )
 
 
 class RealtimeEnvironment(Environment):
@@ -12,7 +92,30 @@ class RealtimeEnvironment(Environment):
 
     The :meth:`step()` method will raise a :exc:`RuntimeError` if a time step
     took too long to compute. This behaviour can be disabled by setting
-    *strict* to ``False``.
+    *strict* to ``False``: overdue events are then processed in a burst
+    without sleeping until the simulation has caught up with the wall clock.
+
+    With *adaptive*, the environment slows down instead: whenever an event is
+    more than *factor* seconds late, :attr:`factor` is multiplied by
+    :attr:`ADAPT_STEP` and the simulation continues on time from that event
+    on, dropping the backlog.
+
+    By default, the environment waits for an event with :func:`time.sleep`,
+    which may overshoot by tens of microseconds. With *spin* (in seconds of
+    real time), it sleeps only until *spin* before the deadline and
+    busy-waits for the rest, e.g. ``spin=200e-6`` for sub-millisecond
+    accuracy at the cost of a busy CPU.
+
+    Events whose deadline has already passed are processed right away,
+    without going through the sleep loop. The clock is still read once per
+    event (well below a microsecond), because the strict and adaptive
+    checks and the lag of an event need a current reading; reusing an older
+    one would hide a simulation falling behind. The lag of every processed
+    event is recorded in :attr:`lag`.
+
+    In integer tick mode (see *resolution* of
+    :class:`~sim.core.Environment`), *factor* still applies to a simulated
+    second, i.e. a tick takes ``factor * resolution`` seconds of real time.
 
     """
 
@@ -21,13 +124,28 @@ class RealtimeEnvironment(Environment):
         initial_time: SimTime = 0,
         factor: float = 1.0,
         strict: bool = True,
+        queue: Optional[EventQueue] = None,
+        resolution: Optional[float] = None,
+        adaptive: bool = False,
+        spin: float = 0.0,
     ):
-        Environment.__init__(self, initial_time)
+        Environment.__init__(
+            self, initial_time, queue, resolution=resolution
+        )
 
         self.env_start = initial_time
         self.real_start = monotonic()
         self._factor = factor
         self._strict = strict
+        self._adaptive = adaptive
+        self._spin_ns = int(spin * 1e9)
+        self.lag = LagStats()
+        """Lags of the processed events."""
+        self.adaptations = 0
+        """Number of times the *adaptive* environment slowed down."""
+
+    ADAPT_STEP = 1.25
+    """Factor by which an *adaptive* environment slows down."""
 
     @property
     def factor(self) -> float:
@@ -41,6 +159,17 @@ class RealtimeEnvironment(Environment):
         events takes too long."""
         return self._strict
 
+    @property
+    def adaptive(self) -> bool:
+        """If ``True``, :attr:`factor` is increased when the processing of
+        events takes too long."""
+        return self._adaptive
+
+    @property
+    def spin(self) -> float:
+        """Seconds of busy-waiting before the deadline of an event."""
+        return self._spin_ns / 1e9
+
     def sync(self) -> None:
         """Synchronize the internal time with the current wall-clock time.
 
@@ -57,7 +186,8 @@ class RealtimeEnvironment(Environment):
 
         The delay is scaled according to the real-time :attr:`factor`. With
         :attr:`strict` mode enabled, a :exc:`RuntimeError` will be raised, if
-        the event is processed too slowly.
+        the event is processed too slowly, unless the environment is
+        :attr:`adaptive`.
 
         """
         evt_time = self.peek()
@@ -65,23 +195,41 @@ class RealtimeEnvironment(Environment):
         if evt_time is Infinity:
             raise EmptySchedule()
 
-        real_time = self.real_start + (evt_time - self.env_start) * self.factor
+        real_time = self.real_start + self.to_seconds(
+            evt_time - self.env_start
+        ) * self.factor
 
-        if self.strict and monotonic() - real_time > self.factor:
+        now = monotonic()
+        delta = now - real_time
+        if delta > self._factor:
             # Events scheduled for time *t* may take just up to *t+1*
             # for their computation, before an error is raised.
-            delta = monotonic() - real_time
-            raise RuntimeError(
-                f'Simulation too slow for real time ({delta:.3f}s).'
-            )
+            if self._adaptive:
+                self._factor *= self.ADAPT_STEP
+                self.adaptations += 1
+                self.env_start = evt_time
+                self.real_start = real_time = now
+            elif self._strict:
+                raise RuntimeError(
+                    f'Simulation too slow for real time ({delta:.3f}s).'
+                )
+
+        if now < real_time:
+            self._wait(real_time)
+            now = monotonic()
+        self.lag.add(now - real_time)
+        Environment.step(self)
 
+    def _wait(self, real_time: float) -> None:
+        """Wait until the clock reaches *real_time*."""
+        deadline = int(real_time * 1e9)
+        spin = self._spin_ns
         # Sleep in a loop to fix inaccuracies of windows (see
         # http://stackoverflow.com/a/15967564 for details) and to ignore
         # interrupts.
         while True:
-            delta = real_time - monotonic()
+            delta = deadline - monotonic_ns()
             if delta <= 0:
                 break
-            sleep(delta)
-
-        Environment.step(self)
+            if delta > spin:
+                sleep((delta - spin) / 1e9)
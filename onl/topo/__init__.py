@@ -1,5 +1,7 @@
 from .fattree import FatTree
+from .partition import partition_fattree
 
 __all__ = [
-    'FatTree'
+    'FatTree',
+    'partition_fattree',
 ]
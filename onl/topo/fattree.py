@@ -1,5 +1,6 @@
+import random
+
 import networkx as nx
-from random import sample
 
 from ..flow import Flow
 
@@ -79,10 +80,13 @@ class FatTree:
         finish_time=None,
         arrival_dist=None,
         size_dist=None,
+        rng=None,
     ):
+        # the global random module by default
+        rng = rng if rng is not None else random
         all_flows = dict()
         for flow_id in range(nflows):
-            src, dst = sample(sorted(self.hosts), 2)
+            src, dst = rng.sample(sorted(self.hosts), 2)
             all_flows[flow_id] = Flow(
                 flow_id,
                 src,
@@ -95,7 +99,7 @@ class FatTree:
             )
             # all_flows[flow_id].path = sample(
             #    list(nx.all_simple_paths(G, src, dst, cutoff=nx.diameter(G))), 1
-            all_flows[flow_id].path = sample(list(nx.all_shortest_paths(self.topo, src, dst)), 1)[0]
+            all_flows[flow_id].path = rng.sample(list(nx.all_shortest_paths(self.topo, src, dst)), 1)[0]
         return all_flows
 
     def generate_fib(self, all_flows, tcp=False):
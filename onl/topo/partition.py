@@ -0,0 +1,28 @@
+from typing import Dict, Hashable
+
+import networkx as nx
+
+
+def partition_fattree(topo: nx.Graph, nparts: int) -> Dict[Hashable, int]:
+    """Partition the nodes of a fat tree (see :attr:`FatTree.topo`) into
+    *nparts* parts for a parallel simulation.
+
+    Pods are kept together, so only the links between aggregation and core
+    switches cross the partition boundary. Pods and core switches are split
+    into contiguous blocks of (nearly) equal size.
+
+    """
+    if nparts < 1:
+        raise ValueError("nparts must be a positive integer")
+    pods = sorted({topo.nodes[n]["pod"] for n in topo.nodes() if "pod" in topo.nodes[n]})
+    cores = sorted(n for n in topo.nodes() if topo.nodes[n]["layer"] == "core")
+    if nparts > len(pods):
+        raise ValueError(f"a fat tree with {len(pods)} pods has at most {len(pods)} parts")
+    pod_part = {pod: i * nparts // len(pods) for i, pod in enumerate(pods)}
+    partition = {}
+    for i, n in enumerate(cores):
+        partition[n] = i * nparts // len(cores)
+    for n in topo.nodes():
+        if n not in partition:
+            partition[n] = pod_part[topo.nodes[n]["pod"]]
+    return partition
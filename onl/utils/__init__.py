@@ -1,7 +1,9 @@
 from .timer import Timer
 from .testing import Testing
+from .profiler import Profiler
 
 __all__ = [
     "Timer",
-    "Testing"
+    "Testing",
+    "Profiler",
 ]
@@ -0,0 +1,236 @@
+import json
+from collections import defaultdict
+from functools import partial
+from time import perf_counter_ns
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ..sim import Environment, Process, SimTime
+from ..sim.events import Event, ScheduledCall
+
+
+class CallbackStats:
+    """Events processed by and wall-clock time spent in a callback owner."""
+
+    __slots__ = ("count", "time_ns")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time_ns = 0
+
+
+class Sample(NamedTuple):
+    """State of the environment at a point in simulated time."""
+
+    sim_time: SimTime
+    wall_time_ns: int
+    queue_size: int
+    events_per_sec: float
+
+
+class Profiler:
+    """Attributes processed events and wall-clock time of a simulation run
+    to the processes and callbacks which handle them.
+
+    The profiler attaches to *env* with step hooks, so no model code has to be
+    changed. Callbacks of a :class:`~sim.events.Process` are accounted to its
+    generator function (e.g. ``Port.run``), other callbacks to their owner
+    (e.g. ``Condition._check``) and scheduled calls to the called function.
+
+    Every *interval* of simulated time, the number of scheduled events and
+    the events processed per wall-clock second are sampled. With *trace*
+    enabled, every callback invocation is recorded as well, see
+    :meth:`trace()`.
+
+    Usage::
+
+        with Profiler(env) as profiler:
+            env.run(until=100)
+        print(profiler.summary())
+
+    Hooks only take effect with the next call to
+    :meth:`~sim.core.Environment.run()`, so start the profiler beforehand.
+
+    """
+
+    def __init__(
+        self, env: Environment, interval: SimTime = 1, trace: bool = False
+    ):
+        if interval <= 0:
+            raise ValueError("interval should be positive value")
+        self.env = env
+        self.interval = interval
+        self.tracing = trace
+        self.events = 0
+        """Total events processed while the profiler was running."""
+        self.wall_time_ns = 0
+        """Total wall-clock time spent processing events."""
+        self.stats: Dict[str, CallbackStats] = defaultdict(CallbackStats)
+        """Statistics by callback owner."""
+        self.event_types: Dict[str, int] = defaultdict(int)
+        """Processed events by event type."""
+        self.samples: List[Sample] = []
+        self._records: List[Tuple[str, int, int, SimTime]] = []
+        self._start_ns = 0
+        self._event_start_ns = 0
+        self._next_sample: SimTime = env.now
+        self._sample_events = 0
+        self._sample_ns = 0
+        self._running = False
+
+    def start(self) -> None:
+        """Attach the profiler to the environment."""
+        if self._running:
+            raise RuntimeError("profiler is already running")
+        self._running = True
+        now = perf_counter_ns()
+        if not self._start_ns:
+            self._start_ns = now
+        self._sample_ns = now
+        self.env.add_step_hook(pre=self._pre_step, post=self._post_step)
+
+    def stop(self) -> None:
+        """Detach the profiler from the environment."""
+        if not self._running:
+            raise RuntimeError("profiler is not running")
+        self._running = False
+        self.env.remove_step_hook(pre=self._pre_step, post=self._post_step)
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _pre_step(self, event: Event) -> None:
+        self.events += 1
+        self.event_types[type(event).__name__] += 1
+        callbacks = event.callbacks
+        if callbacks:
+            # Replace the callbacks with timed wrappers. The environment
+            # invokes the callbacks of the event right after this hook.
+            call, name = self._call, self._name
+            event.callbacks = [
+                partial(call, name(callback, event), callback)
+                for callback in callbacks
+            ]
+        self._event_start_ns = perf_counter_ns()
+
+    def _post_step(self, event: Event) -> None:
+        now = perf_counter_ns()
+        self.wall_time_ns += now - self._event_start_ns
+        self._sample_events += 1
+        if self.env.now >= self._next_sample:
+            self._sample(now)
+
+    def _call(self, name: str, callback: Callable, event: Event) -> None:
+        start = perf_counter_ns()
+        try:
+            callback(event)
+        finally:
+            elapsed = perf_counter_ns() - start
+            stats = self.stats[name]
+            stats.count += 1
+            stats.time_ns += elapsed
+            if self.tracing:
+                self._records.append((name, start, elapsed, self.env.now))
+
+    @staticmethod
+    def _name(callback: Callable, event: Event) -> str:
+        if isinstance(event, ScheduledCall):
+            callback = event._fn
+        owner = getattr(callback, "__self__", None)
+        if isinstance(owner, Process):
+            return getattr(owner._generator, "__qualname__", repr(owner))
+        if owner is not None and not isinstance(owner, (type, ModuleType)):
+            return f"{type(owner).__qualname__}.{callback.__name__}"
+        return getattr(callback, "__qualname__", type(callback).__qualname__)
+
+    def _sample(self, now_ns: int) -> None:
+        elapsed = now_ns - self._sample_ns
+        rate = self._sample_events * 1e9 / elapsed if elapsed else 0.0
+        self.samples.append(
+            Sample(self.env.now, now_ns - self._start_ns, self.env.queue_size, rate)
+        )
+        self._sample_events = 0
+        self._sample_ns = now_ns
+        self._next_sample = self.env.now + self.interval
+
+    def trace(self) -> Dict[str, Any]:
+        """Return the recorded run in the Chrome trace event format, which
+        can be loaded into Perfetto or ``chrome://tracing``.
+
+        Callback invocations (only with *trace* enabled) become complete
+        events on the timeline, the samples become counters.
+
+        """
+        start = self._start_ns
+        trace_events: List[Dict[str, Any]] = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (begin - start) / 1e3,
+                "dur": elapsed / 1e3,
+                "pid": 1,
+                "tid": 1,
+                "args": {"sim_time": sim_time},
+            }
+            for name, begin, elapsed, sim_time in self._records
+        ]
+        for sample in self.samples:
+            ts = sample.wall_time_ns / 1e3
+            trace_events.append(
+                {
+                    "name": "queue_size",
+                    "ph": "C",
+                    "ts": ts,
+                    "pid": 1,
+                    "args": {"events": sample.queue_size},
+                }
+            )
+            trace_events.append(
+                {
+                    "name": "events_per_sec",
+                    "ph": "C",
+                    "ts": ts,
+                    "pid": 1,
+                    "args": {"events/s": sample.events_per_sec},
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ns"}
+
+    def write_trace(self, path: str) -> None:
+        """Write :meth:`trace()` as JSON to *path*."""
+        with open(path, "w") as fp:
+            json.dump(self.trace(), fp)
+
+    def summary(self, limit: Optional[int] = 20) -> str:
+        """Return a text table of the callback owners, sorted by the time
+        spent in them."""
+        total_ns = self.wall_time_ns
+        rate = self.events * 1e9 / total_ns if total_ns else 0.0
+        lines = [
+            f"{self.events} events in {total_ns / 1e6:.2f} ms "
+            f"({rate:,.0f} events/s)",
+            "",
+            f"{'callback':<40} {'calls':>10} {'total ms':>10} "
+            f"{'mean us':>9} {'%':>6}",
+        ]
+        ranked = sorted(
+            self.stats.items(), key=lambda kv: kv[1].time_ns, reverse=True
+        )
+        for name, stats in ranked[:limit]:
+            share = 100 * stats.time_ns / total_ns if total_ns else 0.0
+            lines.append(
+                f"{name[:40]:<40} {stats.count:>10} "
+                f"{stats.time_ns / 1e6:>10.2f} "
+                f"{stats.time_ns / 1e3 / stats.count:>9.2f} {share:>6.1f}"
+            )
+        lines.append("")
+        lines.append("events by type:")
+        for name, count in sorted(
+            self.event_types.items(), key=lambda kv: kv[1], reverse=True
+        ):
+            lines.append(f"  {name:<38} {count:>10}")
+        return "\n".join(lines)
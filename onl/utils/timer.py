@@ -1,5 +1,5 @@
 from typing import Callable
-from ..sim import Environment, ProcessGenerator, Interrupt, SimTime
+from ..sim import Environment, ProcessGenerator, Interrupt, SimTime, Timeout
 
 class Timer:
     def __init__(
@@ -41,11 +41,24 @@ class Timer:
     def stop(self):
         self.stopped = True
         self.expire_time = self.env.now
+        if self.proc.is_alive and self.proc is not self.env.active_process:
+            if self._cancel_timeout():
+                self.proc.interrupt("stop timer")
 
     def restart(self, timeout: SimTime):
         self.start_time = self.env.now
         self.timeout = timeout
         self.expire_time = self.start_time + timeout
         if not self.proc.processed:
+            self._cancel_timeout()
             self.proc.interrupt("restart timer")
             self.proc = self.env.process(self.run(self.env))
+
+    def _cancel_timeout(self) -> bool:
+        """Cancel the timeout the timer process is waiting for, so that it
+        does not stay in the event queue until its deadline."""
+        target = self.proc.target
+        if isinstance(target, Timeout) and not target.processed:
+            target.cancel()
+            return True
+        return False
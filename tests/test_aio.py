@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from time import monotonic
+
+import pytest
+
+from onl.netdev import Wire
+from onl.packet.aio_proxy import AsyncProxyPacketGenerator, AsyncProxySink
+from onl.sim import AsyncRealtimeEnvironment
+
+
+def ticker(env, log):
+    while True:
+        yield env.timeout(1)
+        log.append(env.now)
+
+
+def test_run_async(log):
+    env = AsyncRealtimeEnvironment(factor=0.05)
+    env.process(ticker(env, log))
+
+    start = monotonic()
+    asyncio.run(env.run_async(until=4.5))
+    duration = monotonic() - start
+
+    assert 4.5 * 0.05 <= duration < 4.5 * 0.05 + 0.05
+    assert log == [1, 2, 3, 4]
+    assert env.now == 4.5
+
+
+def test_run_async_serves_loop(log):
+    """Other tasks run while the environment waits."""
+    env = AsyncRealtimeEnvironment(factor=0.05)
+    env.process(ticker(env, log))
+
+    async def other():
+        await asyncio.sleep(0.075)
+        log.append('other')
+
+    async def main():
+        await asyncio.gather(env.run_async(until=2.5), other())
+
+    asyncio.run(main())
+    assert log == [1, 'other', 2]
+
+
+def test_inject(log):
+    env = AsyncRealtimeEnvironment(factor=0.1)
+
+    def external():
+        # Called from another thread while the environment sleeps.
+        env.inject(log.append, 'injected')
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.15, threading.Thread(target=external).start)
+        await env.run_async(until=10)
+
+    env.call_at(3, lambda: log.append(env.now))
+    asyncio.run(main())
+    assert log[0] == 'injected'
+    assert log[1] == 3
+
+
+def test_inject_not_running():
+    env = AsyncRealtimeEnvironment()
+    with pytest.raises(RuntimeError):
+        env.inject(print)
+
+
+def test_proxy_echo():
+    """client -> generator -> wire -> sink -> echo server, and back."""
+    env = AsyncRealtimeEnvironment(factor=1.0)
+    received = []
+
+    async def echo(reader, writer):
+        while data := await reader.read(1024):
+            writer.write(data)
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(echo, 'localhost', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        generator = AsyncProxyPacketGenerator(
+            env, 'gen', listen_port=0, packet_size=100
+        )
+        sink = AsyncProxySink(env, 'sink', ('localhost', port))
+        wire = Wire(env, lambda: 0.01)
+        generator.out = wire
+        wire.out = sink
+        sink.out = generator
+        await generator.start()
+
+        sim = asyncio.ensure_future(env.run_async(until=0.5))
+        reader, writer = await asyncio.open_connection(
+            'localhost', generator.listen_port
+        )
+        writer.write(b'hello')
+        received.append(await asyncio.wait_for(reader.read(1024), 0.4))
+        writer.close()
+        await sim
+        generator.close()
+        sink.close()
+        server.close()
+        return sink
+
+    sink = asyncio.run(main())
+    assert received == [b'hello']
+    assert sum(sink.packets_received.values()) == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from onl import sim
+
+
+def test_call_later(env, log):
+    env.call_later(2, lambda: log.append(('a', env.now)))
+    env.call_at(1, log.append, ('b', 1))
+    env.run()
+    assert log == [('b', 1), ('a', 2)]
+    assert env.now == 2
+
+
+def test_call_same_time_order(env, log):
+    def pem(env):
+        yield env.timeout(1)
+        log.append('proc')
+
+    env.process(pem(env))
+    env.call_at(1, log.append, 'call')
+    env.call_later(0, log.append, 'now')
+    env.run()
+    # The call has been scheduled before the timeout of the process.
+    assert log == ['now', 'call', 'proc']
+
+
+def test_call_cancel(env, log):
+    call = env.call_later(1, log.append, 'a')
+    assert isinstance(call, sim.ScheduledCall)
+    env.call_later(2, call.cancel)
+    call.cancel()
+    assert call.cancelled
+    env.run()
+    assert log == []
+    assert env.now == 2
+    assert env.tombstones == 0
+
+
+def test_call_cancel_after_call(env, log):
+    call = env.call_later(1, log.append, 'a')
+    env.run()
+    assert call.processed
+    call.cancel()
+    assert not call.cancelled
+    assert log == ['a']
+
+
+def test_call_state_machine(env, log):
+    """A periodic task written without a process."""
+    def tick(n):
+        log.append(env.now)
+        if n > 1:
+            env.call_later(1.5, tick, n - 1)
+
+    env.call_later(0, tick, 3)
+    env.run(until=10)
+    assert log == [0, 1.5, 3]
+
+
+def test_call_invalid(env):
+    env.run(until=1)
+    with pytest.raises(ValueError):
+        env.call_at(0.5, print)
+    with pytest.raises(ValueError):
+        env.call_later(-1, print)
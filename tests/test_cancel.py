@@ -0,0 +1,70 @@
+import pytest
+
+from onl import sim
+
+
+def test_cancel_timeout(env, log):
+    timeout = env.timeout(5)
+    timeout.callbacks.append(lambda event: log.append(env.now))
+    env.timeout(1)
+
+    timeout.cancel()
+    assert timeout.cancelled
+    assert env.tombstones == 1
+    assert env.peek() == 1
+
+    env.run()
+    assert log == []
+    assert env.now == 1
+    assert env.tombstones == 0
+    assert not timeout.processed
+
+
+def test_cancel_same_time_event(env, log):
+    a, b = env.event(), env.event()
+    for event in (a, b):
+        event.callbacks.append(lambda event: log.append(event))
+        event.succeed()
+    a.cancel()
+    env.run()
+    assert log == [b]
+
+
+def test_cancel_twice(env):
+    timeout = env.timeout(1)
+    timeout.cancel()
+    timeout.cancel()
+    assert env.tombstones == 1
+
+
+def test_cancel_invalid(env):
+    event = env.event()
+    pytest.raises(RuntimeError, event.cancel)
+
+    timeout = env.timeout(1)
+    env.run()
+    pytest.raises(RuntimeError, timeout.cancel)
+
+
+@pytest.mark.parametrize('queue_cls', [sim.HeapQueue, sim.CalendarQueue])
+def test_compaction(queue_cls):
+    env = sim.Environment(queue=queue_cls(), compact_ratio=0.25)
+    timeouts = [env.timeout(t) for t in range(1, 401)]
+    for timeout in timeouts[:100]:
+        timeout.cancel()
+    assert env.tombstones == 100
+    assert env.compactions == 0
+
+    timeouts[100].cancel()
+    assert env.compactions == 1
+    assert env.tombstones == 0
+    assert len(env._queue) == 299
+    assert env.peek() == 102
+
+    env.run()
+    assert env.now == 400
+
+
+def test_invalid_compact_ratio():
+    pytest.raises(ValueError, sim.Environment, compact_ratio=0)
+    pytest.raises(ValueError, sim.Environment, compact_ratio=1.5)
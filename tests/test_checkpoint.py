@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from onl.sim import Snapshot
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork'), reason='requires os.fork()'
+)
+
+# Module level, so that the branches see their copy of it.
+LOG = []
+
+
+def ticker(env):
+    while True:
+        yield env.timeout(1)
+        LOG.append(env.now)
+
+
+def branch(env, until, tag):
+    env.run(until=until)
+    return tag, env.now, LOG
+
+
+def fail(env):
+    raise ValueError('branch failed')
+
+
+@pytest.fixture
+def log():
+    del LOG[:]
+    yield LOG
+    del LOG[:]
+
+
+def test_snapshot_restore(env, log):
+    env.process(ticker(env))
+    env.run(until=3.5)
+
+    with Snapshot(env) as snapshot:
+        assert snapshot.time == 3.5
+        env.run(until=10)
+        # Each branch continues from the state of the snapshot.
+        assert snapshot.run(branch, 5, 'a') == ('a', 5, [1, 2, 3, 4])
+        assert snapshot.map(branch, [(4, 'b'), (6, 'c')]) == [
+            ('b', 4, [1, 2, 3]),
+            ('c', 6, [1, 2, 3, 4, 5]),
+        ]
+    assert snapshot.closed
+    # The parent is not affected by the branches.
+    assert env.now == 10
+    assert log == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_snapshot_closed(env):
+    snapshot = Snapshot(env)
+    snapshot.close()
+    with pytest.raises(RuntimeError):
+        snapshot.run(branch, 1, 'a')
+
+
+def test_snapshot_error(env, log):
+    with Snapshot(env) as snapshot:
+        with pytest.raises(ValueError, match='branch failed'):
+            snapshot.run(fail)
+        # The snapshot is still usable.
+        assert snapshot.run(branch, 1, 'a') == ('a', 1, [])
@@ -0,0 +1,84 @@
+import os
+import random
+
+import pytest
+
+from onl.netdev import Port, Wire
+from onl.packet import DistPacketGenerator, PacketSink
+from onl.parallel import find_components, run_decomposed
+from onl.sim import Environment
+
+
+def make_bed(env, name, seed):
+    """Generator -> port -> lossy wire -> sink with its own random streams."""
+    rng = random.Random(f'{seed}:{name}')
+    generator = DistPacketGenerator(
+        env, name, lambda: rng.expovariate(20.0), lambda: rng.randint(64, 1500)
+    )
+    port = Port(env, 1e5, 100, False, name)
+    wire = Wire(env, lambda: 0.01, 0.1, rng=random.Random(f'{seed}:w:{name}'))
+    sink = PacketSink(env)
+    generator.out = port
+    port.out = wire
+    wire.out = sink
+    return generator, sink
+
+
+def build(seed, bulk=False):
+    env = Environment()
+    if bulk:
+        # All processes share one start-up event.
+        with env.bulk():
+            beds = [make_bed(env, f'bed{i}', seed) for i in range(3)]
+    else:
+        beds = [make_bed(env, f'bed{i}', seed) for i in range(3)]
+    return env, [g for g, _ in beds], [s for _, s in beds]
+
+
+def test_find_components():
+    env, generators, sinks = build(0)
+    components = find_components(generators)
+    assert len(components) == 3
+    for generator, sink, component in zip(generators, sinks, components):
+        assert component[0] is generator
+        assert sink in component
+        assert len(component) == 4
+
+    # Connecting two testbeds merges their components.
+    generators[1].out = sinks[0]
+    assert len(find_components(generators)) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork()')
+@pytest.mark.parametrize('bulk', [False, True])
+def test_run_decomposed(bulk):
+    env, _, expected = build(3)
+    env.run(until=10)
+
+    env, generators, sinks = build(3, bulk)
+    run_decomposed(env, generators, until=10, max_workers=2)
+    # The parent environment does not advance.
+    assert env.now == 0
+    for sink, reference in zip(sinks, expected):
+        assert sink.packets_received == reference.packets_received
+        assert sink.waits == reference.waits
+        assert sink.arrivals == reference.arrivals
+        # Recorded data is still collected in default dicts.
+        assert sink.packets_received['missing'] == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork()')
+def test_run_decomposed_unattributed(capfd):
+    """Processes which don't belong to a device only run in one worker."""
+    env, generators, _ = build(3)
+
+    def ticker(env):
+        while True:
+            yield env.timeout(1)
+            # Unbuffered, the workers exit without flushing.
+            os.write(1, b'tick\n')
+
+    env.process(ticker(env))
+    with pytest.warns(RuntimeWarning, match=r'without a known component \(1\)'):
+        run_decomposed(env, generators, until=3.5)
+    assert capfd.readouterr().out.count('tick') == 3
@@ -1,5 +1,10 @@
+import gc
+
 import pytest
 
+from onl import sim
+from onl.sim.events import NORMAL, URGENT
+
 def test_event_queue_empty(env, log):
     def pem(env, log):
         while env.now < 2:
@@ -60,3 +65,199 @@ def test_run_with_untriggered_event(env):
     excinfo = pytest.raises(RuntimeError, env.run, until=env.event())
     assert str(excinfo.value).startswith('No scheduled events left but "until"'
                                          ' event was not triggered:')
+
+
+def test_same_time_lane_order(env, log):
+    """Events scheduled without delay are processed in the same order as if
+    they had been put into the event queue."""
+    def trigger(name, priority, delay):
+        event = env.event()
+        event._ok, event._value = True, None
+        event.callbacks.append(lambda event: log.append((name, env.now)))
+        env.schedule(event, priority, delay)
+        return event
+
+    def wake(event):
+        trigger('normal', NORMAL, 0)
+        trigger('urgent', URGENT, 0)
+
+    trigger('wake', URGENT, 1).callbacks.append(wake)
+    trigger('late', NORMAL, 1)
+    env.run()
+
+    assert log == [('wake', 1), ('urgent', 1), ('late', 1), ('normal', 1)]
+
+
+def test_peek_same_time(env):
+    env.timeout(3)
+    assert env.peek() == 3
+    env.event().succeed()
+    assert env.peek() == 0
+    env.step()
+    assert env.peek() == 3
+
+
+def test_step_hooks(env, log):
+    def pem(env):
+        yield env.timeout(1)
+        yield env.timeout(2)
+
+    def pre(event):
+        assert event.callbacks is not None
+        log.append(('pre', env.now))
+
+    def post(event):
+        assert event.callbacks is None
+        log.append(('post', env.now))
+
+    env.process(pem(env))
+    env.add_step_hook(pre=pre, post=post)
+    env.run(until=2)
+    assert env.now == 2
+    # Initialize, first timeout and the until event, which stops the
+    # simulation from within its callback.
+    assert log == [
+        ('pre', 0), ('post', 0),
+        ('pre', 1), ('post', 1),
+        ('pre', 2),
+    ]
+
+    del log[:]
+    env.remove_step_hook(pre=pre, post=post)
+    env.run()
+    assert env.now == 3
+    assert log == []
+
+
+def test_step_hook_failed_event(env, log):
+    env.add_step_hook(post=lambda event: log.append(event))
+    event = env.event().fail(RuntimeError('boom'))
+    with pytest.raises(RuntimeError, match='boom'):
+        env.run()
+    assert log == [event]
+
+
+def test_ticks():
+    env = sim.Environment(resolution=1e-9)
+    assert env.resolution == 1e-9
+    assert env.to_ticks(1.5e-6) == 1500
+    assert env.to_seconds(1500) == pytest.approx(1.5e-6)
+
+    # Transmission times of a 64 and a 1500 byte packet at 1 Gbit/s. In
+    # seconds, the floats depend on the order in which they are added up.
+    small = 64 * 8 / 1e9
+    large = 1500 * 8 / 1e9
+    assert small + large + small != small + small + large
+
+    def send(env, delays, log):
+        for d in delays:
+            yield env.timeout(env.to_ticks(d))
+        log.append(env.now)
+
+    log = []
+    env.process(send(env, [small, large, small], log))
+    env.process(send(env, [small, small, large], log))
+    env.run()
+    assert log == [13024, 13024]
+
+    float_env = sim.Environment()
+    assert float_env.resolution is None
+    assert float_env.to_ticks(small) == small
+    assert float_env.to_seconds(small) == small
+
+
+def test_ticks_invalid():
+    with pytest.raises(ValueError):
+        sim.Environment(resolution=0)
+    with pytest.raises(ValueError):
+        sim.Environment(initial_time=0.5, resolution=1e-9)
+    env = sim.Environment(resolution=1e-9)
+    with pytest.raises(ValueError, match='integer number of ticks'):
+        env.run(until=0.5)
+    env.run(until=10.0)
+    assert env.now == 10 and isinstance(env.now, int)
+
+
+def test_bulk(log):
+    def proc(env, name, delay, log):
+        log.append((name, 'start', env.now))
+        try:
+            yield env.timeout(delay)
+        except sim.Interrupt:
+            log.append((name, 'interrupted', env.now))
+        log.append((name, 'end', env.now))
+
+    def build(env, log):
+        procs = [env.process(proc(env, i, i % 3, log)) for i in range(5)]
+        env.call_later(1, log.append, ('call', env.now))
+        procs[3].interrupt()
+        procs.append(env.process(proc(env, 5, 2, log)))
+        env.timeout(2).callbacks.append(lambda e: log.append(('timeout', 2)))
+
+    expected = []
+    env = sim.Environment()
+    build(env, expected)
+    env.run()
+
+    env = sim.Environment()
+    with env.bulk():
+        build(env, log)
+        with env.bulk():
+            env.timeout(4).callbacks.append(lambda e: log.append('nested'))
+        with pytest.raises(RuntimeError):
+            env.run()
+        # Two start-up events (for the processes before and after the
+        # interrupt), the interrupt and three buffered events.
+        assert env.queue_size == 6
+    assert gc.isenabled()
+    env.run()
+    assert log == expected + ['nested']
+    assert env.now == 4
+
+
+def test_bulk_step():
+    """Inside of a bulk block, the environment can't be stepped."""
+    env = sim.Environment()
+    with env.bulk():
+        env.timeout(1)
+        with pytest.raises(RuntimeError):
+            env.step()
+        with pytest.raises(RuntimeError):
+            env.peek()
+    assert env.peek() == 1
+
+
+def test_bulk_compact():
+    """Events cancelled inside of a bulk block are counted correctly, also
+    if the queue is compacted before the block ends."""
+    env = sim.Environment()
+    with env.bulk():
+        timeouts = [env.timeout(i + 1) for i in range(100)]
+        for timeout in timeouts:
+            timeout.cancel()
+        env.compact()
+        assert env.queue_size == 0
+    assert env.tombstones == 0
+    env.run()
+    assert env.tombstones == 0
+
+
+def test_bulk_gc_overlapping():
+    """The garbage collector stays paused until the last of overlapping
+    bulk blocks ends."""
+    first, second = sim.Environment(), sim.Environment()
+    outer = first.bulk()
+    outer.__enter__()
+    with second.bulk():
+        assert not gc.isenabled()
+        outer.__exit__(None, None, None)
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        with first.bulk():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
@@ -2,6 +2,8 @@ import re
 
 import pytest
 
+from onl import sim
+
 
 def test_succeed(env):
     """Test for the Environment.event() helper function."""
@@ -131,3 +133,22 @@ def test_condition_nested_callback_removal(env):
         # b_and_c may have a _build_value callback.
         assert cb.__name__ != '_check'
     assert not a_or_b_and_c.callbacks
+
+
+def test_slots(env):
+    """Events don't carry a per-instance __dict__."""
+    def pem(env):
+        yield env.timeout(1)
+
+    store = sim.Store(env)
+    events = [env.event(), env.timeout(1), env.process(pem(env)),
+              env.event() & env.event(), store.put(1), store.get()]
+    for event in events:
+        assert not hasattr(event, '__dict__')
+
+
+def test_defused_default(env):
+    event = env.event()
+    assert not event.defused
+    event.defused = True
+    assert event.defused
@@ -0,0 +1,362 @@
+import pickle
+import random
+from copy import copy
+
+import pytest
+
+from onl.netdev import NSplitter, Port, Splitter, Wire
+from onl.netdev.demux import FIBDemux, FlowDemux
+from onl.packet import (
+    DistPacketGenerator,
+    Flow,
+    HopTimes,
+    Packet,
+    PacketPool,
+    PacketSink,
+    PacketTable,
+    TCPPacketGenerator,
+    TCPReno,
+    TCPSink,
+)
+from onl.scheduler import DRR
+from onl.sim import Environment
+
+
+def test_packet_slots():
+    packet = Packet(1.5, 1000, 7, src='a', flow_id=3)
+    assert not hasattr(packet, '__dict__')
+    with pytest.raises(AttributeError):
+        packet.spam = 1
+    # The dicts are only allocated on demand.
+    assert packet._priorities is None and packet._perhop_time is None
+    packet.priorities[1] = 5
+    packet.perhop_time['p'] = 2.0
+    assert packet.priorities == {1: 5}
+    assert packet.perhop_time == {'p': 2.0}
+    packet.priorities = {}
+    assert packet.priorities == {}
+
+    clone = copy(packet)
+    assert clone.perhop_time is packet.perhop_time
+    clone = pickle.loads(pickle.dumps(packet))
+    assert (clone.packet_id, clone.flow_id) == (7, 3)
+    assert clone.perhop_time == {'p': 2.0}
+
+
+def test_packet_stamp():
+    packet = Packet(0, 100, 1)
+    packet.stamp('a', 1)
+    packet.stamp('b', 2)
+    packet.perhop_time['c'] = 3
+    packet.stamp('a', 4)
+    times = packet.perhop_time
+    assert isinstance(times, HopTimes)
+    assert times == {'a': 4, 'b': 2, 'c': 3}
+    assert list(times) == ['a', 'b', 'c']
+    assert times['b'] == 2 and 'd' not in times
+    del times['b']
+    assert dict(packet.perhop_time) == {'a': 4, 'c': 3}
+    with pytest.raises(KeyError):
+        times['b']
+
+    # Packets with a dict keep it.
+    packet = Packet(0, 100, 2)
+    packet.perhop_time['a'] = 1
+    packet.stamp('b', 2)
+    assert type(packet.perhop_time) is dict
+    assert packet.perhop_time == {'a': 1, 'b': 2}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_port_timestamps(env, compact):
+    port = Port(env, 8000, 10, False, '', compact_timestamps=compact)
+    sink = port.out = PacketSink(env)
+    for i in range(3):
+        port.put(Packet(env.now, 100, i))
+    env.run()
+    assert sink.perhop_times[0] == [{'': 0}, {'': 0}, {'': 0}]
+    assert all(
+        isinstance(times, HopTimes) == compact
+        for times in sink.perhop_times[0]
+    )
+
+
+def test_packet_table():
+    table = PacketTable(capacity=2)
+    src = table.intern('gen')
+    assert table.intern('gen') == src
+    handles = [table.new(i * 0.5, 100 + i, i, src=src, flow_id=7) for i in range(5)]
+    assert handles == [0, 1, 2, 3, 4]
+    assert len(table) == 5 and table.capacity == 8
+    assert list(table.size[:5]) == [100, 101, 102, 103, 104]
+
+    table.free(3)
+    table.free(1)
+    assert len(table) == 3
+    # A row can't be freed twice, nor a row which was never used.
+    with pytest.raises(ValueError):
+        table.free(3)
+    with pytest.raises(ValueError):
+        table.free(6)
+    assert len(table) == 3
+    # Freed rows are reused, all fields are reset.
+    table.ack[1] = 9
+    assert table.new(9.0, 1500, 42) == 1
+    packet = table.packet(1)
+    assert (packet.time, packet.size, packet.packet_id) == (9.0, 1500, 42)
+    assert (packet.src, packet.dst, packet.ack) == ('source', 'destination', 0)
+    assert table.packet(0).src == 'gen'
+    assert table.new(1, 1, 1) == 3
+    assert table.new(1, 1, 1) == 5
+
+    assert PacketTable(1, integer_time=True).time.typecode == 'q'
+    with pytest.raises(ValueError):
+        PacketTable(0)
+
+
+@pytest.mark.parametrize('rec_flow_ids', [True, False])
+def test_packet_table_devices(rec_flow_ids):
+    """Devices in table mode record the same data as with packet
+    objects."""
+    def build(table):
+        env = Environment()
+        rng = random.Random(1)
+        sinks = [PacketSink(env, rec_flow_ids=rec_flow_ids, table=table)
+                 for _ in range(2)]
+        demux = FIBDemux(outs=sinks, fib={0: 0, 1: 1}, table=table)
+        for flow_id in range(2):
+            generator = DistPacketGenerator(
+                env, f'g{flow_id}', lambda: rng.expovariate(100),
+                lambda: rng.randint(64, 1500), flow_id=flow_id, table=table,
+            )
+            port = Port(env, 1e6, 5, False, f'p{flow_id}', table=table)
+            wire = Wire(env, lambda: 0.001, 0.1, rng=rng, table=table)
+            generator.out, port.out, wire.out = port, wire, demux
+        env.run(until=10)
+        return sinks
+
+    table = PacketTable(capacity=1)
+    for sink, expected in zip(build(table), build(None)):
+        assert sink.packets_received == expected.packets_received
+        assert sink.bytes_received == expected.bytes_received
+        assert sink.waits == expected.waits
+        assert sink.arrivals == expected.arrivals
+    # Rows of received and lost packets are recycled.
+    assert table.capacity < 64
+    assert len(table) < 10
+
+
+def test_packet_pool():
+    pool = PacketPool()
+    packet = pool.acquire(1.0, 100, 1, src='a', flow_id=2, payload=b'x')
+    packet.perhop_time['p'] = 1.0
+    packet.ack = 5
+    perhop_time = packet.perhop_time
+    packet.release()
+    assert len(pool) == 1
+    with pytest.raises(ValueError):
+        pool.release(packet)
+
+    # The released packet is reused with all fields reset.
+    assert pool.acquire(2.0, 200, 2) is packet
+    assert (packet.time, packet.size, packet.src, packet.ack) == (
+        2.0, 200, 'source', 0
+    )
+    assert packet.payload is None and packet.perhop_time == {}
+    assert perhop_time == {'p': 1.0}
+    assert (pool.created, pool.reused) == (1, 1)
+
+    # Releasing the packet again does nothing, it no longer has a pool.
+    packet.release()
+    packet.release()
+    assert len(pool) == 1
+
+    with pytest.raises(ValueError):
+        PacketPool().release(packet)
+    # Packets without a pool are not affected.
+    Packet(0, 1, 1).release()
+
+
+def test_packet_pool_debug():
+    pool = PacketPool(debug=True)
+    packet = pool.acquire(1.0, 100, 1)
+    pool.release(packet)
+    with pytest.raises(RuntimeError, match='released'):
+        packet.size
+    with pytest.raises(RuntimeError, match='released'):
+        packet.size = 1
+    with pytest.raises(RuntimeError, match='released'):
+        packet.release()
+    assert repr(packet) == '<released packet>'
+    # Released packets are not reused in debug mode.
+    assert pool.acquire(1.0, 100, 2) is not packet
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_packet_pool_copy(debug):
+    """Copies, e.g. by splitters, don't return to the pool."""
+    pool = PacketPool(debug)
+    packet = pool.acquire(1.0, 100, 1)
+    packet.stamp('p', 1.0)
+    duplicate = copy(packet)
+    assert duplicate.size == 100 and duplicate.perhop_time == {'p': 1.0}
+    duplicate.release()
+    assert len(pool) == 0
+
+    second = pool.acquire(2.0, 200, 2)
+    env = Environment()
+    splitter, sinks = Splitter(), [PacketSink(env) for _ in range(2)]
+    splitter.out1, splitter.out2 = sinks
+    splitter.put(packet)
+    nsplitter = NSplitter(3)
+    nsplitter.outs = [PacketSink(env), None, PacketSink(env)]
+    nsplitter.put(second)
+    assert pool.created == 2
+    assert len(pool) == (0 if debug else 2)
+    assert sinks[1].packets_received[0] == 1
+    assert nsplitter.outs[2].packets_received[0] == 1
+
+
+def test_packet_pool_table():
+    env = Environment()
+    with pytest.raises(ValueError):
+        DistPacketGenerator(env, 'g', lambda: 1, lambda: 100,
+                            table=PacketTable(), pool=PacketPool())
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_packet_pool_devices(debug):
+    def build(pool):
+        env = Environment()
+        rng = random.Random(1)
+        generator = DistPacketGenerator(
+            env, 'g', lambda: rng.expovariate(100),
+            lambda: rng.randint(64, 1500), pool=pool,
+        )
+        port = Port(env, 1e6, 100, False, 'p')
+        wire = Wire(env, lambda: 0.001, 0.1, rng=rng)
+        sink = PacketSink(env)
+        generator.out, port.out, wire.out = port, wire, sink
+        env.run(until=10)
+        return sink
+
+    pool = PacketPool(debug)
+    sink = build(pool)
+    expected = build(None)
+    assert sink.packets_received[0] > 500
+    assert sink.waits == expected.waits
+    if not debug:
+        assert pool.created < 20
+        assert pool.reused > 500
+
+    # Drops at a port release the packet, too.
+    env = Environment()
+    port = Port(env, 1e6, 0, True, 'p')
+    port.put(pool.acquire(0, 100, 1))
+    assert port.packets_dropped == 1
+    assert len(pool) == (0 if debug else pool.created)
+
+
+def test_demux_drops_release():
+    """Demultiplexers without a default output release the packets they
+    can't route."""
+    pool = PacketPool()
+    sink = PacketSink(Environment())
+    packets = [pool.acquire(0, 100, i, flow_id=5) for i in range(2)]
+    FIBDemux(outs=[sink], fib={0: 0}).put(packets[0])
+    FlowDemux([sink]).put(packets[1])
+    assert len(pool) == 2 and sink.packets_received[5] == 0
+
+    table = PacketTable()
+    FIBDemux(outs=[sink], fib={0: 0}, table=table).put(
+        table.new(0, 100, 1, flow_id=5)
+    )
+    assert len(table) == 0
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_packet_pool_tcp_acks(debug):
+    def build(pool):
+        env = Environment()
+        flow = Flow(
+            flow_id=0, src='a', dst='b', start_time=0, finish_time=10,
+            arrival_dist=lambda: 0.1, size_dist=lambda: 512,
+        )
+        sender = TCPPacketGenerator(env, flow=flow, cc=TCPReno(),
+                                    rtt_estimate=0.5)
+        receiver = TCPSink(env, pool=pool)
+        downstream = Wire(env, lambda: 0.1)
+        upstream = Wire(env, lambda: 0.1)
+        sender.out, downstream.out = downstream, receiver
+        receiver.out, upstream.out = upstream, sender
+        env.run(until=20)
+        return sender, receiver
+
+    pool = PacketPool(debug)
+    sender, receiver = build(pool)
+    expected_sender, expected_receiver = build(None)
+    assert receiver.waits == expected_receiver.waits
+    assert sender.last_ack == expected_sender.last_ack > 0
+    if not debug:
+        assert pool.created < 5 < pool.reused
+
+
+def test_devices_ticks():
+    """In tick mode, generators, schedulers, ports and wires convert their
+    durations in seconds to ticks, so the arrival times match those of a
+    float time simulation."""
+    def build(resolution):
+        env = Environment(resolution=resolution)
+        rng = random.Random(1)
+        generators = [
+            DistPacketGenerator(
+                env, f'g{flow_id}', lambda: rng.expovariate(2000),
+                lambda: rng.randint(64, 1500), flow_id=flow_id,
+            )
+            for flow_id in range(2)
+        ]
+        scheduler = DRR(env, 1e7, {0: 1, 1: 2})
+        port = Port(env, 1e7, 100, False, 'p')
+        wire = Wire(env, lambda: 0.001)
+        sink = PacketSink(env, rec_arrivals=True)
+        for generator in generators:
+            generator.out = scheduler
+        scheduler.out, port.out, wire.out = port, wire, sink
+        env.run(until=env.to_ticks(0.1))
+        return env, sink
+
+    float_env, expected = build(None)
+    env, sink = build(1e-9)
+    assert isinstance(env.now, int)
+    for flow_id in range(2):
+        arrivals = [env.to_seconds(t) for t in sink.arrivals[flow_id]]
+        assert len(arrivals) == len(expected.arrivals[flow_id]) > 50
+        assert arrivals == pytest.approx(expected.arrivals[flow_id], abs=1e-8)
+
+
+def test_tcp_ticks():
+    """TCP converts its arrival times and timeouts in seconds to ticks.
+    The times are exact in binary, so both runs see the same events."""
+    def build(resolution):
+        env = Environment(resolution=resolution)
+        flow = Flow(
+            flow_id=0, src='a', dst='b', start_time=0,
+            finish_time=env.to_ticks(10),
+            arrival_dist=lambda: 0.125, size_dist=lambda: 512,
+        )
+        sender = TCPPacketGenerator(env, flow=flow, cc=TCPReno(),
+                                    rtt_estimate=0.5)
+        receiver = TCPSink(env, rec_arrivals=True)
+        downstream = Wire(env, lambda: 0.0625)
+        upstream = Wire(env, lambda: 0.0625)
+        sender.out, downstream.out = downstream, receiver
+        receiver.out, upstream.out = upstream, sender
+        env.run(until=env.to_ticks(20))
+        return env, sender, receiver
+
+    _, expected_sender, expected_receiver = build(None)
+    env, sender, receiver = build(1e-6)
+    assert sender.last_ack == expected_sender.last_ack > 0
+    assert sender.rto == pytest.approx(expected_sender.rto)
+    arrivals = [env.to_seconds(t) for t in receiver.arrivals[0]]
+    assert arrivals == pytest.approx(expected_receiver.arrivals[0], abs=1e-5)
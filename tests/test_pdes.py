@@ -0,0 +1,80 @@
+import pytest
+
+from onl.netdev import Port
+from onl.packet import DistPacketGenerator, PacketSink
+from onl.parallel import ParallelSimulation, run_sequential
+
+NODES = ['a', 'b', 'c']
+# Ring a -> b -> c -> a, every node sends to its successor.
+PARTITION = {'a': 0, 'b': 1, 'c': 1}
+
+
+def ring(lp):
+    env = lp.env
+    sinks = {}
+    for i, node in enumerate(NODES):
+        if not lp.owns(node):
+            continue
+        succ = NODES[(i + 1) % len(NODES)]
+        pred = NODES[i - 1]
+        rng = lp.rng(f'gen:{node}')
+        generator = DistPacketGenerator(
+            env, node, lambda rng=rng: rng.expovariate(50.0),
+            lambda rng=rng: rng.randint(100, 1500), flow_id=i,
+        )
+        port = Port(env, 1e6, 1000, False, node)
+        generator.out = port
+        port.out = lp.wire(node, succ, 0.01 * (i + 1), loss_rate=0.1)
+        sinks[node] = PacketSink(env)
+        lp.connect(pred, node, sinks[node])
+    return sinks
+
+
+def test_parallel_matches_sequential():
+    expected = run_sequential(ring, until=20, seed=7)
+    sim = ParallelSimulation(ring, PARTITION, seed=7)
+    result = sim.run(until=20)
+
+    assert sim.lookahead == 0.01
+    assert sim.rounds > 0
+    assert sim.messages > 0
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value, rel=1e-12), key
+
+
+def test_parallel_single_lp():
+    partition = {node: 0 for node in NODES}
+    sim = ParallelSimulation(ring, partition, seed=1)
+    assert sim.run(until=5) == run_sequential(ring, until=5, seed=1)
+    assert sim.messages == 0
+
+
+def test_partition_fattree():
+    pytest.importorskip('networkx')
+    from onl.topo import FatTree, partition_fattree
+
+    topo = FatTree(4).topo
+    partition = partition_fattree(topo, 2)
+    assert set(partition.values()) == {0, 1}
+    # Only links between aggregation and core switches are cut.
+    for u, v in topo.edges():
+        if partition[u] != partition[v]:
+            assert topo.edges[u, v]['type'] == 'core_aggregation'
+    with pytest.raises(ValueError):
+        partition_fattree(topo, 5)
+
+
+def failing(lp):
+    sinks = ring(lp)
+    if lp.index == 1:
+        raise KeyError('no such node')
+    return sinks
+
+
+def test_parallel_builder_error():
+    """Exceptions of an LP are re-raised by the coordinator."""
+    sim = ParallelSimulation(failing, PARTITION)
+    with pytest.raises(KeyError, match='no such node') as excinfo:
+        sim.run(until=1)
+    assert 'Traceback of LP 1' in str(excinfo.value.__cause__)
@@ -141,3 +141,52 @@ def test_interrupted_join_and_rejoin(env):
     parent_proc = env.process(parent(env))
     env.process(interruptor(env, parent_proc))
     env.run()
+
+
+def test_yield_from(env, log):
+    """Helpers run inline with "yield from", without events of their own.
+    Exceptions and interrupts are passed on to the helper."""
+    def helper(env, delay):
+        yield env.timeout(abs(delay))
+        if delay < 0:
+            raise ValueError(delay)
+        return env.now
+
+    def parent(env):
+        log.append((yield from helper(env, 1)))
+        try:
+            yield from helper(env, 1)
+            pytest.fail('Did not receive an interrupt.')
+        except Interrupt as interrupt:
+            log.append((env.now, interrupt.cause))
+        try:
+            yield from helper(env, -1)
+        except ValueError as err:
+            log.append(err.args)
+
+    def interruptor(env, process):
+        yield env.timeout(1.5)
+        process.interrupt('wake up')
+
+    env.process(interruptor(env, env.process(parent(env))))
+    steps = 0
+    while env.peek() < float('inf'):
+        env.step()
+        steps += 1
+    assert log == [1, (1.5, 'wake up'), (-1,)]
+    # Two initializations, four timeouts, the interrupt and two
+    # terminations.
+    assert steps == 9
+
+
+def test_yield_from_invalid_event(env):
+    """Invalid yields are reported with the line of the helper."""
+    def helper(env):
+        yield 'spam'
+
+    def parent(env):
+        yield from helper(env)
+
+    env.process(parent(env))
+    with pytest.raises(RuntimeError, match="yield 'spam'"):
+        env.run()
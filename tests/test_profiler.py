@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from onl.utils import Profiler
+
+
+def worker(env, delay):
+    while True:
+        yield env.timeout(delay)
+
+
+def test_profiler_counts(env):
+    env.process(worker(env, 1))
+    env.process(worker(env, 2))
+    env.call_later(1.5, len, [])
+    with Profiler(env) as profiler:
+        env.run(until=10)
+
+    stats = profiler.stats
+    # Two initializations and one resume per timeout.
+    assert stats['worker'].count == 2 + 9 + 4
+    assert stats['len'].count == 1
+    # Plus the scheduled call and the until event.
+    assert profiler.events == 2 + 9 + 4 + 1 + 1
+    assert profiler.event_types['Timeout'] == 13
+    assert profiler.wall_time_ns >= stats['worker'].time_ns > 0
+
+    summary = profiler.summary()
+    assert summary.startswith(f'{profiler.events} events')
+    assert 'worker' in summary
+
+
+def test_profiler_samples(env):
+    env.process(worker(env, 1))
+    for delay in range(5, 10):
+        env.timeout(delay)
+    profiler = Profiler(env, interval=2)
+    profiler.start()
+    env.run(until=9)
+    profiler.stop()
+
+    assert [s.sim_time for s in profiler.samples] == [0, 2, 4, 6, 8]
+    assert [s.queue_size for s in profiler.samples] == [7, 7, 7, 5, 3]
+
+
+def test_profiler_trace(env, tmp_path):
+    env.process(worker(env, 1))
+    with Profiler(env, interval=5, trace=True) as profiler:
+        env.run(until=10)
+
+    path = tmp_path / 'trace.json'
+    profiler.write_trace(str(path))
+    trace = json.loads(path.read_text())
+    spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    counters = [e for e in trace['traceEvents'] if e['ph'] == 'C']
+    assert len(spans) == profiler.stats['worker'].count + 1
+    assert spans[1]['args'] == {'sim_time': 1}
+    assert {e['name'] for e in counters} == {'queue_size', 'events_per_sec'}
+
+
+def test_profiler_detach(env):
+    env.process(worker(env, 1))
+    profiler = Profiler(env)
+    profiler.start()
+    with pytest.raises(RuntimeError):
+        profiler.start()
+    profiler.stop()
+    env.run(until=5)
+    assert profiler.events == 0
+    with pytest.raises(RuntimeError):
+        profiler.stop()
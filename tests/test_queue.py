@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from onl import sim
+
+
+def random_items(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        (rng.choice([rng.random() * 100, rng.randint(0, 20)]),
+         rng.randint(0, 1), eid, None)
+        for eid in range(n)
+    ]
+
+
+@pytest.mark.parametrize('queue_cls', [sim.HeapQueue, sim.CalendarQueue])
+def test_queue_order(queue_cls):
+    items = random_items(2000)
+    queue = queue_cls()
+    for item in items:
+        queue.push(item)
+    assert len(queue) == len(items)
+    assert sorted(queue) == sorted(items)
+
+    popped = []
+    while len(queue):
+        assert queue.first() == min(queue)
+        popped.append(queue.pop())
+    assert popped == sorted(items)
+    pytest.raises(IndexError, queue.pop)
+    pytest.raises(IndexError, queue.first)
+
+
+@pytest.mark.parametrize('queue_cls', [sim.HeapQueue, sim.CalendarQueue])
+@pytest.mark.parametrize('pushed', [0, 100, 1990])
+def test_queue_push_many(queue_cls, pushed):
+    items = random_items(2000)
+    queue = queue_cls()
+    for item in items[:pushed]:
+        queue.push(item)
+    queue.push_many(items[pushed:])
+    assert len(queue) == len(items)
+    assert [queue.pop() for _ in items] == sorted(items)
+
+
+def test_calendar_queue_interleaved():
+    """Interleave pushes and pops the way an environment does: new items are
+    never earlier than the last popped one."""
+    rng = random.Random(1)
+    heap, calendar = sim.HeapQueue(), sim.CalendarQueue()
+    now, eid = 0.0, 0
+    for _ in range(5000):
+        for _ in range(rng.randint(0, 3)):
+            item = (now + rng.expovariate(1.0), rng.randint(0, 1), eid, None)
+            eid += 1
+            heap.push(item)
+            calendar.push(item)
+        if len(heap):
+            item = heap.pop()
+            assert calendar.pop() == item
+            now = item[0]
+    assert calendar.nbuckets > 2
+
+
+def test_calendar_queue_infinity():
+    queue = sim.CalendarQueue()
+    queue.push((float('inf'), 0, 0, None))
+    queue.push((1, 1, 1, None))
+    assert queue.pop()[0] == 1
+    assert queue.first()[0] == float('inf')
+    assert queue.pop()[0] == float('inf')
+    assert len(queue) == 0
+
+
+def test_calendar_queue_invalid_args():
+    pytest.raises(ValueError, sim.CalendarQueue, nbuckets=0)
+    pytest.raises(ValueError, sim.CalendarQueue, width=0)
+
+
+@pytest.mark.parametrize('queue_cls', [sim.HeapQueue, sim.CalendarQueue])
+def test_environment_queue_backend(log, queue_cls):
+    """Same-time events keep their priority and FIFO order."""
+    def pem(env, name, delay):
+        for _ in range(3):
+            yield env.timeout(delay)
+            log.append((name, env.now))
+
+    env = sim.Environment(queue=queue_cls())
+    env.process(pem(env, 'a', 2))
+    env.process(pem(env, 'b', 1))
+    env.process(pem(env, 'c', 2))
+    env.run(until=5)
+
+    assert log == [('b', 1), ('a', 2), ('c', 2), ('b', 2), ('b', 3),
+                   ('a', 4), ('c', 4)]
+    assert env.now == 5
+    assert env.peek() == 6
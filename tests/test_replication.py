@@ -0,0 +1,67 @@
+import random
+
+from onl.netdev import Wire
+from onl.packet import DistPacketGenerator, PacketSink
+from onl.parallel import (
+    Replication,
+    ReplicationRunner,
+    RunningStats,
+    run_replication,
+)
+
+
+def lossy_link(replication):
+    env = replication.env
+    generator = DistPacketGenerator(
+        env, 'gen', lambda: random.expovariate(10.0), lambda: 100
+    )
+    wire = Wire(
+        env, lambda: random.uniform(0.1, 0.2), 0.2,
+        rng=replication.rng('wire'),
+    )
+    sink = PacketSink(env)
+    generator.out = wire
+    wire.out = sink
+    return {'sink': sink}
+
+
+def test_replication_streams():
+    a, b = Replication(0, seed=1), Replication(1, seed=1)
+    assert a.rng('wire') is a.rng('wire')
+    assert a.rng('wire').random() != a.rng('port').random()
+    assert Replication(0, seed=1).rng('wire').random() == (
+        Replication(0, seed=1).rng('wire').random()
+    )
+    assert b.rng('wire').random() != Replication(0, seed=1).rng('wire').random()
+
+
+def test_run_replication_reproducible():
+    first = run_replication(lossy_link, 20, index=3, seed='x')
+    second = run_replication(lossy_link, 20, index=3, seed='x')
+    other = run_replication(lossy_link, 20, index=4, seed='x')
+    assert first == second
+    assert first.stats != other.stats
+    assert set(first.stats) == {'sink.packets', 'sink.bytes', 'sink.mean_wait'}
+
+
+def test_runner():
+    runner = ReplicationRunner(lossy_link, until=20, seed='x', max_workers=2)
+    results = list(runner.run(4))
+    assert sorted(result.index for result in results) == [0, 1, 2, 3]
+    # The same as running the replications in this process.
+    for result in results:
+        assert result == run_replication(lossy_link, 20, result.index, 'x')
+    packets = runner.summary['sink.packets']
+    assert packets.count == 4
+    values = [result.stats['sink.packets'] for result in results]
+    assert packets.mean == sum(values) / 4
+    assert packets.min == min(values)
+
+
+def test_running_stats():
+    stats = RunningStats()
+    for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+        stats.add(value)
+    assert stats.mean == 5
+    assert abs(stats.variance - 32 / 7) < 1e-12
+    assert stats.ci95 > 0
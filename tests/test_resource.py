@@ -210,6 +210,84 @@ def test_resource_with_priority_queue(env):
     env.run()
 
 
+def test_sorted_queue_order(env):
+    """Pending requests are sorted by priority and request time, also after
+    cancellations."""
+    resource = sim.PriorityResource(env, capacity=1)
+    resource.request(priority=0)
+    priorities = [5, 3, 8, 3, 1, 9, 5, 0]
+    requests = [resource.request(priority=p) for p in priorities]
+    requests[1].cancel()
+    requests[7].cancel()
+
+    expected = sorted(
+        (r for i, r in enumerate(requests) if i not in (1, 7)),
+        key=lambda r: r.priority,
+    )
+    assert list(resource.queue) == expected
+    assert len(resource.queue) == 6
+
+
+def test_preemption_victim(env, log):
+    """The user with the lowest priority is preempted, of several such users
+    the one which got the resource last."""
+    resource = sim.PreemptiveResource(env, capacity=3)
+
+    def user(name, priority, delay):
+        yield env.timeout(delay)
+        with resource.request(priority=priority) as req:
+            yield req
+            try:
+                yield env.timeout(10)
+            except sim.Interrupt:
+                log.append((name, env.now))
+
+    env.process(user('a', 2, 0))
+    env.process(user('b', 5, 1))
+    env.process(user('c', 5, 2))
+    env.process(user('d', 1, 3))
+    env.process(user('e', 1, 4))
+    env.run(until=5)
+    assert log == [('c', 3), ('b', 4)]
+
+
+def test_preemption_victims_bounded(env):
+    """Released users don't pile up below a long-lived user."""
+    resource = sim.PreemptiveResource(env, capacity=2)
+
+    def user(priority, duration):
+        with resource.request(priority=priority) as req:
+            yield req
+            yield env.timeout(duration)
+
+    env.process(user(10, 10000))
+
+    def short_users():
+        for _ in range(1000):
+            yield env.process(user(0, 1))
+
+    env.process(short_users())
+    env.run(until=500.5)
+    assert resource.count == 2
+    assert len(resource._victims) <= 5
+
+
+def test_sorted_queue_cancel_twice(env):
+    resource = sim.PriorityResource(env, capacity=1)
+    user = resource.request()
+    requests = [resource.request(priority=p) for p in (2, 1)]
+    for request in requests:
+        request.cancel()
+        request.cancel()
+    waiting = resource.request(priority=3)
+    assert len(resource.queue) == 1
+
+    resource.release(user)
+    env.run()
+    assert waiting.triggered
+    assert len(resource.queue) == 0
+
+
 def test_sorted_queue_maxlen(env):
     """Requests must fail if more than *maxlen* requests happen
     concurrently."""
@@ -544,6 +622,162 @@ def test_store_cancel(env):
     env.run()
 
 
+def test_store_cancel_queued(env):
+    """Cancelled requests anywhere in the queue are skipped."""
+    store = sim.Store(env)
+    gets = [store.get() for _ in range(5)]
+    gets[0].cancel()
+    gets[2].cancel()
+    gets[4].cancel()
+    assert len(store.get_queue) == 2
+    assert list(store.get_queue) == [gets[1], gets[3]]
+
+    for item in 'abc':
+        store.put(item)
+    env.run()
+    assert [get.value for get in (gets[1], gets[3])] == ['a', 'b']
+    assert not gets[2].triggered
+    assert len(store.get_queue) == 0
+    assert list(store.items) == ['c']
+
+
+def test_store_cancel_while_iterating(env):
+    store = sim.Store(env)
+    gets = [store.get() for _ in range(4)]
+    seen = []
+    for get in store.get_queue:
+        seen.append(get)
+        get.cancel()
+    assert seen == gets
+    assert len(store.get_queue) == 0
+
+
+def test_store_cancel_twice(env, log):
+    """Cancelling a request again, e.g. explicitly and then at the end of a
+    with block, does nothing."""
+    store = sim.Store(env)
+
+    def impatient(store):
+        with store.get() as get:
+            get.cancel()
+            yield env.timeout(1)
+
+    def getter(store):
+        log.append((yield store.get()))
+
+    first = store.get()
+    env.process(impatient(store))
+    env.process(getter(store))
+    env.run(2)
+    first.cancel()
+    first.cancel()
+    assert len(store.get_queue) == 1
+
+    store.put_nowait('a')
+    env.run()
+    assert log == ['a']
+    assert len(store.get_queue) == 0
+
+
+def test_store_stale_requests_bounded(env):
+    """Requests served behind a getter which waits for a long time don't
+    pile up in the queue."""
+    store = sim.FilterStore(env)
+    store.get(lambda item: False)
+
+    def churn(env):
+        for i in range(1000):
+            get = store.get()
+            yield store.put(i)
+            assert (yield get) == i
+
+    env.process(churn(env))
+    env.run()
+    assert len(store.get_queue) == 1
+    assert len(store.get_queue._items) <= 10
+
+
+def test_store_items_assignment(env):
+    store = sim.Store(env)
+    store.items = [1, 2]
+
+    def getter(store):
+        assert (yield store.get()) == 1
+        assert (yield store.get()) == 2
+
+    env.process(getter(store))
+    env.run()
+    assert len(store.items) == 0
+
+
+def test_store_put_nowait(env, log):
+    store = sim.Store(env, capacity=2)
+
+    def getter(store):
+        log.append((yield store.get()))
+
+    store.put_nowait(1)
+    assert list(store.items) == [1]
+    env.process(getter(store))
+    env.run()
+    assert log == [1]
+
+    # The getter waits, the item is handed over in the same time step.
+    env.process(getter(store))
+    env.run()
+    store.put_nowait(2)
+    assert list(store.items) == [2]
+    env.run()
+    assert log == [1, 2]
+    assert env.now == 0
+    assert len(store.items) == 0
+
+    # A full store queues the item.
+    for item in (3, 4, 5):
+        store.put_nowait(item)
+    assert list(store.items) == [3, 4]
+    assert len(store.put_queue) == 1
+    env.process(getter(store))
+    env.run()
+    assert list(store.items) == [4, 5]
+
+
+def test_store_put_nowait_order(env, log):
+    """put_nowait() serves the getters in the same order of events as
+    put()."""
+    def getter(name, store):
+        item = yield store.get()
+        log.append((name, item))
+
+    def putter(name, store, put):
+        yield env.timeout(1)
+        put(name)
+        log.append(name)
+
+    for put in ('put', 'put_nowait'):
+        store = sim.Store(env)
+        env.process(getter('g', store))
+        env.process(putter('p1', store, getattr(store, put)))
+        env.process(putter('p2', store, lambda item: log.append('x')))
+        env.run()
+    assert log[:4] == log[4:]
+
+
+def test_priority_store_put_nowait(env, log):
+    pstore = sim.PriorityStore(env)
+
+    def getter(pstore):
+        log.append((yield pstore.get()))
+
+    env.process(getter(pstore))
+    env.run()
+    # Items put in the same time step are all considered.
+    pstore.put_nowait(sim.PriorityItem(2, 'b'))
+    pstore.put_nowait(sim.PriorityItem(1, 'a'))
+    env.run()
+    assert log == [sim.PriorityItem(1, 'a')]
+
+
 def test_priority_store_item_priority(env):
     pstore = sim.PriorityStore(env, 3)
     log = []
@@ -699,3 +933,241 @@ def test_filter_calls_worst_case(env):
         'put 2', 'check 0', 'check 1', 'check 2',
         'put 3', 'check 0', 'check 1', 'check 2', 'check 3', 'get 3',
     ]
+
+
+#######################################################################
+#                            test Mailbox                             #
+#######################################################################
+def test_mailbox(env, log):
+    mailbox = sim.Mailbox(env)
+
+    def consumer(env, mailbox):
+        events = set()
+        while True:
+            event = mailbox.get()
+            events.add(event)
+            item = yield event
+            log.append((env.now, item, len(events)))
+
+    def producer(env, mailbox):
+        mailbox.put('a')
+        mailbox.put('b')
+        yield env.timeout(1)
+        mailbox.put('c')
+
+    env.process(consumer(env, mailbox))
+    env.process(producer(env, mailbox))
+    env.run()
+    # The receive event is recycled.
+    assert log == [(0, 'a', 1), (0, 'b', 1), (1, 'c', 1)]
+    assert len(mailbox) == 0
+
+
+def test_mailbox_order(env, log):
+    """A mailbox delivers its messages in the same order of events as a
+    store."""
+    def consumer(name, queue):
+        while True:
+            log.append((name, (yield queue.get())))
+
+    def producer(name, put):
+        for i in range(3):
+            yield env.timeout(1)
+            put(i)
+            put(i + 10)
+            log.append(name)
+
+    store = sim.Store(env)
+    mailbox = sim.Mailbox(env)
+    env.process(consumer('store', store))
+    env.process(producer('store', store.put_nowait))
+    env.run()
+    expected = [item if item == 'store' else item[1] for item in log]
+    del log[:]
+
+    env.process(consumer('mailbox', mailbox))
+    env.process(producer('mailbox', mailbox.put))
+    env.run()
+    assert [item if item == 'mailbox' else item[1] for item in log] == [
+        'mailbox' if item == 'store' else item for item in expected
+    ]
+
+
+def test_mailbox_interrupt(env, log):
+    """An interrupted consumer gets the message it was waiting for."""
+    mailbox = sim.Mailbox(env)
+
+    def consumer(env, mailbox):
+        try:
+            yield mailbox.get()
+        except sim.Interrupt:
+            log.append('interrupted')
+        yield env.timeout(2)
+        log.append((yield mailbox.get()))
+
+    def producer(env, mailbox, proc):
+        yield env.timeout(1)
+        proc.interrupt()
+        yield env.timeout(0)
+        mailbox.put('a')
+
+    proc = env.process(consumer(env, mailbox))
+    env.process(producer(env, mailbox, proc))
+    env.run()
+    assert log == ['interrupted', 'a']
+
+
+def test_priority_mailbox(env, log):
+    mailbox = sim.PriorityMailbox(env)
+
+    def consumer(env, mailbox):
+        while True:
+            log.append((yield mailbox.get()).item)
+
+    env.process(consumer(env, mailbox))
+    env.run()
+    mailbox.put(sim.PriorityItem(2, 'b'))
+    mailbox.put(sim.PriorityItem(1, 'a'))
+    mailbox.put(sim.PriorityItem(3, 'c'))
+    env.run()
+    assert log == ['a', 'b', 'c']
+
+
+#######################################################################
+#                    test IndexedPriorityStore                        #
+#######################################################################
+def test_indexed_priority_store(env, log):
+    store = sim.IndexedPriorityStore(env)
+    handles = {
+        name: store.put_nowait(sim.PriorityItem(priority, name))
+        for priority, name in [(3, 'c'), (1, 'a'), (2, 'b'), (4, 'd'), (2, 'e')]
+    }
+    assert store.peek() is handles['a']
+    assert len(store.items) == 5
+
+    store.update(handles['d'], 0)
+    assert store.peek().item == 'd'
+    assert store.remove(handles['b']) == sim.PriorityItem(2, 'b')
+    assert not handles['b'].queued
+    with pytest.raises(ValueError):
+        store.remove(handles['b'])
+    store.update(handles['a'], 5)
+
+    def getter(store):
+        while store.items:
+            log.append((yield store.get()))
+
+    env.process(getter(store))
+    env.run()
+    assert log == [
+        sim.PriorityItem(0, 'd'),
+        sim.PriorityItem(2, 'e'),
+        sim.PriorityItem(3, 'c'),
+        sim.PriorityItem(5, 'a'),
+    ]
+    with pytest.raises(IndexError):
+        store.peek()
+
+
+def test_indexed_priority_store_put(env, log):
+    store = sim.IndexedPriorityStore(env, capacity=1)
+
+    def putter(store):
+        handle = yield store.put(sim.PriorityItem(1, 'a'))
+        log.append(handle.item)
+        # The store is full, removing the item makes room for the next one.
+        put = store.put(sim.PriorityItem(2, 'b'))
+        assert not put.triggered
+        store.remove(handle)
+        handle = yield put
+        log.append(handle.item)
+
+    env.process(putter(store))
+    env.run()
+    assert log == ['a', 'b']
+    assert store.peek().item == 'b'
+
+
+def test_indexed_priority_store_heap(env):
+    """The heap stays consistent under random operations."""
+    import random
+    rng = random.Random(42)
+    store = sim.IndexedPriorityStore(env)
+    handles = []
+    for i in range(500):
+        handles.append(store.put_nowait(sim.PriorityItem(rng.random(), i)))
+        if rng.random() < 0.3:
+            handle = handles.pop(rng.randrange(len(handles)))
+            store.remove(handle)
+        if handles and rng.random() < 0.3:
+            store.update(rng.choice(handles), rng.random())
+
+    expected = sorted((h.priority, h._seq) for h in handles)
+    result = []
+    while store.items:
+        handle = store.peek()
+        result.append((handle.priority, handle._seq))
+        store.remove(handle)
+    assert result == expected
+
+
+#######################################################################
+#                           test KeyedStore                           #
+#######################################################################
+def test_keyed_store(env, log):
+    store = sim.KeyedStore(env, key=lambda packet: packet[0])
+    store.items = [(1, 'a'), (2, 'b'), (1, 'c')]
+    assert len(store.items) == 3
+    assert store.items.count(1) == 2
+    assert 3 not in store.items
+
+    def getter(name, key):
+        while True:
+            item = yield store.get(key)
+            log.append((name, env.now, item))
+
+    def putter():
+        yield env.timeout(1)
+        store.put_nowait((3, 'd'))
+        store.put_nowait((2, 'e'))
+
+    env.process(getter('g1', 1))
+    env.process(getter('g3', 3))
+    env.process(putter())
+    env.run()
+    assert log == [
+        ('g1', 0, (1, 'a')),
+        ('g1', 0, (1, 'c')),
+        ('g3', 1, (3, 'd')),
+    ]
+    assert list(store.items) == [(2, 'b'), (2, 'e')]
+
+    get = store.get()
+    assert get.value == (2, 'b')
+
+
+def test_keyed_store_none_key(env):
+    """None is an ordinary key, get() without a key takes any item."""
+    store = sim.KeyedStore(env, key=lambda packet: packet[0])
+    store.items = [(1, 'a'), (None, 'b'), (None, 'c')]
+    assert store.get(None).value == (None, 'b')
+    assert store.get().value == (1, 'a')
+    assert store.get().value == (None, 'c')
+
+
+def test_keyed_store_absent_key(env):
+    """A getter waiting for a key which never shows up doesn't slow down
+    the other getters."""
+    store = sim.KeyedStore(env, key=lambda packet: packet[0])
+    store.get('absent')
+
+    def churn(env):
+        for i in range(1000):
+            get = store.get(i)
+            yield store.put((i, 'x'))
+            assert (yield get) == (i, 'x')
+
+    env.process(churn(env))
+    env.run()
+    assert len(store.get_queue) == 1
+    assert len(store.get_queue._items) <= 10
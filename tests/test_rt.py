@@ -1,6 +1,6 @@
 from time import monotonic, monotonic_ns, sleep
 import pytest
-from onl.sim import RealtimeEnvironment
+from onl.sim import LagStats, RealtimeEnvironment
 
 
 def process(env, log, sleep_time, timeout=1):
@@ -95,3 +95,122 @@ def test_run_with_untriggered_event(env):
     excinfo = pytest.raises(RuntimeError, env.run, until=env.event())
     assert str(excinfo.value).startswith('No scheduled events left but "until"'
                                          ' event was not triggered:')
+
+
+def test_rt_ticks(log):
+    """In tick mode, the factor applies to a simulated second."""
+    start = monotonic()
+    env = RealtimeEnvironment(factor=0.1, resolution=1e-3)
+    env.process(process(env, log, 0, 500))
+
+    env.run(1000)
+    duration = monotonic() - start
+
+    assert check_duration(duration, 0.1)
+    assert log == [500]
+
+
+def test_rt_lag_stats(log):
+    env = RealtimeEnvironment(factor=0.05, strict=False)
+    env.process(process(env, log, 0.1, 1))
+
+    env.run(4)
+    # Every step takes 0.1s, but only 0.05s are scheduled, so the lag grows
+    # by 0.05s per step. The events are the start of the process, three
+    # timeouts and the end of the run.
+    assert env.lag.count == 5
+    assert 0.2 <= env.lag.max < 0.22
+    assert env.lag.p50 <= env.lag.p99 <= env.lag.max
+
+
+def test_rt_lag_stats_during_run(log):
+    """The lag statistics can be queried while the simulation runs."""
+    env = RealtimeEnvironment(factor=0.02)
+
+    def observer(env):
+        while True:
+            yield env.timeout(1)
+            log.append(env.lag.count)
+
+    env.process(observer(env))
+    env.run(3.5)
+    # The start of the process and the timeouts processed so far.
+    assert log == [2, 3, 4]
+
+
+def test_rt_adaptive(log):
+    """An adaptive environment slows down instead of raising an error."""
+    env = RealtimeEnvironment(factor=0.05, adaptive=True)
+    env.process(process(env, log, 0.1, 1))
+
+    env.run(4)
+    assert log == [1, 2, 3]
+    assert env.adaptations >= 1
+    assert env.factor > 0.05
+
+
+def test_lag_stats():
+    stats = LagStats()
+    assert stats.p99 == 0
+    for i in range(1, 1001):
+        stats.add(i * 1e-6)
+    stats.add(-1)
+
+    assert stats.count == 1001
+    assert stats.max == 1e-3
+    assert stats.p50 == pytest.approx(500e-6, rel=0.04)
+    assert stats.p99 == pytest.approx(990e-6, rel=0.04)
+    assert stats.percentile(0) == 0
+    assert stats.percentile(100) == stats.max
+    with pytest.raises(ValueError):
+        stats.percentile(101)
+
+    stats.reset()
+    assert stats.count == 0
+
+
+def test_rt_spin(log):
+    """Busy-waiting hits the deadlines more accurately than sleeping."""
+    # A step of 5 ms leaves some headroom for a busy machine before the
+    # strict environment gives up.
+    env = RealtimeEnvironment(factor=5e-3, spin=1e-3)
+    env.process(process(env, log, 0, 1))
+
+    env.run(20)
+    assert env.spin == 1e-3
+    assert env.lag.p50 < 50e-6
+
+
+def test_rt_batch_overdue(monkeypatch, log):
+    """Events which are already overdue are processed without sleeping."""
+    import onl.sim.rt
+
+    sleeps = []
+    monkeypatch.setattr(onl.sim.rt, 'sleep', sleeps.append)
+    env = RealtimeEnvironment(factor=0.01, strict=False)
+
+    def pem(env):
+        sleep(0.1)
+        for _ in range(5):
+            yield env.timeout(1)
+            log.append(env.now)
+
+    env.process(pem(env))
+    env.run(8)
+
+    assert log == [1, 2, 3, 4, 5]
+    assert sleeps == []
+    # Eight events including the end of the process and of the run.
+    assert env.lag.count == 8
+    assert env.lag.max >= 0.09
+
+
+def test_rt_strict_same_time(log):
+    """Events at the same simulated time still fail a *strict* environment
+    once it falls behind."""
+    env = RealtimeEnvironment(factor=0.1)
+    env.process(process(env, log, 0.06, 0))
+
+    err = pytest.raises(RuntimeError, env.run, 1)
+    assert 'Simulation too slow for real time' in str(err.value)
+    assert len(log) == 1
@@ -47,4 +47,23 @@ def test_timer_auto_restart(env, log):
         assert log == [5, 10, 15, 20, 25]
 
     env.process(pem(env, timer))
-    env.run()
\ No newline at end of file
+    env.run()
+
+def test_timer_stop_cancels_timeout(env, log):
+    def cb():
+        log.append(env.now)
+
+    timer = Timer(env, timeout=5, timeout_callback=cb)
+
+    def pem(env, timer):
+        yield env.timeout(2)
+        timer.stop()
+        yield timer.proc
+        assert env.now == 2
+
+    env.process(pem(env, timer))
+    env.run()
+    assert log == []
+    # The cancelled timeout has been skipped without advancing the time.
+    assert env.now == 2
+    assert env.tombstones == 0